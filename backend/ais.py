@@ -0,0 +1,157 @@
+"""Decoding of AisStream.io messages into ship store updates.
+
+The WebSocket reader only appends raw frames to ``AisIngest``'s bounded
+queue; a separate consumer decodes them in batches (``decode_batch``, off
+the event loop), keeps only the latest report per MMSI, and applies each
+batch to the store in one step.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections import deque
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib parser
+    orjson = None
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+class AisBatch:
+    """Decoded frames, coalesced to the latest position and static report per MMSI."""
+
+    def __init__(self):
+        self.positions = {}  # mmsi -> (time, lat, lon, sog, cog)
+        self.statics = {}  # mmsi -> (time, name, type, callsign, destination)
+        self.types = {}
+        self.coalesced = 0
+        self.malformed = 0
+        self.last_error = None
+
+
+def decode_batch(frames):
+    """Decode ``(received_at, payload)`` frames into an ``AisBatch``."""
+    batch = AisBatch()
+    positions, statics, types = batch.positions, batch.statics, batch.types
+    for received_at, payload in frames:
+        try:
+            message = _loads(payload)
+            msg_type = message["MessageType"]
+            if msg_type == "PositionReport":
+                report = message["Message"]["PositionReport"]
+                mmsi = int(report["UserID"])
+                # Coerced here so one bad field can't fail the whole batch's store update
+                value = (received_at, float(report["Latitude"]), float(report["Longitude"]),
+                         float(report.get("Sog") or 0), float(report.get("Cog") or 0))
+                # Re-inserting keeps the dict in order of each vessel's latest report
+                if positions.pop(mmsi, None) is not None:
+                    batch.coalesced += 1
+                positions[mmsi] = value
+            elif msg_type == "ShipStaticData":
+                report = message["Message"]["ShipStaticData"]
+                mmsi = int(report["UserID"])
+                value = (received_at, report.get("Name", "Unknown").strip(), int(report.get("Type") or 0),
+                         report.get("CallSign", "").strip(), report.get("Destination", "").strip())
+                if statics.pop(mmsi, None) is not None:
+                    batch.coalesced += 1
+                statics[mmsi] = value
+        except Exception as e:
+            batch.malformed += 1
+            batch.last_error = f"{type(e).__name__}: {e}"
+            continue
+        types[msg_type] = types.get(msg_type, 0) + 1
+    return batch
+
+
+class AisIngest:
+    """Bounded frame queue between the AisStream socket and the ship store.
+
+    ``offer`` never blocks the reader: when the queue is full the oldest
+    frame is dropped (and counted), since newer reports supersede it.
+    """
+
+    def __init__(self, ships, tracks=None, max_queue=50000, batch_size=5000, interval=0.25):
+        self.ships = ships
+        self.tracks = tracks
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.interval = interval
+        self._queue = deque()
+        self._ready = None
+        self.received = 0
+        self.applied = 0
+        self.coalesced = 0
+        self.malformed = 0
+        self.dropped = 0
+        self.batches = 0
+        self.types = {}
+        self.last_error = None
+
+    def offer(self, frame, now=None):
+        """Queue one raw frame from the socket."""
+        self.received += 1
+        if len(self._queue) >= self.max_queue:
+            self._queue.popleft()
+            self.dropped += 1
+        self._queue.append((time.time() if now is None else now, frame))
+        if self._ready is not None and not self._ready.is_set():
+            self._ready.set()
+
+    def take(self):
+        """Remove and return up to ``batch_size`` queued frames, oldest first."""
+        queue = self._queue
+        return [queue.popleft() for _ in range(min(self.batch_size, len(queue)))]
+
+    def apply(self, batch):
+        """Write a decoded batch to the ship store (and track store); runs on the event loop."""
+        if batch.positions:
+            mmsis = list(batch.positions)
+            times, lat, lon, sog, cog = zip(*batch.positions.values())
+            self.ships.update_positions(mmsis, lat, lon, sog, cog, times)
+            if self.tracks is not None:
+                append = self.tracks.append
+                for mmsi, (t, y, x, s, c) in zip(mmsis, batch.positions.values()):
+                    append(mmsi, y, x, s, c, t)
+        for mmsi, (t, name, ship_type, callsign, destination) in batch.statics.items():
+            self.ships.update_static(mmsi, name, ship_type, callsign, destination, t)
+        self.applied += len(batch.positions) + len(batch.statics)
+        self.coalesced += batch.coalesced
+        self.malformed += batch.malformed
+        for msg_type, count in batch.types.items():
+            self.types[msg_type] = self.types.get(msg_type, 0) + count
+        if batch.last_error is not None:
+            self.last_error = batch.last_error
+        self.batches += 1
+
+    async def run(self):
+        """Background task: decode queued frames on a worker thread and apply them in batches."""
+        self._ready = asyncio.Event()
+        while True:
+            if not self._queue:
+                self._ready.clear()
+                await self._ready.wait()
+            if len(self._queue) < self.batch_size:
+                # Let a batch accumulate so repeated reports coalesce
+                await asyncio.sleep(self.interval)
+            try:
+                batch = await asyncio.to_thread(decode_batch, self.take())
+                self.apply(batch)
+            except Exception as e:
+                print(f"[ais] batch failed: {e}")
+
+    def stats(self):
+        return {
+            "received": self.received,
+            "applied": self.applied,
+            "coalesced": self.coalesced,
+            "malformed": self.malformed,
+            "dropped": self.dropped,
+            "queued": len(self._queue),
+            "batches": self.batches,
+            "types": dict(self.types),
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,324 @@
+"""Demand-driven AisStream subscription regions.
+
+Instead of subscribing to the whole planet, the AIS feed follows what is
+actually on screen: the viewports of recent ``/api/ships`` requests (each
+kept for ``demand_ttl`` seconds after it was last asked for), live-channel
+ship subscriptions, and any configured always-on regions.
+
+Viewports are padded and rasterized onto a ``cell_degrees`` grid, so small
+pans and zooms map to the same cells and don't cause resubscribes.  The
+covered cells are turned into rectangles (on a coarser grid when demand is
+scattered enough to yield too many), and rectangles are merged greedily while a merge wastes little area, or until there are at most
+``max_boxes``.  When the result changes, ``AisRegions`` bumps its version
+and wakes whoever is following it, which sends the new subscription on the
+open socket; vessels already in the store are kept and age out as usual.
+
+No demand and no always-on regions means no regions, and the socket
+closes.  Vessel track retention records whatever the subscription
+receives; configuring always-on regions is how to retain more.
+
+API workers don't own the socket, so they publish their demand as a small
+JSON file in the shared directory, which the ingest process merges in.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import glob
+import json
+import math
+import os
+import time
+
+import numpy as np
+
+WORLD = (-180.0, -90.0, 180.0, 90.0)
+DEMAND_FILE_PATTERN = "aethra-ais-demand-*.json"
+
+
+def parse_regions(text):
+    """``"w,s,e,n;w,s,e,n"`` (or ``"world"``) to a list of bbox tuples."""
+    regions = []
+    for part in (text or "").split(";"):
+        part = part.strip()
+        if not part:
+            continue
+        if part.lower() == "world":
+            regions.append(WORLD)
+            continue
+        west, south, east, north = (float(value) for value in part.split(","))
+        if not (-90 <= south < north <= 90 and -180 <= west <= 180 and -180 <= east <= 180):
+            raise ValueError(f"Invalid AIS region: {part}")
+        regions.append((west, south, east, north))
+    return regions
+
+
+def surface_fraction(box):
+    """Fraction of the Earth's surface inside ``box`` (west <= east)."""
+    west, south, east, north = box
+    return (east - west) * (math.sin(math.radians(north)) - math.sin(math.radians(south))) / 720.0
+
+
+def _split(box):
+    west, south, east, north = box
+    if west <= east:
+        return [box]
+    return [(west, south, 180.0, north), (-180.0, south, east, north)]
+
+
+def _wrap(lon):
+    return (lon + 180.0) % 360.0 - 180.0 if not -180.0 <= lon <= 180.0 else lon
+
+
+def cover(boxes, cell_degrees=1.0, pad_degrees=0.0):
+    """Boolean (rows, cols) grid of the cells touched by any padded box; row 0 is the south edge."""
+    rows, cols = int(math.ceil(180 / cell_degrees)), int(math.ceil(360 / cell_degrees))
+    mask = np.zeros((rows, cols), dtype=bool)
+    for box in boxes:
+        west, south, east, north = box
+        south, north = max(south - pad_degrees, -90.0), min(north + pad_degrees, 90.0)
+        if west <= east and east - west + 2 * pad_degrees >= 360.0:
+            west, east = -180.0, 180.0
+        elif pad_degrees:
+            west, east = _wrap(west - pad_degrees), _wrap(east + pad_degrees)
+        r0 = int((south + 90.0) // cell_degrees)
+        r1 = min(int(math.ceil((north + 90.0) / cell_degrees)), rows)
+        for part_west, _, part_east, _ in _split((west, south, east, north)):
+            c0 = int((part_west + 180.0) // cell_degrees)
+            c1 = min(int(math.ceil((part_east + 180.0) / cell_degrees)), cols)
+            mask[r0:max(r1, r0 + 1), c0:max(c1, c0 + 1)] = True
+    return mask
+
+
+def rectangles(mask, cell_degrees=1.0):
+    """Cover the set cells of ``mask`` with rectangles: runs per row, stacked while the run is unchanged."""
+    boxes = []
+    open_runs = {}  # (c0, c1) -> first row
+    for row in range(mask.shape[0] + 1):
+        runs = set()
+        if row < mask.shape[0]:
+            padded = np.concatenate(([False], mask[row], [False]))
+            edges = np.flatnonzero(padded[1:] != padded[:-1])
+            runs = set(zip(edges[::2].tolist(), edges[1::2].tolist()))
+        for run in list(open_runs):
+            if run not in runs:
+                first = open_runs.pop(run)
+                boxes.append((run[0] * cell_degrees - 180.0, first * cell_degrees - 90.0,
+                              min(run[1] * cell_degrees - 180.0, 180.0), min(row * cell_degrees - 90.0, 90.0)))
+        for run in runs:
+            open_runs.setdefault(run, row)
+    return boxes
+
+
+def _areas(west, south, east, north):
+    return (east - west) * (np.sin(np.radians(north)) - np.sin(np.radians(south))) / 720.0
+
+
+def merge_boxes(boxes, max_boxes=16, slack=0.25):
+    """Greedily merge the pair of boxes wasting the least area.
+
+    Merges continue while the waste is at most ``slack`` times the merged
+    area, and beyond that while there are more than ``max_boxes``.
+    """
+    boxes = np.array(boxes, dtype=float).reshape(-1, 4)
+    while len(boxes) > 1:
+        west = np.minimum.outer(boxes[:, 0], boxes[:, 0])
+        south = np.minimum.outer(boxes[:, 1], boxes[:, 1])
+        east = np.maximum.outer(boxes[:, 2], boxes[:, 2])
+        north = np.maximum.outer(boxes[:, 3], boxes[:, 3])
+        union = _areas(west, south, east, north)
+        own = _areas(*boxes.T)
+        # Inputs don't overlap (cells of one mask), so the waste is what neither covers
+        waste = union - own[:, None] - own[None, :]
+        np.fill_diagonal(waste, np.inf)
+        i, j = np.unravel_index(np.argmin(waste), waste.shape)
+        if waste[i, j] > slack * union[i, j] and len(boxes) <= max_boxes:
+            break
+        merged = np.array([west[i, j], south[i, j], east[i, j], north[i, j]])
+        # The union may now swallow others
+        inside = ((boxes[:, 0] >= merged[0]) & (boxes[:, 1] >= merged[1])
+                  & (boxes[:, 2] <= merged[2]) & (boxes[:, 3] <= merged[3]))
+        inside[[i, j]] = True
+        boxes = np.vstack([boxes[~inside], merged])
+    return sorted(tuple(box) for box in boxes.tolist())
+
+
+def _coarsen(mask):
+    rows, cols = mask.shape
+    mask = np.pad(mask, ((0, rows % 2), (0, cols % 2)))
+    return mask.reshape(mask.shape[0] // 2, 2, mask.shape[1] // 2, 2).any(axis=(1, 3))
+
+
+def plan_regions(boxes, cell_degrees=1.0, pad_degrees=0.5, max_boxes=16, slack=0.25):
+    """Minimal sorted tuple of (west, south, east, north) boxes covering every demanded bbox."""
+    boxes = list(boxes)
+    if not boxes:
+        return ()
+    mask = cover(boxes, cell_degrees, pad_degrees)
+    if mask.all():
+        return (WORLD,)
+    rects = rectangles(mask, cell_degrees)
+    # Scattered demand: coarser cells first, so the quadratic merge stays small
+    while len(rects) > 4 * max_boxes:
+        mask, cell_degrees = _coarsen(mask), cell_degrees * 2
+        rects = rectangles(mask, cell_degrees)
+    return tuple(merge_boxes(rects, max_boxes, slack))
+
+
+def to_aisstream(regions):
+    """AisStream ``BoundingBoxes``: [[lat, lon] south-west, [lat, lon] north-east] per box."""
+    return [[[south, west], [north, east]] for west, south, east, north in regions]
+
+
+class AisRegions:
+    """Tracks viewport demand and keeps the current subscription regions up to date."""
+
+    def __init__(self, always_on=(), demand_ttl=120.0, cell_degrees=1.0, pad_degrees=0.5,
+                 max_boxes=16, slack=0.25, enabled=True):
+        self.always_on = list(always_on)
+        self.demand_ttl = demand_ttl
+        self.cell_degrees = cell_degrees
+        self.pad_degrees = pad_degrees
+        self.max_boxes = max_boxes
+        self.slack = slack
+        self.enabled = enabled
+        self._viewports = {}  # snapped bbox -> expiry
+        self.regions = (WORLD,) if not enabled else self._plan([])
+        self.version = 0
+        self.changes = 0
+        self._event = None
+
+    def _plan(self, boxes):
+        return plan_regions(self.always_on + list(boxes), self.cell_degrees, self.pad_degrees,
+                            self.max_boxes, self.slack)
+
+    def _snap(self, bbox):
+        if bbox is None:
+            return WORLD
+        cell = self.cell_degrees
+        west, south, east, north = bbox
+        return (math.floor(west / cell) * cell, math.floor(south / cell) * cell,
+                math.ceil(east / cell) * cell, math.ceil(north / cell) * cell)
+
+    def touch(self, bbox, now=None):
+        """Record that a client is displaying ``bbox`` (None: the whole world)."""
+        if self.enabled:
+            self._viewports[self._snap(bbox)] = (time.time() if now is None else now) + self.demand_ttl
+
+    def demand(self, now=None):
+        """Viewports requested within ``demand_ttl``."""
+        now = time.time() if now is None else now
+        for bbox in [bbox for bbox, expires in self._viewports.items() if expires < now]:
+            del self._viewports[bbox]
+        return list(self._viewports)
+
+    # --- Sharing between processes ---
+
+    def write_demand(self, path, extra=(), now=None):
+        """Atomically write this process's demand (plus ``extra`` boxes) for the ingest process."""
+        body = json.dumps({"time": time.time() if now is None else now,
+                           "boxes": self.demand(now) + [self._snap(box) for box in extra]})
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+
+    def read_demand(self, directory, now=None):
+        """Boxes from every fresh demand file in ``directory``."""
+        now = time.time() if now is None else now
+        boxes = []
+        for path in glob.glob(os.path.join(directory, DEMAND_FILE_PATTERN)):
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+                if now - data["time"] <= self.demand_ttl:
+                    boxes.extend(tuple(box) for box in data["boxes"])
+            except (OSError, ValueError, KeyError, TypeError):
+                continue
+        return boxes
+
+    # --- Following changes ---
+
+    def wanted(self, extra=(), now=None):
+        """Snapped demand: recent viewports plus ``extra`` boxes."""
+        return sorted(set(self.demand(now) + [self._snap(box) for box in extra]))
+
+    def update(self, extra=(), now=None):
+        """Recompute the regions from current demand plus ``extra`` boxes; returns True if they changed."""
+        return self.apply(self._plan(self.wanted(extra, now)))
+
+    def apply(self, regions):
+        if not self.enabled or regions == self.regions:
+            return False
+        self.regions = regions
+        self.version += 1
+        self.changes += 1
+        if self._event is not None:
+            self._event.set()
+            self._event = None
+        return True
+
+    async def wait_for_change(self, version):
+        """Wait until the regions differ from ``version``; returns the new regions."""
+        while self.version == version:
+            if self._event is None:
+                self._event = asyncio.Event()
+            await self._event.wait()
+        return self.regions
+
+    async def wait_for_regions(self):
+        """Wait until anything at all is wanted; returns the regions."""
+        while not self.regions:
+            await self.wait_for_change(self.version)
+        return self.regions
+
+    async def run(self, extra, interval=5.0, shared_directory=None):
+        """Background task recomputing the regions every ``interval`` seconds.
+
+        ``extra()`` returns further bboxes (None for the world), e.g. live
+        subscriptions; with ``shared_directory``, API workers' demand files
+        are merged in too.
+        """
+        last = None
+        while True:
+            try:
+                boxes = list(extra())
+                if shared_directory is not None:
+                    boxes.extend(await asyncio.to_thread(self.read_demand, shared_directory))
+                wanted = self.wanted(boxes)
+                # Planning is only redone (off the loop) when the demanded cells change
+                if self.enabled and wanted != last and self.apply(await asyncio.to_thread(self._plan, wanted)):
+                    print(f"[ais] subscription regions: {len(self.regions)} boxes covering "
+                          f"{self.coverage():.1%} of the Earth")
+                last = wanted
+            except Exception as e:
+                print(f"[ais] region update failed: {e}")
+            await asyncio.sleep(interval)
+
+    async def publish(self, path, extra, interval=5.0):
+        """Background task for API workers: write this worker's demand to ``path``."""
+        try:
+            while True:
+                try:
+                    await asyncio.to_thread(self.write_demand, path, list(extra()))
+                except Exception as e:
+                    print(f"[ais] could not publish demand: {e}")
+                await asyncio.sleep(interval)
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def coverage(self):
+        return sum(surface_fraction(part) for box in self.regions for part in _split(box))
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "boxes": len(self.regions),
+            "coverage": round(self.coverage(), 4),
+            "viewports": len(self._viewports),
+            "changes": self.changes,
+            "regions": [list(box) for box in self.regions],
+        }
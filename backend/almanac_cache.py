@@ -0,0 +1,123 @@
+"""Precomputed astronomical events with constant-time lookups.
+
+Root-finding (``almanac.find_discrete``, eclipse searches) is expensive, but
+its results only depend on the time window searched.  ``AlmanacCache`` runs
+the search once over a long window (a year back to several years ahead) in
+the background, keeps the events as sorted arrays per kind, and answers
+"what's next" with a binary search.  The window slides forward by
+re-running the search when it gets close to the end.
+
+The search itself is a ``search(start, end)`` callable returning
+``(timestamp, kind, name)`` tuples for Unix times, so the cache does not
+depend on the ephemeris (``main.py`` uses Skyfield and DE421).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import threading
+import time
+
+from lunar import iso
+
+YEAR = 365.25 * 86400.0
+
+# Season that starts with each event (northern hemisphere naming)
+SEASON_STARTS = {
+    "Vernal Equinox": "spring",
+    "Summer Solstice": "summer",
+    "Autumnal Equinox": "autumn",
+    "Winter Solstice": "winter",
+}
+
+
+class AlmanacCache:
+    """Sorted event timelines per kind, rebuilt as the window slides."""
+
+    def __init__(self, search, years_back=1, years_ahead=5, refresh_days=30):
+        self.search = search
+        self.back_seconds = years_back * YEAR
+        self.ahead_seconds = years_ahead * YEAR
+        self.refresh_seconds = refresh_days * 86400.0
+        self.builds = 0
+        self._window = None  # (start, end, built_at)
+        self._events = {}  # kind -> (timestamps, names)
+        self._lock = threading.RLock()
+
+    def build(self, now=None):
+        now = time.time() if now is None else now
+        start, end = now - self.back_seconds, now + self.ahead_seconds
+        with self._lock:
+            timelines = {}
+            for timestamp, kind, name in sorted(self.search(start, end)):
+                timestamps, names = timelines.setdefault(kind, ([], []))
+                timestamps.append(float(timestamp))
+                names.append(name)
+            # Swap in the new timelines in one assignment so readers never see a mix
+            self._events = timelines
+            self._window = (start, end, now)
+            self.builds += 1
+
+    def needs_build(self, now=None):
+        now = time.time() if now is None else now
+        return self._window is None or now - self._window[2] >= self.refresh_seconds
+
+    def ensure(self, now=None):
+        """Build synchronously if ``now`` isn't covered yet (first request before the background build)."""
+        now = time.time() if now is None else now
+        window = self._window
+        if window is not None and window[0] <= now <= window[1]:
+            return
+        with self._lock:
+            window = self._window
+            if window is None or not window[0] <= now <= window[1]:
+                self.build(now)
+
+    @property
+    def kinds(self):
+        return sorted(self._events)
+
+    def upcoming(self, now=None, kinds=None, limit=10, horizon=None):
+        """The next ``limit`` events after ``now``, optionally only of ``kinds``."""
+        now = time.time() if now is None else now
+        self.ensure(now)
+        events = self._events
+        found = []
+        for kind in (kinds or events):
+            timestamps, names = events.get(kind, ((), ()))
+            first = bisect.bisect_right(timestamps, now)
+            for timestamp, name in zip(timestamps[first:first + limit], names[first:first + limit]):
+                if horizon is not None and timestamp > now + horizon:
+                    break
+                found.append((timestamp, kind, name))
+        found.sort()
+        return [
+            {"kind": kind, "name": name, "time": iso(timestamp), "timestamp": timestamp}
+            for timestamp, kind, name in found[:limit]
+        ]
+
+    def previous(self, kind, now=None):
+        """The most recent event of ``kind`` at or before ``now``, or None."""
+        now = time.time() if now is None else now
+        self.ensure(now)
+        timestamps, names = self._events.get(kind, ((), ()))
+        index = bisect.bisect_right(timestamps, now) - 1
+        if index < 0:
+            return None
+        return {"kind": kind, "name": names[index], "time": iso(timestamps[index]), "timestamp": timestamps[index]}
+
+    def season(self, now=None):
+        """Current (northern hemisphere) season name, from the last equinox or solstice."""
+        last = self.previous("season", now)
+        return SEASON_STARTS.get(last["name"]) if last else None
+
+    async def run(self, interval=3600):
+        """Background task (re)building the event window off the event loop."""
+        while True:
+            if self.needs_build():
+                try:
+                    await asyncio.to_thread(self.build)
+                except Exception as e:
+                    print(f"[almanac] event search failed: {e}")
+            await asyncio.sleep(interval)
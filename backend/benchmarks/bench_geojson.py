@@ -0,0 +1,71 @@
+"""Compare GeoJSON serialization paths for a large point layer.
+
+Run from the backend directory:  python benchmarks/bench_geojson.py
+"""
+
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+
+from geojson_points import feature_collection, point_features  # noqa: E402
+from response_cache import encode_json  # noqa: E402
+
+
+def _dicts(names, ids, lon, lat, alt):
+    return {
+        'type': 'FeatureCollection',
+        'features': [
+            {
+                'type': 'Feature',
+                'geometry': {'type': 'Point', 'coordinates': [x, y]},
+                'properties': {'name': name, 'id': sat_id, 'altitude_km': z},
+            }
+            for name, sat_id, x, y, z in zip(names, ids.tolist(), lon.tolist(), lat.tolist(), alt.tolist())
+        ],
+    }
+
+
+def _timed(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        body = fn()
+    return (time.perf_counter() - start) / repeat, len(body)
+
+
+def main(features=8000, repeat=10):
+    rng = np.random.default_rng(42)
+    lon = rng.uniform(-180, 180, features)
+    lat = rng.uniform(-90, 90, features)
+    alt = rng.uniform(300, 600, features)
+    ids = np.arange(features, dtype=np.int64)
+    names = [f'STARLINK-{i}' for i in range(features)]
+
+    paths = {
+        'dicts + jsonable_encoder + json': lambda: json.dumps(
+            jsonable_encoder(_dicts(names, ids, lon, lat, alt))).encode('utf-8'),
+        'dicts + stdlib json': lambda: json.dumps(
+            _dicts(names, ids, lon, lat, alt), separators=(',', ':')).encode('utf-8'),
+        'dicts + encode_json (orjson if installed)': lambda: encode_json(_dicts(names, ids, lon, lat, alt)),
+        'point_features + encode_json (5 decimals)': lambda: feature_collection(point_features(
+            lon, lat, [('name', names), ('id', ids), ('altitude_km', alt, 3)], precision=5)),
+        'point_features + encode_json (3 decimals)': lambda: feature_collection(point_features(
+            lon, lat, [('name', names), ('id', ids), ('altitude_km', alt, 1)], precision=3)),
+    }
+    baseline = None
+    print(f'{features} point features, mean of {repeat} runs')
+    for label, fn in paths.items():
+        seconds, size = _timed(fn, repeat)
+        baseline = baseline or seconds
+        print(f'{label:44s} {seconds * 1e3:8.1f} ms  {size / 1e6:6.2f} MB  {baseline / seconds:5.1f}x')
+
+
+if __name__ == '__main__':
+    main()
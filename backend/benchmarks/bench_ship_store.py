@@ -0,0 +1,39 @@
+"""Measure per-message ingest cost and memory per vessel for ShipStore.
+
+Run from the backend directory:  python benchmarks/bench_ship_store.py
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ship_store import ShipStore  # noqa: E402
+
+
+def main(vessels=50000, messages=500000):
+    rng = random.Random(42)
+    store = ShipStore(capacity=vessels)
+    mmsis = [200000000 + i for i in range(vessels)]
+    reports = [(rng.choice(mmsis), rng.uniform(-80, 80), rng.uniform(-180, 180),
+                rng.uniform(0, 25), rng.uniform(0, 360)) for _ in range(messages)]
+
+    start = time.perf_counter()
+    now = time.time()
+    for mmsi, lat, lon, sog, cog in reports:
+        store.update_position(mmsi, lat, lon, sog, cog, now)
+    elapsed = time.perf_counter() - start
+
+    for mmsi in mmsis[::2]:
+        store.update_static(mmsi, f'VESSEL {mmsi}', 70, 'CALL', 'SOMEWHERE', now)
+
+    stats = store.stats()
+    print(f"position update: {elapsed / messages * 1e6:.2f} us/message")
+    print(f"vessels: {stats['size']}  memory: {stats['bytes'] / 1e6:.1f} MB"
+          f"  ({stats['bytes_per_vessel']} bytes/vessel)")
+
+
+if __name__ == '__main__':
+    main()
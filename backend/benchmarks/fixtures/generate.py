@@ -0,0 +1,116 @@
+"""Regenerate the benchmark fixtures deterministically.
+
+``starlink.tle.gz`` is a Starlink-sized catalog (the real constellation's
+shells, planes and mean motions) with elements derived from the epoch of
+the checked-in ``stations.txt``, and ``ais_messages.jsonl.gz`` is an
+AisStream.io capture with the full message schema: position reports from
+a fleet of vessels plus occasional static data.  Both are synthetic so they
+can be checked in and reproduced offline; the same seed always yields the
+same bytes.
+
+Run from the backend directory:  python benchmarks/fixtures/generate.py
+"""
+
+import gzip
+import json
+import os
+import random
+
+FIXTURES = os.path.dirname(os.path.abspath(__file__))
+BACKEND = os.path.abspath(os.path.join(FIXTURES, '..', '..'))
+
+# (inclination, revolutions per day, planes, satellites per plane)
+STARLINK_SHELLS = [
+    (53.05, 15.06, 72, 22),
+    (53.22, 15.08, 72, 22),
+    (43.00, 15.40, 28, 60),
+    (70.00, 14.98, 36, 20),
+    (97.60, 15.00, 6, 58),
+]
+
+
+def checksum(line):
+    return sum(int(c) if c.isdigit() else c == '-' for c in line[:68]) % 10
+
+
+def tle_lines(satnum, epoch, inclination, raan, eccentricity, perigee, anomaly, mean_motion, launch):
+    line1 = (f'1 {satnum:05d}U {launch:<8s} {epoch} '
+             f' .00001764  00000+0  13653-3 0  999')
+    line2 = (f'2 {satnum:05d} {inclination:8.4f} {raan:8.4f} {eccentricity:07d} '
+             f'{perigee:8.4f} {anomaly:8.4f} {mean_motion:11.8f}{12345:5d}')
+    return line1 + str(checksum(line1)), line2 + str(checksum(line2))
+
+
+def starlink_catalog(seed=42):
+    rng = random.Random(seed)
+    with open(os.path.join(BACKEND, 'stations.txt')) as f:
+        epoch = f.read().splitlines()[1][18:32]
+    lines, satnum, count = [], 44713, 0
+    for inclination, mean_motion, planes, per_plane in STARLINK_SHELLS:
+        for plane in range(planes):
+            raan = 360.0 * plane / planes
+            for slot in range(per_plane):
+                anomaly = (360.0 * slot / per_plane + plane * 7.5) % 360.0
+                line1, line2 = tle_lines(
+                    satnum, epoch, inclination, raan, rng.randint(800, 2400), rng.uniform(0, 360),
+                    anomaly, mean_motion + rng.uniform(-0.002, 0.002), f'{19 + count // 1500:02d}029A')
+                count += 1
+                lines.extend([f'STARLINK-{1000 + count}', line1, line2])
+                satnum += 1
+    return '\n'.join(lines) + '\n'
+
+
+def ais_capture(vessels=4000, messages=10000, seed=7):
+    rng = random.Random(seed)
+    fleet = []
+    for i in range(vessels):
+        fleet.append({
+            'mmsi': 200000000 + rng.randrange(575000000),
+            'lat': rng.uniform(-60, 70),
+            'lon': rng.uniform(-180, 180),
+            'sog': rng.choice([0.0, 0.1, rng.uniform(5, 22)]),
+            'cog': rng.uniform(0, 360),
+            'name': f'VESSEL {i:04d}',
+        })
+    start = 1768435200
+    lines = []
+    for n in range(messages):
+        ship = fleet[rng.randrange(vessels)]
+        seconds = start + n * 0.05
+        stamp = f'2026-01-15 00:{int(n * 0.05) // 60 % 60:02d}:{n * 0.05 % 60:012.9f} +0000 UTC'
+        meta = {'MMSI': ship['mmsi'], 'MMSI_String': ship['mmsi'], 'ShipName': ship['name'].ljust(20),
+                'latitude': ship['lat'], 'longitude': ship['lon'], 'time_utc': stamp}
+        if rng.random() < 0.1:
+            message = {'Message': {'ShipStaticData': {
+                'AisVersion': 2, 'CallSign': f'C{ship["mmsi"] % 100000:05d}',
+                'Destination': rng.choice(['ROTTERDAM', 'SINGAPORE', 'LOS ANGELES', '']).ljust(20),
+                'Dimension': {'A': 120, 'B': 30, 'C': 12, 'D': 14}, 'Dte': False,
+                'Eta': {'Day': 20, 'Hour': 6, 'Minute': 0, 'Month': 1}, 'FixType': 1,
+                'ImoNumber': 9000000 + ship['mmsi'] % 999999, 'MaximumStaticDraught': 9.5, 'MessageID': 5,
+                'Name': ship['name'].ljust(20), 'RepeatIndicator': 0, 'Spare': False,
+                'Type': rng.choice([30, 52, 60, 70, 80]), 'UserID': ship['mmsi'], 'Valid': True,
+            }}, 'MessageType': 'ShipStaticData', 'MetaData': meta}
+        else:
+            # Advance the vessel along its course
+            ship['lat'] = max(-80.0, min(80.0, ship['lat'] + ship['sog'] * 1e-5 * rng.uniform(-1, 1)))
+            ship['lon'] = (ship['lon'] + ship['sog'] * 1e-5 * rng.uniform(-1, 1) + 180) % 360 - 180
+            message = {'Message': {'PositionReport': {
+                'Cog': round(ship['cog'], 1), 'CommunicationState': rng.randrange(1 << 19), 'Latitude': ship['lat'],
+                'Longitude': ship['lon'], 'MessageID': 1, 'NavigationalStatus': 0, 'PositionAccuracy': True,
+                'Raim': False, 'RateOfTurn': 0, 'RepeatIndicator': 0, 'Sog': round(ship['sog'], 1),
+                'Spare': 0, 'SpecialManoeuvreIndicator': 0, 'Timestamp': int(seconds) % 60,
+                'TrueHeading': int(ship['cog']), 'UserID': ship['mmsi'], 'Valid': True,
+            }}, 'MessageType': 'PositionReport', 'MetaData': meta}
+        lines.append(json.dumps(message, separators=(',', ':')))
+    return '\n'.join(lines) + '\n'
+
+
+def write(name, text):
+    # mtime=0 keeps the gzip bytes reproducible
+    with gzip.GzipFile(os.path.join(FIXTURES, name), 'wb', mtime=0) as f:
+        f.write(text.encode('utf-8'))
+
+
+if __name__ == '__main__':
+    write('starlink.tle.gz', starlink_catalog())
+    write('ais_messages.jsonl.gz', ais_capture())
@@ -0,0 +1,103 @@
+"""Timing, allocation measurement and baseline comparison for the benchmark suite.
+
+Each case is measured twice: timed with the tracer off (median and p95 of
+repeated calls, after a warm-up call), then once more under ``tracemalloc``
+for the peak bytes allocated during a call and the bytes it left behind.
+Results are compared against ``baselines.json``; time is noisy, so it gets a
+wider tolerance than allocations, which are close to deterministic.
+"""
+
+import gc
+import json
+import os
+import platform
+import statistics
+import time
+import tracemalloc
+
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+
+TIME_TOLERANCE = 0.30
+MEMORY_TOLERANCE = 0.10
+# Allocation differences below this are noise (interned strings, free lists)
+MEMORY_SLACK_KB = 64
+
+
+class Case:
+    """One benchmark: ``fn`` is called repeatedly; ``items`` is how many things one call handles."""
+
+    def __init__(self, name, fn, items=1):
+        self.name = name
+        self.fn = fn
+        self.items = items
+
+
+def measure(case, min_time=0.5, min_runs=5, max_runs=1000):
+    """Return the result dict for ``case``: latency in ms and allocations in KB per call."""
+    case.fn()  # warm-up: lazy imports, caches, first-touch page faults
+    gc.collect()
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < min_runs or (time.perf_counter() - started < min_time and len(samples) < max_runs):
+        start = time.perf_counter()
+        case.fn()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        case.fn()
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    median = statistics.median(samples)
+    return {
+        'median_ms': round(median * 1e3, 4),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1e3, 4),
+        'per_item_us': round(median * 1e6 / case.items, 4),
+        'peak_kb': round((peak - before) / 1024, 1),
+        'retained_kb': round((after - before) / 1024, 1),
+        'runs': len(samples),
+    }
+
+
+def environment():
+    import numpy
+    return {
+        'python': platform.python_version(),
+        'numpy': numpy.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor() or None,
+    }
+
+
+def load_baselines(path=BASELINES):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f).get('results', {})
+
+
+def save_baselines(results, path=BASELINES):
+    """Merge ``results`` into the stored baselines (cases not run are kept)."""
+    merged = load_baselines(path)
+    merged.update({name: {key: result[key] for key in ('median_ms', 'p95_ms', 'peak_kb')}
+                   for name, result in results.items()})
+    with open(path, 'w') as f:
+        json.dump({'environment': environment(), 'results': dict(sorted(merged.items()))}, f, indent=2)
+        f.write('\n')
+
+
+def compare(result, baseline, time_tolerance=TIME_TOLERANCE, memory_tolerance=MEMORY_TOLERANCE):
+    """List of regressions of ``result`` against ``baseline`` (empty when within tolerance)."""
+    regressions = []
+    if result['median_ms'] > baseline['median_ms'] * (1 + time_tolerance):
+        regressions.append(f"median {result['median_ms']:.3f} ms vs {baseline['median_ms']:.3f} ms")
+    allowed = baseline['peak_kb'] * (1 + memory_tolerance) + MEMORY_SLACK_KB
+    if result['peak_kb'] > allowed:
+        regressions.append(f"peak {result['peak_kb']:.0f} KB vs {baseline['peak_kb']:.0f} KB")
+    return regressions
@@ -0,0 +1,70 @@
+"""Run the benchmark suite and compare against the stored baselines.
+
+Run from the backend directory:
+    python benchmarks/run.py                      # measure and compare
+    python benchmarks/run.py --filter satellites  # only cases whose name contains this
+    python benchmarks/run.py --update-baselines   # record the results as the new baselines
+
+Exits with status 1 when any case is slower (median latency) or allocates
+more (peak) than its baseline by more than the tolerances.  Baselines are
+machine specific: record them on the machine that runs the comparison.
+"""
+
+import argparse
+import os
+import sys
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.abspath(os.path.join(BENCHMARKS, '..')))
+sys.path.insert(0, BENCHMARKS)
+
+import harness  # noqa: E402
+import suite  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--filter', default='', help='only run cases whose name contains this')
+    parser.add_argument('--update-baselines', action='store_true')
+    parser.add_argument('--baselines', default=harness.BASELINES)
+    parser.add_argument('--time-tolerance', type=float, default=harness.TIME_TOLERANCE)
+    parser.add_argument('--memory-tolerance', type=float, default=harness.MEMORY_TOLERANCE)
+    parser.add_argument('--min-time', type=float, default=0.5, help='seconds of timed calls per case')
+    args = parser.parse_args(argv)
+
+    baselines = harness.load_baselines(args.baselines)
+    fixtures = suite.Fixtures()
+    skipped, results, regressions = [], {}, {}
+    print(f"{'case':34s} {'median ms':>10s} {'p95 ms':>10s} {'us/item':>10s} {'peak KB':>10s} "
+          f"{'kept KB':>9s}  vs baseline")
+    try:
+        for case in suite.cases(fixtures, skipped):
+            if args.filter not in case.name:
+                continue
+            result = results[case.name] = harness.measure(case, min_time=args.min_time)
+            baseline = baselines.get(case.name)
+            if baseline is None:
+                verdict = 'new'
+            else:
+                problems = harness.compare(result, baseline, args.time_tolerance, args.memory_tolerance)
+                if problems:
+                    regressions[case.name] = problems
+                verdict = 'REGRESSION' if problems else f"{result['median_ms'] / baseline['median_ms']:.2f}x"
+            print(f"{case.name:34s} {result['median_ms']:10.3f} {result['p95_ms']:10.3f} "
+                  f"{result['per_item_us']:10.3f} {result['peak_kb']:10.1f} {result['retained_kb']:9.1f}  {verdict}")
+    finally:
+        fixtures.cleanup()
+
+    for group, reason in skipped:
+        print(f'skipped {group}: {reason}')
+    if args.update_baselines:
+        harness.save_baselines(results, args.baselines)
+        print(f'recorded {len(results)} baselines in {args.baselines}')
+        return 0
+    for name, problems in regressions.items():
+        print(f"regression in {name}: {'; '.join(problems)}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""The backend hot paths, as benchmark cases over the recorded fixtures.
+
+Module-level cases exercise the code behind each endpoint directly and run
+anywhere.  The ``api/`` cases go through the FastAPI app (routing, caching
+and encoding included) and need ``de421.bsp`` in ``AETHRA_DATA_DIR``; they are
+skipped with a note when it isn't there.
+"""
+
+import gzip
+import io
+import os
+import shutil
+import tempfile
+import time
+
+from skyfield.iokit import parse_tle_file
+
+from harness import Case
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+BACKEND = os.path.abspath(os.path.join(FIXTURES, '..', '..'))
+
+ISS_NORAD_ID = 25544
+CATALOG_SIZES = (1000, 5916)
+
+
+def read_fixture(name):
+    with gzip.open(os.path.join(FIXTURES, name), 'rb') as f:
+        return f.read()
+
+
+class Fixtures:
+    """Fixture data, loaded once and shared by every case."""
+
+    def __init__(self):
+        from startup import load_timescale
+        self.ts = load_timescale()
+        self.tle_dir = tempfile.mkdtemp(prefix='aethra-bench-')
+        shutil.copy(os.path.join(BACKEND, 'stations.txt'), self.tle_dir)
+        self.starlink_tle = read_fixture('starlink.tle.gz')
+        with open(os.path.join(self.tle_dir, 'tle_starlink.txt'), 'wb') as f:
+            f.write(self.starlink_tle)
+        with open(os.path.join(BACKEND, 'stations.txt'), 'rb') as f:
+            self.stations_tle = f.read()
+        self.ais_messages = read_fixture('ais_messages.jsonl.gz').decode('utf-8').splitlines()
+        self.starlink = self.parse(self.starlink_tle)
+        self.stations = self.parse(self.stations_tle)
+        # Everything is timed at the catalog epoch, so propagation results never drift
+        self.epoch = self.stations[0].epoch
+
+    def parse(self, data):
+        return list(parse_tle_file(io.BytesIO(data), self.ts))
+
+    def cleanup(self):
+        shutil.rmtree(self.tle_dir, ignore_errors=True)
+
+
+def catalog_cases(fx):
+    from propagation import Constellation, unix_seconds
+
+    yield Case('tle/parse/stations', lambda: fx.parse(fx.stations_tle), len(fx.stations))
+    yield Case('tle/parse/starlink', lambda: fx.parse(fx.starlink_tle), len(fx.starlink))
+
+    for label, satellites in [('stations', fx.stations)] + [(f'n={n}', fx.starlink[:n]) for n in CATALOG_SIZES]:
+        constellation = Constellation(satellites)
+        yield Case(f'satellites/propagate/{label}', lambda c=constellation: c.subpoints(fx.epoch), len(satellites))
+        subpoints = constellation.subpoints(fx.epoch)
+        yield Case(f'satellites/geojson/{label}',
+                   lambda c=constellation, s=subpoints: satellite_geojson(c, s), len(satellites))
+        yield Case(f'satellites/packed/{label}',
+                   lambda c=constellation, s=subpoints: satellite_packed(c, s), len(satellites))
+
+    from conjunctions import ConjunctionScreener
+    starlink = Constellation(fx.starlink)
+    start = float(unix_seconds(fx.epoch))
+    yield Case('conjunctions/screen/starlink-10min',
+               lambda: ConjunctionScreener().screen(starlink, start, start + 600), len(fx.starlink))
+
+    from tle_catalog import TLECatalog
+    from track import TrackEngine
+    catalog = TLECatalog(fx.ts, fx.tle_dir, groups={'stations': (None, 'stations.txt')})
+    catalog.load_from_disk()
+    engine = TrackEngine(catalog, fx.ts, step_seconds=30, past_minutes=180, future_minutes=180)
+    now = float(unix_seconds(fx.epoch))
+    yield Case('iss_track/window', lambda: engine.geojson(ISS_NORAD_ID, 45, 47, 60, now=now))
+    yield Case('iss_track/cold', lambda: TrackEngine(catalog, fx.ts, step_seconds=30, past_minutes=180,
+                                                     future_minutes=180).geojson(ISS_NORAD_ID, 45, 47, 60, now=now))
+
+
+def satellite_geojson(constellation, subpoints):
+    # Same columns as main.satellite_collection
+    from geojson_points import feature_collection, point_features
+    valid = subpoints.valid
+    return feature_collection(point_features(
+        subpoints.longitude[valid], subpoints.latitude[valid],
+        [('name', [name for name, ok in zip(constellation.names, valid) if ok]),
+         ('id', constellation.ids[valid]),
+         ('altitude_km', subpoints.altitude_km[valid], 3)]))
+
+
+def satellite_packed(constellation, subpoints):
+    from packed import pack_points
+    valid = subpoints.valid
+    return pack_points([
+        ('lon', subpoints.longitude[valid], 'float32'),
+        ('lat', subpoints.latitude[valid], 'float32'),
+        ('altitude_km', subpoints.altitude_km[valid], 'float32'),
+        ('id', constellation.ids[valid], 'uint32'),
+        ('name', [name for name, ok in zip(constellation.names, valid) if ok], 'string'),
+    ])
+
+
+def ship_cases(fx):
+    from ais import AisIngest, decode_batch
+    from geojson_points import feature_collection, point_features
+    from ship_store import ShipStore
+
+    now = 1768435200.0
+    store = ShipStore(capacity=8000)
+
+    ingest = AisIngest(store, batch_size=len(fx.ais_messages))
+    frames = [(now, message) for message in fx.ais_messages]
+    yield Case('ais/decode_batch', lambda: decode_batch(frames), len(frames))
+    batch = decode_batch(frames)
+    yield Case('ais/apply_batch', lambda: ingest.apply(batch), len(frames))
+    ingest.apply(batch)
+
+    def features(bbox):
+        slots = store.query(3600, bbox, now=now)
+        return feature_collection(point_features(
+            store.lon[slots], store.lat[slots],
+            [('mmsi', store.mmsi[slots]),
+             ('name', [store.name[slot] or 'Unknown' for slot in slots.tolist()]),
+             ('type', store.ship_type[slots]),
+             ('speed', store.sog[slots], 1),
+             ('heading', store.cog[slots], 1),
+             ('destination', [store.destination[slot] or 'Unknown' for slot in slots.tolist()])]))
+
+    yield Case('ships/geojson/world', lambda: features(None), len(store))
+    yield Case('ships/geojson/viewport', lambda: features((-10.0, 30.0, 30.0, 60.0)))
+
+
+def api_skip_reason():
+    from startup import EPHEMERIS_FILE, data_dir
+    if not os.path.exists(os.path.join(data_dir(), EPHEMERIS_FILE)):
+        return f'{EPHEMERIS_FILE} not in {data_dir()} (python startup.py fetches it)'
+    return None
+
+
+def api_cases(fx):
+    """Endpoint latency through the app; the response cache is cleared before every call."""
+    os.environ['AETHRA_TLE_DIR'] = fx.tle_dir
+    os.environ.setdefault('AETHRA_FEED_DIR', os.path.join(fx.tle_dir, 'feeds'))
+    os.environ.setdefault('AETHRA_TRACK_DIR', os.path.join(fx.tle_dir, 'tracks'))
+    from fastapi.testclient import TestClient
+
+    from ais import AisIngest, decode_batch
+    import main
+
+    # No context manager: startup tasks (downloads, AIS socket) stay off
+    client = TestClient(main.app)
+
+    def get(path):
+        def call():
+            main.response_cache.clear()
+            response = client.get(path)
+            response.raise_for_status()
+            return response.content
+        return call
+
+    yield Case('api/satellites/stations', get('/api/satellites/stations'), len(fx.stations))
+    yield Case('api/satellites/starlink', get('/api/satellites/starlink'), len(fx.starlink))
+    yield Case('api/iss/track', get('/api/iss/track'))
+    yield Case('api/moon', get('/api/moon'))
+
+    now = time.time()
+    AisIngest(main.ships).apply(decode_batch([(now, message) for message in fx.ais_messages]))
+    yield Case('api/ships', get('/api/ships'), len(main.ships))
+    yield Case('api/ships/clustered', get('/api/ships?zoom=2'), len(main.ships))
+
+
+def cases(fx, skipped):
+    """Every case, in report order; ``skipped`` collects (group, reason) for groups that can't run."""
+    yield from catalog_cases(fx)
+    yield from ship_cases(fx)
+    reason = api_skip_reason()
+    if reason is None:
+        yield from api_cases(fx)
+    else:
+        skipped.append(('api/*', reason))
+
@@ -0,0 +1,99 @@
+"""Bounded executors and per-endpoint concurrency limits.
+
+CPU-heavy work (Skyfield/SGP4 propagation, JSON encoding of large
+collections) runs on a small dedicated thread pool instead of the event
+loop or Starlette's shared threadpool.  Very large constellations can
+optionally be sent to a process pool.  Each endpoint gets its own
+semaphore so one slow feed or expensive computation cannot starve the rest.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+COMPUTE_WORKERS = int(os.getenv("AETHRA_COMPUTE_WORKERS", min(4, os.cpu_count() or 1)))
+# 0 disables the process pool; otherwise the number of worker processes
+PROCESS_WORKERS = int(os.getenv("AETHRA_PROCESS_WORKERS", 0))
+
+DEFAULT_LIMITS = {
+    "moon": 1,
+    "terminator": 1,
+    "almanac": 2,
+    "iss": 2,
+    "track": 2,
+    "passes": 1,
+    "ship_history": 2,
+    "satellites": 2,
+    "flights": 1,
+    "conjunctions": 2,
+}
+
+_thread_pool = None
+_process_pool = None
+
+
+def _get_thread_pool():
+    global _thread_pool
+    if _thread_pool is None:
+        _thread_pool = ThreadPoolExecutor(max_workers=COMPUTE_WORKERS, thread_name_prefix="aethra-compute")
+    return _thread_pool
+
+
+def process_pool_enabled():
+    return PROCESS_WORKERS > 0
+
+
+async def run_compute(fn, *args, **kwargs):
+    """Run a CPU-bound function on the bounded compute thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_thread_pool(), functools.partial(fn, *args, **kwargs))
+
+
+async def run_process(fn, *args):
+    """Run a picklable function in the process pool, or the thread pool if disabled."""
+    global _process_pool
+    if not process_pool_enabled():
+        return await run_compute(fn, *args)
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=PROCESS_WORKERS)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_process_pool, functools.partial(fn, *args))
+
+
+def shutdown_executors():
+    global _thread_pool, _process_pool
+    if _thread_pool is not None:
+        _thread_pool.shutdown(wait=False)
+        _thread_pool = None
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False)
+        _process_pool = None
+
+
+class EndpointLimits:
+    """One asyncio semaphore per endpoint name.
+
+    Limits come from ``DEFAULT_LIMITS`` and can be overridden with
+    ``AETHRA_LIMIT_<NAME>`` environment variables.
+    """
+
+    def __init__(self, limits=None, default=4):
+        self.limits = dict(DEFAULT_LIMITS if limits is None else limits)
+        for name in self.limits:
+            self.limits[name] = int(os.getenv(f"AETHRA_LIMIT_{name.upper()}", self.limits[name]))
+        self.default = default
+        self._semaphores = {}
+
+    def semaphore(self, name):
+        semaphore = self._semaphores.get(name)
+        if semaphore is None:
+            semaphore = self._semaphores[name] = asyncio.Semaphore(self.limits.get(name, self.default))
+        return semaphore
+
+    async def run(self, name, awaitable):
+        """Await ``awaitable`` while holding ``name``'s concurrency slot."""
+        async with self.semaphore(name):
+            return await awaitable
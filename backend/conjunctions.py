@@ -0,0 +1,467 @@
+"""Catalog-wide conjunction screening.
+
+Comparing every pair of objects at every time step is O(n²) per step, which
+for a few thousand satellites over a day is billions of distance
+evaluations.  Instead a ``ConjunctionScreener`` works in three vectorized
+stages, one block of time steps at a time so memory stays bounded:
+
+1. Propagate: the whole catalog is propagated on a fine time grid (default
+   30 seconds) with one ``SatrecArray`` call per block, and interpolated in
+   between (``passes.GroupEphemeris``).
+2. Screen: the positions at every grid time of the block are hashed together
+   into a uniform 3-D grid whose cells are as wide as the largest screening
+   radius (``distance_km`` plus how far two objects can close in half a
+   step), so only objects in the same or neighbouring cells at the same time
+   are compared.  A pair is a candidate at a grid time if, moving in a
+   straight line relative to each other, they come within ``distance_km``
+   (plus a bound on how much the path bends) in the half step either side.
+3. Refine: each run of consecutive candidate samples of a pair is one close
+   approach.  Its time of closest approach is found by golden-section search
+   on the interpolated separation around the run's closest sample, and the
+   miss distance and relative speed are evaluated with SGP4 at that time.
+
+Positions stay in SGP4's TEME frame: distances don't depend on the frame.
+Satellites published with identical elements (station modules and docked
+vehicles) are one object in orbit and are never paired.
+
+A ``ConjunctionService`` keeps the latest ``ConjunctionReport`` for the
+whole loaded catalog and screens again, in the background, when a TLE file
+changes or the screened window runs short.  Queries for one object, a
+smaller distance or a shorter window are filters on that report.  With
+several workers only the ingest process screens; it saves each report as an
+``.npz`` file in the shared directory and API workers ``watch`` that file.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+
+import numpy as np
+
+from compute import process_pool_enabled, run_process
+from lunar import iso
+from passes import GroupEphemeris, gmst, julian_dates, teme_to_earth_fixed
+from propagation import constellation_from_files, geodetic
+
+DEFAULT_DISTANCE_KM = 10.0
+DEFAULT_STEP = 30.0
+DEFAULT_HOURS = 24.0
+# A screen covers this much more than ``hours`` so it serves until the next TLE refresh
+DEFAULT_MARGIN_HOURS = 6.0
+# Time steps per propagated block are chosen to keep about this many states in memory
+_BLOCK_STATES = 250_000
+# Covers the speed peaking between the grid samples it is measured at
+_SPEED_MARGIN = 1.01
+# Upper bound on relative acceleration per km of separation (three times the
+# two-body gravity gradient at the Earth's surface), in 1/s²
+_TIDAL_RATE = 3.0 * 398600.4418 / 6378.137 ** 3
+# The path's bending, relative to ``reach``, needs at most this many times half a step to add up
+_CURVATURE = 0.5 * _TIDAL_RATE
+_GOLDEN = (np.sqrt(5.0) - 1.0) / 2.0
+_TCA_ITERATIONS = 32
+_EVENT_COLUMNS = ("first", "second", "tca", "miss_km", "speed_kms", "lon", "lat", "alt")
+
+# Grid cells are keyed as 15 bits of time index and 16 bits per axis in one int64
+_AXIS_BITS = 16
+_AXIS_OFFSET = 1 << (_AXIS_BITS - 1)
+_MAX_FRAMES = 1 << 15
+
+
+def _key_offset(dx, dy, dz):
+    return (dx << 2 * _AXIS_BITS) + (dy << _AXIS_BITS) + dz
+
+
+# Half of the neighbouring cells, as (dx, dy) columns spanning dz = -1..1, so
+# pairs across cells are seen from one side only
+_COLUMNS = [(_key_offset(dx, dy, -1), _key_offset(dx, dy, 1)) for dx, dy in ((0, 1), (1, -1), (1, 0), (1, 1))]
+
+
+def _expand(first, count):
+    """Flatten the ranges ``[first, first + count)``; returns (range number, value) arrays."""
+    owner = np.repeat(np.arange(len(first)), count)
+    within = np.arange(len(owner)) - np.repeat(np.cumsum(count) - count, count)
+    return owner, first[owner] + within
+
+
+def grid_pairs(points, frames, cell):
+    """Index pairs ``(a, b)`` of ``points`` (n, 3) in the same frame and the same or adjacent cells.
+
+    Every pair closer than ``cell`` is included (each once, ``a != b``);
+    farther pairs may be too.  ``frames`` are small non-negative integers.
+    """
+    cells = np.clip(np.floor(points / cell).astype(np.int64) + _AXIS_OFFSET, 1, (1 << _AXIS_BITS) - 2)
+    keys = ((np.asarray(frames, dtype=np.int64) << 3 * _AXIS_BITS) | (cells[:, 0] << 2 * _AXIS_BITS)
+            | (cells[:, 1] << _AXIS_BITS) | cells[:, 2])
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    # Neighbouring cells are a constant key apart (axes never wrap, being clipped),
+    # and the cell above in z directly follows a cell in key order.  So each
+    # point's partners are the rest of its own cell plus the one above, and
+    # four columns of three cells, all contiguous ranges of the sorted keys
+    ranges = [(np.arange(1, len(keys) + 1), np.searchsorted(keys, keys + _key_offset(0, 0, 1), side="right"))]
+    for below, above in _COLUMNS:
+        ranges.append((np.searchsorted(keys, keys + below, side="left"),
+                       np.searchsorted(keys, keys + above, side="right")))
+    a, b = [], []
+    for lo, hi in ranges:
+        hit = np.flatnonzero(hi > lo)
+        owner, partner = _expand(lo[hit], (hi - lo)[hit])
+        a.append(hit[owner])
+        b.append(partner)
+    return order[np.concatenate(a)], order[np.concatenate(b)]
+
+
+def _orbits(constellation):
+    """The same number for satellites with identical elements: modules and docked vehicles of one station."""
+    elements = np.array([(m.jdsatepoch, m.jdsatepochF, m.inclo, m.nodeo, m.ecco, m.argpo, m.mo, m.no_kozai)
+                         for m in (satellite.model for satellite in constellation.satellites)])
+    return np.unique(elements, axis=0, return_inverse=True)[1].reshape(-1)
+
+
+class ConjunctionReport:
+    """Close approaches found by one screen, as columns sorted by time of closest approach."""
+
+    def __init__(self, start, end, distance_km, ids, names, events, version=None, computed_at=None,
+                 duration=None):
+        self.start = start
+        self.end = end
+        self.distance_km = distance_km
+        self.ids = ids
+        self.names = names
+        self.events = events
+        self.version = version
+        self.computed_at = time.time() if computed_at is None else computed_at
+        self.duration = duration
+
+    def __len__(self):
+        return len(self.events["tca"])
+
+    def save(self, path):
+        """Atomically replace ``path`` with this report as an uncompressed ``.npz``."""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                window=np.array([self.start, self.end, self.distance_km, self.computed_at,
+                                 np.nan if self.duration is None else self.duration]),
+                version=np.array(repr(self.version)),
+                ids=np.asarray(self.ids),
+                # Unnamed objects are stored as ""
+                names=np.array([name or "" for name in self.names], dtype=str),
+                **{f"event_{name}": self.events[name] for name in _EVENT_COLUMNS},
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Read a report written by ``save``; the version is kept as its repr."""
+        with np.load(path) as data:
+            start, end, distance_km, computed_at, duration = data["window"].tolist()
+            return cls(start, end, distance_km, data["ids"], [name or None for name in data["names"].tolist()],
+                       {name: data[f"event_{name}"] for name in _EVENT_COLUMNS}, str(data["version"]),
+                       computed_at, None if np.isnan(duration) else duration)
+
+    def select(self, norad_id=None, max_distance_km=None, start=None, end=None):
+        """Indices of the events matching every given filter, in time order."""
+        events = self.events
+        keep = np.ones(len(self), dtype=bool)
+        if norad_id is not None:
+            keep &= (self.ids[events["first"]] == norad_id) | (self.ids[events["second"]] == norad_id)
+        if max_distance_km is not None:
+            keep &= events["miss_km"] <= max_distance_km
+        if start is not None:
+            keep &= events["tca"] >= start
+        if end is not None:
+            keep &= events["tca"] <= end
+        return np.flatnonzero(keep)
+
+    def _object(self, row):
+        return {"norad_id": int(self.ids[row]), "name": self.names[row]}
+
+    def describe(self, index, norad_id=None):
+        """Event dicts for ``index``; with ``norad_id``, that object is listed first in each."""
+        events = self.events
+        result = []
+        for i in np.asarray(index).tolist():
+            first, second = int(events["first"][i]), int(events["second"][i])
+            if norad_id is not None and self.ids[second] == norad_id:
+                first, second = second, first
+            tca = float(events["tca"][i])
+            result.append({
+                "tca": iso(tca),
+                "timestamp": round(tca, 3),
+                "miss_km": round(float(events["miss_km"][i]), 3),
+                "relative_speed_kms": round(float(events["speed_kms"][i]), 3),
+                "latitude": round(float(events["lat"][i]), 4),
+                "longitude": round(float(events["lon"][i]), 4),
+                "altitude_km": round(float(events["alt"][i]), 1),
+                "objects": [self._object(first), self._object(second)],
+            })
+        return result
+
+    def summary(self):
+        return {
+            "start": iso(self.start),
+            "end": iso(self.end),
+            "distance_km": self.distance_km,
+            "satellites": len(self.ids),
+            "events": len(self),
+            "computed_at": iso(self.computed_at),
+            "seconds": None if self.duration is None else round(self.duration, 2),
+        }
+
+
+class ConjunctionScreener:
+    """Finds every pair of satellites in a ``Constellation`` passing within ``distance_km``."""
+
+    def __init__(self, distance_km=DEFAULT_DISTANCE_KM, step=DEFAULT_STEP):
+        self.distance_km = float(distance_km)
+        self.step = float(step)
+
+    def _candidates(self, ephemeris, samples, orbit):
+        """Candidate (first row, second row, sample) triples at ephemeris ``samples``, with predicted misses."""
+        speed = np.sqrt(np.einsum("nmi,nmi->nm", ephemeris.v, ephemeris.v))
+        speed = np.where(ephemeris.valid, speed, 0.0).max(axis=1) * _SPEED_MARGIN
+        half = self.step / 2.0
+        stretch = 1.0 + _CURVATURE * half
+        rows, frames = np.nonzero(ephemeris.valid[:, samples])
+        columns = samples[frames]
+        points = ephemeris.r[rows, columns]
+        a, b = grid_pairs(points, frames, self.distance_km + 2.0 * speed.max() * half * stretch)
+        # Most grid neighbours are too far apart to meet within half a step either way
+        relative = points[b] - points[a]
+        reach = (speed[rows[a]] + speed[rows[b]]) * half
+        limit = self.distance_km + reach * stretch
+        near = np.einsum("ij,ij->i", relative, relative) <= limit * limit
+        a, b, reach = a[near], b[near], reach[near]
+        relative = relative[near].astype(np.float64)
+        # Straight-line relative motion over the half step either side of the sample
+        velocity = (ephemeris.v[rows[b], columns[b]] - ephemeris.v[rows[a], columns[a]]).astype(np.float64)
+        tau = np.clip(-np.einsum("ij,ij->i", relative, velocity)
+                      / np.maximum(np.einsum("ij,ij->i", velocity, velocity), 1e-12), -half, half)
+        miss = np.linalg.norm(relative + velocity * tau[:, np.newaxis], axis=-1)
+        # Bound on the bending of the relative path by the difference in gravity
+        bend = 0.5 * _TIDAL_RATE * (np.linalg.norm(relative, axis=-1) + reach) * half * half
+        close = (miss <= self.distance_km + bend) & (orbit[rows[a]] != orbit[rows[b]])
+        a, b = a[close], b[close]
+        return np.minimum(rows[a], rows[b]), np.maximum(rows[a], rows[b]), columns[a], miss[close]
+
+    def _closest(self, ephemeris, first, second, sample):
+        """Time of closest approach within a step of each pair's closest sample (golden-section search)."""
+        seconds = ephemeris.seconds
+        a = seconds[np.maximum(sample - 1, 0)]
+        b = seconds[np.minimum(sample + 1, len(seconds) - 1)]
+
+        def separation(t):
+            return np.linalg.norm(ephemeris.teme(first, t) - ephemeris.teme(second, t), axis=-1)
+
+        c, d = b - _GOLDEN * (b - a), a + _GOLDEN * (b - a)
+        fc, fd = separation(c), separation(d)
+        for _ in range(_TCA_ITERATIONS):
+            left = fc < fd
+            # Keep [a, d] when the minimum is left of d, else [c, b]
+            a, b = np.where(left, a, c), np.where(left, d, b)
+            new = np.where(left, b - _GOLDEN * (b - a), a + _GOLDEN * (b - a))
+            fnew = separation(new)
+            c, d, fc, fd = (np.where(left, new, d), np.where(left, c, new),
+                            np.where(left, fnew, fd), np.where(left, fc, fnew))
+        return (a + b) / 2.0
+
+    def _block(self, constellation, orbit, seconds, lo, hi):
+        """Approaches whose closest sample lies in grid samples [lo, hi), as runs of candidate samples."""
+        # One extra sample each side, so the search around an edge sample has its neighbours
+        first_sample = max(lo - 1, 0)
+        ephemeris = GroupEphemeris(constellation, seconds[first_sample:min(hi + 1, len(seconds))])
+        samples = np.arange(lo - first_sample, hi - first_sample)
+        first, second, sample, separation = self._candidates(ephemeris, samples, orbit)
+        if len(first) == 0:
+            return None
+        # One approach per run of consecutive samples of the same pair, at its closest sample
+        order = np.lexsort((sample, second, first))
+        first, second, sample, separation = first[order], second[order], sample[order], separation[order]
+        starts = np.flatnonzero(np.concatenate([[True], (first[1:] != first[:-1]) | (second[1:] != second[:-1])
+                                                | (sample[1:] != sample[:-1] + 1)]))
+        run = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, len(first))))
+        by_run = np.lexsort((separation, run))
+        closest = by_run[np.searchsorted(run[by_run], np.arange(len(starts)))]
+        tca = self._closest(ephemeris, first[closest], second[closest], sample[closest])
+        return {
+            "first": first[starts],
+            "second": second[starts],
+            "tca": tca,
+            "run_start": sample[starts] + first_sample,
+            "run_end": sample[np.append(starts[1:], len(first)) - 1] + first_sample,
+        }
+
+    def _merge_runs(self, runs):
+        """Join runs split across blocks, keeping the closest approach of each."""
+        columns = {name: np.concatenate([run[name] for run in runs]) for name in runs[0]}
+        order = np.lexsort((columns["run_start"], columns["second"], columns["first"]))
+        columns = {name: values[order] for name, values in columns.items()}
+        first, second = columns["first"], columns["second"]
+        continues = np.concatenate([[False], (first[1:] == first[:-1]) & (second[1:] == second[:-1])
+                                    & (columns["run_start"][1:] == columns["run_end"][:-1] + 1)])
+        return columns, np.cumsum(~continues) - 1
+
+    def _evaluate(self, constellation, first, second, tca):
+        """SGP4 states of both objects at each time of closest approach; returns (r1, r2, v1, v2, ok)."""
+        jd, fraction = julian_dates(tca)
+        states = np.empty((4, len(tca), 3))
+        ok = np.ones(len(tca), dtype=bool)
+        satellites = constellation.satellites
+        for i, (p, q, whole, part) in enumerate(zip(first.tolist(), second.tolist(), jd.tolist(),
+                                                    fraction.tolist())):
+            e1, r1, v1 = satellites[p].model.sgp4(whole, part)
+            e2, r2, v2 = satellites[q].model.sgp4(whole, part)
+            ok[i] = e1 == 0 and e2 == 0
+            states[:, i] = r1, r2, v1, v2
+        return states[0], states[1], states[2], states[3], ok
+
+    def screen(self, constellation, start, end, version=None):
+        """Screen [start, end] (Unix seconds) and return a ``ConjunctionReport``."""
+        began = time.perf_counter()
+        ids, names = constellation.ids, constellation.names
+        count = max(int(np.ceil((end - start) / self.step)) + 1, 2)
+        seconds = start + self.step * np.arange(count, dtype=float)
+        block = int(min(max(2, _BLOCK_STATES // max(len(constellation), 1)), _MAX_FRAMES))
+        runs = []
+        if len(constellation) > 1:
+            orbit = _orbits(constellation)
+            for lo in range(0, count, block):
+                run = self._block(constellation, orbit, seconds, lo, min(lo + block, count))
+                if run is not None:
+                    runs.append(run)
+        if not runs:
+            empty = np.empty(0)
+            events = {name: empty for name in ("tca", "miss_km", "speed_kms", "lon", "lat", "alt")}
+            events["first"] = events["second"] = np.empty(0, dtype=np.int64)
+            return ConjunctionReport(start, end, self.distance_km, ids, names, events, version,
+                                     duration=time.perf_counter() - began)
+
+        columns, group = self._merge_runs(runs)
+        first, second, tca = columns["first"], columns["second"], columns["tca"]
+        r1, r2, v1, v2, ok = self._evaluate(constellation, first, second, tca)
+        miss = np.linalg.norm(r1 - r2, axis=-1)
+        # The closest approach of each merged run, if it is close enough
+        best = np.lexsort((miss, group))
+        best = best[np.searchsorted(group[best], np.arange(group[-1] + 1))]
+        best = best[ok[best] & (miss[best] <= self.distance_km)]
+        best = best[np.argsort(tca[best], kind="stable")]
+
+        midpoint = teme_to_earth_fixed((r1[best] + r2[best]) / 2.0, gmst(tca[best]))
+        lon, lat, alt = geodetic(midpoint[:, 0], midpoint[:, 1], midpoint[:, 2])
+        events = {
+            "first": first[best],
+            "second": second[best],
+            "tca": tca[best],
+            "miss_km": miss[best],
+            "speed_kms": np.linalg.norm(v1[best] - v2[best], axis=-1),
+            "lon": lon,
+            "lat": lat,
+            "alt": alt,
+        }
+        return ConjunctionReport(start, end, self.distance_km, ids, names, events, version,
+                                 duration=time.perf_counter() - began)
+
+
+def screen_files(paths, start, end, distance_km=DEFAULT_DISTANCE_KM, step=DEFAULT_STEP, version=None):
+    """Process pool entry point: screen every satellite in the TLE files at ``paths``."""
+    constellation = constellation_from_files(paths)
+    return ConjunctionScreener(distance_km, step).screen(constellation, start, end, version)
+
+
+class ConjunctionService:
+    """Keeps a screen of the whole catalog covering the next ``hours``, refreshed in the background."""
+
+    def __init__(self, distance_km=DEFAULT_DISTANCE_KM, step=DEFAULT_STEP, hours=DEFAULT_HOURS,
+                 margin_hours=DEFAULT_MARGIN_HOURS, path=None):
+        self.distance_km = distance_km
+        self.step = step
+        self.hours = hours
+        self.margin_hours = margin_hours
+        # Where ``run`` saves each report and ``watch`` picks it up (None: not shared)
+        self.path = path
+        self.report = None
+        self.screens = 0
+        self.loads = 0
+        self.last_error = None
+        self._identity = None
+
+    def needs_screen(self, version, now=None):
+        """True when the catalog changed or the report no longer reaches ``hours`` ahead."""
+        now = time.time() if now is None else now
+        report = self.report
+        return report is None or report.version != version or report.end < now + self.hours * 3600
+
+    def window(self, now=None):
+        """[start, end] of a screen started at ``now``: long enough to serve ``hours`` ahead until the next one."""
+        now = time.time() if now is None else now
+        return now, now + (self.hours + self.margin_hours) * 3600
+
+    async def run(self, source, interval=60):
+        """Background task: screen again whenever ``source()`` -> (version, TLE paths) changes.
+
+        Runs in the process pool when it is enabled, else on a thread of its
+        own so a long screen doesn't hold up the compute pool.
+        """
+        while True:
+            try:
+                version, paths = source()
+                if paths and self.needs_screen(version):
+                    start, end = self.window()
+                    args = (paths, start, end, self.distance_km, self.step, version)
+                    if process_pool_enabled():
+                        report = await run_process(screen_files, *args)
+                    else:
+                        report = await asyncio.to_thread(screen_files, *args)
+                    self.report = report
+                    self.screens += 1
+                    self.last_error = None
+                    print(f"[conjunctions] {len(report)} approaches within {report.distance_km} km "
+                          f"among {len(report.ids)} satellites in {report.duration:.1f}s")
+                    if self.path is not None:
+                        await asyncio.to_thread(report.save, self.path)
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"[conjunctions] screen failed: {e}")
+            await asyncio.sleep(interval)
+
+    def reload_changed(self):
+        """Load the report at ``path`` if another process replaced it; returns True if it did."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if identity == self._identity:
+            return False
+        self.report = ConjunctionReport.load(self.path)
+        self._identity = identity
+        self.loads += 1
+        return True
+
+    async def watch(self, interval=60):
+        """Background loop following the reports another process saves to ``path``, instead of ``run``."""
+        while True:
+            try:
+                if await asyncio.to_thread(self.reload_changed):
+                    print(f"[conjunctions] loaded {len(self.report)} approaches from {self.path}")
+                    self.last_error = None
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                print(f"[conjunctions] report load failed: {e}")
+            await asyncio.sleep(interval)
+
+    def status(self):
+        return {
+            "ready": self.report is not None,
+            "hours": self.hours,
+            "distance_km": self.distance_km,
+            "step_seconds": self.step,
+            "screens": self.screens,
+            "loads": self.loads,
+            "report": self.report.summary() if self.report is not None else None,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,280 @@
+"""Cached proxy for third-party feeds (USGS, NOAA SWPC, RainViewer, OpenSky, GVP).
+
+Each feed is fetched from upstream at most once per TTL no matter how many
+clients ask for it.  Revalidation is conditional (``If-None-Match`` /
+``If-Modified-Since``), so an unchanged feed costs a 304.  An expired entry
+is still served while one background request revalidates it; only the very
+first request for a feed with nothing cached waits for the network.
+
+Per feed, ``min_interval`` caps how often upstream is contacted at all, and
+failures back off exponentially (longer if upstream sends ``Retry-After``),
+keeping the last good payload.  Payloads are persisted to disk with their
+validators, so a restart serves the previous copy immediately and processes
+sharing the directory adopt each other's fresh fetches instead of repeating
+them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+
+import upstream
+
+MIN_RETRY_DELAY = 30
+DEFAULT_MAX_BACKOFF = 3600
+
+
+class FeedUnavailable(Exception):
+    """Nothing cached yet for a feed and upstream could not be reached."""
+
+
+class Feed:
+    """One upstream URL and how to cache it.
+
+    ``transform`` turns the upstream bytes into the bytes that are served
+    (it runs in a worker thread once per new payload; raising rejects the
+    payload and keeps the previous one).
+    """
+
+    def __init__(self, name, url, ttl, min_interval=None, transform=None, media_type="application/json"):
+        self.name = name
+        self.url = url
+        self.ttl = ttl
+        self.min_interval = ttl if min_interval is None else min_interval
+        self.transform = transform
+        self.media_type = media_type
+
+
+class FeedEntry:
+    """An immutable served payload plus the upstream validators it came with."""
+
+    def __init__(self, body, fetched_at, etag=None, last_modified=None, source="network"):
+        self.body = body
+        self.fetched_at = fetched_at
+        self.etag = etag
+        self.last_modified = last_modified
+        self.source = source
+        # Validator for our own clients
+        self.tag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+
+    def age(self, now=None):
+        return (time.time() if now is None else now) - self.fetched_at
+
+    def meta(self):
+        return {"fetched_at": self.fetched_at, "etag": self.etag, "last_modified": self.last_modified}
+
+
+def _retry_after(response):
+    for header in ("Retry-After", "X-Rate-Limit-Retry-After-Seconds"):
+        value = response.headers.get(header)
+        if value is not None:
+            try:
+                return float(value)
+            except ValueError:
+                return None
+    return None
+
+
+class FeedCache:
+    """Latest payload of every registered feed, refreshed on demand."""
+
+    def __init__(self, directory, feeds=(), max_backoff=DEFAULT_MAX_BACKOFF):
+        self.directory = directory
+        self.feeds = {feed.name: feed for feed in feeds}
+        self.max_backoff = max_backoff
+        self._entries = {}
+        self._inflight = {}
+        self._failures = {}
+        self._retry_at = {}
+        self._last_request = {}
+        self._seen_mtime = {}  # name -> mtime of the metadata file this process last wrote or read
+        self.counters = {"hits": 0, "stale": 0, "requests": 0, "not_modified": 0, "adopted": 0}
+
+    def __contains__(self, name):
+        return name in self.feeds
+
+    def add(self, feed):
+        self.feeds[feed.name] = feed
+        return feed
+
+    # --- Disk ---
+
+    def _paths(self, name):
+        base = os.path.join(self.directory, name)
+        return base + ".body", base + ".json"
+
+    def _read_disk(self, name):
+        body_path, meta_path = self._paths(name)
+        try:
+            with open(meta_path) as f:
+                mtime = os.fstat(f.fileno()).st_mtime
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except FileNotFoundError:
+            return None
+        self._seen_mtime[name] = mtime
+        return FeedEntry(body, meta["fetched_at"], meta.get("etag"), meta.get("last_modified"), "disk")
+
+    def _persist(self, name, entry, body=True):
+        os.makedirs(self.directory, exist_ok=True)
+        body_path, meta_path = self._paths(name)
+        if body:
+            with open(body_path + ".tmp", "wb") as f:
+                f.write(entry.body)
+            os.replace(body_path + ".tmp", body_path)
+        # Written last: readers trust the body once its metadata is there
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump(entry.meta(), f)
+        os.replace(meta_path + ".tmp", meta_path)
+        self._seen_mtime[name] = os.path.getmtime(meta_path)
+
+    def load_from_disk(self):
+        """Populate every feed from its last persisted payload, however old."""
+        for name in self.feeds:
+            try:
+                entry = self._read_disk(name)
+            except Exception as e:
+                print(f"[feeds] {name}: could not load the persisted copy: {e}")
+                continue
+            if entry is not None:
+                self._entries[name] = entry
+
+    def _adopt_disk(self, name, now):
+        """Take a fresh payload persisted by another process; returns True if one was adopted.
+
+        Only reads the payload when the metadata file changed since this
+        process last wrote or read it.
+        """
+        _, meta_path = self._paths(name)
+        entry = self._entries.get(name)
+        try:
+            if os.path.getmtime(meta_path) == self._seen_mtime.get(name):
+                return False
+            adopted = self._read_disk(name)
+        except (OSError, ValueError, KeyError):
+            return False
+        if adopted is None or adopted.age(now) >= self.feeds[name].ttl:
+            return False
+        if entry is not None and adopted.fetched_at <= entry.fetched_at:
+            return False
+        self._entries[name] = adopted
+        self.counters["adopted"] += 1
+        return True
+
+    async def adopt(self, name):
+        """Take a newer payload persisted by another process without ever contacting upstream.
+
+        For processes that leave fetching a feed to another one; returns
+        True if a payload was adopted.
+        """
+        return await asyncio.to_thread(self._adopt_disk, name, time.time())
+
+    # --- Fetching ---
+
+    def can_request(self, name, now=None):
+        """Whether upstream may be contacted now (backoff and ``min_interval``)."""
+        now = time.time() if now is None else now
+        if now < self._retry_at.get(name, 0):
+            return False
+        last = self._last_request.get(name)
+        return last is None or now - last >= self.feeds[name].min_interval
+
+    def _build(self, feed, response):
+        body = feed.transform(response.content) if feed.transform else response.content
+        entry = FeedEntry(body, time.time(), response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        self._persist(feed.name, entry)
+        return entry
+
+    async def refresh(self, name):
+        """Revalidate one feed; returns True if the cached entry is now current."""
+        feed = self.feeds[name]
+        now = time.time()
+        if await asyncio.to_thread(self._adopt_disk, name, now):
+            return True
+        if not self.can_request(name, now):
+            return False
+        self._last_request[name] = now
+        entry = self._entries.get(name)
+        headers = {}
+        if entry is not None and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry is not None and entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        retry_after = None
+        try:
+            self.counters["requests"] += 1
+            response = await upstream.get_client().get(feed.url, headers=headers)
+            if response.status_code == 304 and entry is not None:
+                self.counters["not_modified"] += 1
+                entry = FeedEntry(entry.body, time.time(), response.headers.get("ETag", entry.etag),
+                                  response.headers.get("Last-Modified", entry.last_modified))
+                await asyncio.to_thread(self._persist, name, entry, False)
+            else:
+                if response.status_code in (429, 503):
+                    retry_after = _retry_after(response)
+                response.raise_for_status()
+                entry = await asyncio.to_thread(self._build, feed, response)
+            self._entries[name] = entry
+            self._failures.pop(name, None)
+            self._retry_at.pop(name, None)
+            return True
+        except Exception as e:
+            failures = self._failures.get(name, 0) + 1
+            self._failures[name] = failures
+            delay = max(min(MIN_RETRY_DELAY * 2 ** (failures - 1), self.max_backoff), retry_after or 0)
+            self._retry_at[name] = time.time() + delay
+            print(f"[feeds] {name}: fetch failed ({e}), retrying in {delay:.0f}s")
+            return False
+
+    def _start_refresh(self, name):
+        task = self._inflight.get(name)
+        if task is None:
+            task = self._inflight[name] = asyncio.ensure_future(self.refresh(name))
+            task.add_done_callback(lambda _: self._inflight.pop(name, None))
+        return task
+
+    def current(self, name):
+        """The cached entry for ``name`` as it is (possibly stale), or None; never fetches."""
+        return self._entries.get(name)
+
+    async def get(self, name):
+        """Current entry for ``name``; stale entries trigger a background revalidation.
+
+        Raises ``KeyError`` for unknown feeds and ``FeedUnavailable`` when
+        nothing has ever been fetched and upstream can't be reached.
+        """
+        feed = self.feeds[name]
+        entry = self._entries.get(name)
+        if entry is not None:
+            if entry.age() < feed.ttl:
+                self.counters["hits"] += 1
+            else:
+                self.counters["stale"] += 1
+                if self.can_request(name) or name in self._inflight:
+                    self._start_refresh(name)
+            return entry
+        # Every concurrent first request waits on the same fetch
+        await asyncio.shield(self._start_refresh(name))
+        entry = self._entries.get(name)
+        if entry is None:
+            raise FeedUnavailable(f"{name}: nothing cached and upstream unreachable")
+        return entry
+
+    def status(self):
+        now = time.time()
+        feeds = {}
+        for name, feed in self.feeds.items():
+            entry = self._entries.get(name)
+            feeds[name] = {
+                "loaded": entry is not None,
+                "age_seconds": round(entry.age(now)) if entry else None,
+                "stale": entry is None or entry.age(now) >= feed.ttl,
+                "source": entry.source if entry else None,
+                "failures": self._failures.get(name, 0),
+            }
+        return {"feeds": feeds, **self.counters}
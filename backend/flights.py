@@ -0,0 +1,239 @@
+"""Aircraft state ingestion from OpenSky ``states/all`` polls.
+
+Every poll is a complete picture of the world, so each one is parsed into a
+fresh, immutable ``FlightSnapshot``: NumPy columns sorted by ICAO 24-bit
+address, a ``GridIndex`` over positions, and a short per-aircraft history
+carried over from the previous snapshot by a sorted join.  Requests read
+whichever snapshot is current without locks.
+
+Between polls, positions are dead-reckoned from each aircraft's reported
+ground speed and track (or, when those are missing, from the last two
+positions in its history), capped at ``max_extrapolation`` seconds; past
+that cap aircraft hold their position, and callers report each one's
+``position_age`` instead of projecting it further.  ``max_age`` is judged
+at poll time, so an aircraft stays until the next poll no matter how far
+apart polls are, and one that left coverage drops out with it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import time
+
+import numpy as np
+
+from spatial import GridIndex, bbox_mask
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib parser
+    orjson = None
+
+_METERS_PER_DEGREE = 111_320.0
+# OpenSky state vector fields
+ICAO24, CALLSIGN, COUNTRY, TIME_POSITION, LAST_CONTACT, LON, LAT, BARO_ALTITUDE, ON_GROUND, \
+    VELOCITY, TRUE_TRACK, VERTICAL_RATE = range(12)
+
+
+def _floats(values):
+    return np.fromiter((np.nan if value is None else value for value in values), dtype=float, count=len(values))
+
+
+def parse_states(content):
+    """OpenSky ``states/all`` JSON to a dict of columns, one row per aircraft with a position."""
+    data = orjson.loads(content) if orjson is not None else json.loads(content)
+    states = [state for state in data.get("states") or []
+              if state[LON] is not None and state[LAT] is not None and state[ICAO24]]
+    addresses = []
+    for state in states:
+        try:
+            addresses.append(int(state[ICAO24], 16))
+        except ValueError:
+            addresses.append(-1)
+    columns = list(zip(*states)) if states else [()] * 12
+    poll_time = float(data.get("time") or time.time())
+    position_time = _floats(columns[TIME_POSITION])
+    return {
+        "time": poll_time,
+        "icao24": np.array(addresses, dtype=np.int64),
+        "callsign": [(callsign or "").strip() for callsign in columns[CALLSIGN]],
+        "country": list(columns[COUNTRY]),
+        "lon": _floats(columns[LON]),
+        "lat": _floats(columns[LAT]),
+        "altitude": _floats(columns[BARO_ALTITUDE]).astype(np.float32),
+        "on_ground": np.array(columns[ON_GROUND], dtype=bool),
+        "velocity": _floats(columns[VELOCITY]).astype(np.float32),
+        "heading": _floats(columns[TRUE_TRACK]).astype(np.float32),
+        "vertical_rate": _floats(columns[VERTICAL_RATE]).astype(np.float32),
+        "position_time": np.where(np.isnan(position_time), poll_time, position_time),
+    }
+
+
+class FlightSnapshot:
+    """One poll's aircraft as columns sorted by ICAO address, plus derived state."""
+
+    def __init__(self, columns, previous=None, history=4, cell_degrees=2.0):
+        valid = columns["icao24"] >= 0
+        # Sorted and de-duplicated by address, so snapshots join with searchsorted
+        _, rows = np.unique(columns["icao24"][valid], return_index=True)
+        rows = np.flatnonzero(valid)[rows]
+        self.time = columns["time"]
+        self.icao24 = columns["icao24"][rows]
+        self.callsign = [columns["callsign"][row] for row in rows.tolist()]
+        self.country = [columns["country"][row] for row in rows.tolist()]
+        for name in ("lon", "lat", "altitude", "on_ground", "velocity", "heading", "vertical_rate",
+                     "position_time"):
+            setattr(self, name, columns[name][rows])
+        self._carry_history(previous, history)
+        self._estimate_velocity()
+        self.index = GridIndex(cell_degrees)
+        for row, (lat, lon) in enumerate(zip(self.lat.tolist(), self.lon.tolist())):
+            self.index.update(row, lat, lon)
+
+    def __len__(self):
+        return len(self.icao24)
+
+    def _carry_history(self, previous, depth):
+        """(n, depth) lon/lat/time of recent positions, oldest first, current last, NaN padded."""
+        n = len(self)
+        self.history_lon = np.full((n, depth), np.nan)
+        self.history_lat = np.full((n, depth), np.nan)
+        self.history_time = np.full((n, depth), np.nan)
+        self.history_lon[:, -1], self.history_lat[:, -1], self.history_time[:, -1] = \
+            self.lon, self.lat, self.position_time
+        if previous is None or len(previous) == 0 or n == 0:
+            return
+        position = np.minimum(np.searchsorted(previous.icao24, self.icao24), len(previous) - 1)
+        known = np.flatnonzero(previous.icao24[position] == self.icao24)
+        old = position[known]
+        moved = self.position_time[known] > previous.position_time[old]
+        for mine, theirs in ((self.history_lon, previous.history_lon), (self.history_lat, previous.history_lat),
+                             (self.history_time, previous.history_time)):
+            # A new report shifts the history; the same report again keeps it as it was
+            mine[known[moved], :-1] = theirs[old[moved], 1:]
+            mine[known[~moved], :-1] = theirs[old[~moved], :-1]
+
+    def _estimate_velocity(self):
+        """East/north ground velocity (m/s) from speed and track, else from the last two positions."""
+        track = np.radians(self.heading.astype(float))
+        speed = self.velocity.astype(float)
+        self.v_east = speed * np.sin(track)
+        self.v_north = speed * np.cos(track)
+        missing = ~(np.isfinite(self.v_east) & np.isfinite(self.v_north))
+        if missing.any():
+            dt = self.history_time[missing, -1] - self.history_time[missing, -2]
+            ok = np.isfinite(dt) & (dt > 0)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                v_north = (self.history_lat[missing, -1] - self.history_lat[missing, -2]) * _METERS_PER_DEGREE / dt
+                dlon = (self.history_lon[missing, -1] - self.history_lon[missing, -2] + 180.0) % 360.0 - 180.0
+                v_east = dlon * _METERS_PER_DEGREE * np.cos(np.radians(self.lat[missing])) / dt
+            self.v_east[missing] = np.where(ok, v_east, 0.0)
+            self.v_north[missing] = np.where(ok, v_north, 0.0)
+        speeds = np.hypot(self.v_east, self.v_north)
+        self.max_speed = float(speeds.max()) if len(speeds) else 0.0
+
+    def positions(self, rows, now, max_extrapolation):
+        """Dead-reckoned (lon, lat) of ``rows`` at ``now``."""
+        dt = np.clip(now - self.position_time[rows], 0.0, max_extrapolation)
+        lat = self.lat[rows] + self.v_north[rows] * dt / _METERS_PER_DEGREE
+        cos_lat = np.maximum(np.cos(np.radians(self.lat[rows])), 0.01)
+        lon = self.lon[rows] + self.v_east[rows] * dt / (_METERS_PER_DEGREE * cos_lat)
+        return (lon + 180.0) % 360.0 - 180.0, np.clip(lat, -90.0, 90.0)
+
+    def row(self, icao24):
+        position = int(np.searchsorted(self.icao24, icao24))
+        if position < len(self) and self.icao24[position] == icao24:
+            return position
+        return None
+
+
+class FlightEngine:
+    """Holds the current ``FlightSnapshot`` and answers viewport queries against it."""
+
+    def __init__(self, history=4, max_extrapolation=120.0, max_age=300.0, cell_degrees=2.0):
+        self.history_depth = history
+        self.max_extrapolation = max_extrapolation
+        self.max_age = max_age
+        self.cell_degrees = cell_degrees
+        self.snapshot = None
+        self.polls = 0
+        self._source = None
+
+    def ingest(self, content):
+        """Parse one ``states/all`` payload and swap in the resulting snapshot."""
+        snapshot = FlightSnapshot(parse_states(content), self.snapshot, self.history_depth, self.cell_degrees)
+        self.snapshot = snapshot
+        self.polls += 1
+        return snapshot
+
+    def _candidates(self, snapshot, bbox):
+        if bbox is None:
+            return np.arange(len(snapshot))
+        west, south, east, north = bbox
+        # Aircraft may have flown into the box since their reported position
+        pad = snapshot.max_speed * self.max_extrapolation / _METERS_PER_DEGREE
+        poleward = min(max(abs(south), abs(north)) + pad, 89.0)
+        lon_pad = pad / math.cos(math.radians(poleward))
+        width = east - west if west <= east else east - west + 360.0
+        if pad == 0:
+            candidates = snapshot.index.query(west, south, east, north)
+        elif width + 2 * lon_pad >= 360.0:
+            candidates = snapshot.index.query(-180.0, max(south - pad, -90.0), 180.0, min(north + pad, 90.0))
+        else:
+            candidates = snapshot.index.query((west - lon_pad + 180.0) % 360.0 - 180.0, max(south - pad, -90.0),
+                                              (east + lon_pad + 180.0) % 360.0 - 180.0, min(north + pad, 90.0))
+        return np.arange(len(snapshot)) if candidates is None else np.sort(candidates)
+
+    def query(self, bbox=None, limit=None, now=None):
+        """Aircraft heard from within ``max_age`` of the poll and (dead-reckoned) inside ``bbox``.
+
+        Returns ``(snapshot, rows, lon, lat)``; with ``limit``, the most
+        recently reported aircraft are kept.
+        """
+        snapshot = self.snapshot
+        if snapshot is None:
+            empty = np.empty(0)
+            return None, np.empty(0, dtype=np.int64), empty, empty
+        now = time.time() if now is None else now
+        rows = self._candidates(snapshot, bbox)
+        rows = rows[snapshot.time - snapshot.position_time[rows] <= self.max_age]
+        lon, lat = snapshot.positions(rows, now, self.max_extrapolation)
+        if bbox is not None:
+            inside = bbox_mask(lon, lat, *bbox)
+            rows, lon, lat = rows[inside], lon[inside], lat[inside]
+        if limit is not None and len(rows) > limit:
+            newest = np.sort(np.argpartition(-snapshot.position_time[rows], limit - 1)[:limit])
+            rows, lon, lat = rows[newest], lon[newest], lat[newest]
+        return snapshot, rows, lon, lat
+
+    def history(self, icao24):
+        """Recent reported positions of one aircraft as (time, lon, lat) arrays, or None."""
+        snapshot = self.snapshot
+        row = None if snapshot is None else snapshot.row(icao24)
+        if row is None:
+            return None
+        known = np.isfinite(snapshot.history_time[row])
+        return snapshot.history_time[row][known], snapshot.history_lon[row][known], snapshot.history_lat[row][known]
+
+    async def run(self, fetch, interval=30.0):
+        """Background task ingesting ``await fetch()`` (an object with ``body`` and ``tag``) when it changes."""
+        while True:
+            try:
+                entry = await fetch()
+                if entry is not None and entry.tag != self._source:
+                    snapshot = await asyncio.to_thread(self.ingest, entry.body)
+                    self._source = entry.tag
+                    print(f"[flights] {len(snapshot)} aircraft")
+            except Exception as e:
+                print(f"[flights] ingest failed: {e}")
+            await asyncio.sleep(interval)
+
+    def stats(self):
+        snapshot = self.snapshot
+        return {
+            "aircraft": len(snapshot) if snapshot is not None else 0,
+            "polls": self.polls,
+            "age_seconds": round(time.time() - snapshot.time) if snapshot is not None else None,
+        }
@@ -0,0 +1,64 @@
+"""Build GeoJSON point FeatureCollections from column arrays.
+
+Large layers (satellite groups, ships) keep their data as NumPy columns.
+Coordinates, and any property column given a number of digits, are rounded
+in one vectorized step per column; each row then becomes a plain feature
+dict and the whole collection is serialized once with ``encode_json``
+(orjson when it is installed).
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from response_cache import encode_json
+
+
+def column_values(values, digits=None):
+    """Python values for every row of a column.
+
+    NumPy arrays are rounded to ``digits`` decimals (when given) in one
+    vectorized step; NaN and infinities become ``None`` (JSON ``null``).
+    Other sequences are passed through, except for non-finite floats.
+    """
+    if not isinstance(values, np.ndarray):
+        return [None if isinstance(value, float) and not math.isfinite(value) else value
+                for value in values]
+    if values.dtype.kind in "biu":
+        return values.tolist()
+    array = values.astype(float)
+    if digits is not None:
+        array = np.round(array, digits)
+    result = array.tolist()
+    for i in np.flatnonzero(~np.isfinite(array)).tolist():
+        result[i] = None
+    return result
+
+
+def point_features(lon, lat, properties=(), precision=5):
+    """One Point Feature dict per row.
+
+    ``properties`` is a sequence of ``(name, values)`` or
+    ``(name, values, digits)`` columns, all the same length as ``lon``.
+    Coordinates are rounded to ``precision`` decimals (5 is about a meter).
+    """
+    coordinates = zip(column_values(np.asarray(lon), precision), column_values(np.asarray(lat), precision))
+    features = [
+        {"type": "Feature", "geometry": {"type": "Point", "coordinates": [x, y]}, "properties": {}}
+        for x, y in coordinates
+    ]
+    # Filled a column at a time: cheaper than zipping every row into a new dict
+    for column in properties:
+        name = column[0]
+        for feature, value in zip(features, column_values(column[1], column[2] if len(column) > 2 else None)):
+            feature["properties"][name] = value
+    return features
+
+
+def feature_collection(*feature_lists):
+    """Encode lists of feature dicts as one FeatureCollection body (bytes)."""
+    features = feature_lists[0] if len(feature_lists) == 1 else [
+        feature for features in feature_lists for feature in features]
+    return encode_json({"type": "FeatureCollection", "features": features})
@@ -0,0 +1,281 @@
+"""Incremental push channel for live map layers.
+
+Each ``LiveLayer`` keeps the latest state of its entities and a numbered
+history of deltas (added / moved / removed since the previous sequence
+number).  Deltas are JSON-encoded once and the same bytes are queued to
+every subscriber; only clients that subscribe with a bounding box get a
+per-client filtered copy.
+
+Clients connect to a WebSocket and send ``{"subscribe": layer, "since": seq,
+"bbox": [w, s, e, n]}``.  If ``since`` is still covered by the history they
+receive the missing deltas, otherwise a full snapshot.  Every client has a
+bounded send queue; when a slow client overflows it, its queue is dropped
+and it is resynchronized with a fresh snapshot instead of buffering forever.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+
+from response_cache import encode_json
+from spatial import bbox_mask
+
+DEFAULT_HISTORY = 120
+DEFAULT_QUEUE_SIZE = 64
+
+# Queue marker telling a client's sender to resend snapshots
+RESYNC = object()
+
+
+class Delta:
+    __slots__ = ("seq", "added", "moved", "removed", "_body")
+
+    def __init__(self, seq, added, moved, removed):
+        self.seq = seq
+        self.added = added      # [(id, properties, move)]
+        self.moved = moved      # [(id, move)]
+        self.removed = removed  # [id]
+        self._body = None
+
+
+class LiveLayer:
+    """Current entity state plus a short history of numbered deltas.
+
+    ``move_fields`` names the values in each entity's move tuple; the first
+    two are always longitude and latitude, the rest are merged into the
+    feature properties on the client.
+    """
+
+    def __init__(self, name, move_fields, history=DEFAULT_HISTORY):
+        self.name = name
+        self.move_fields = list(move_fields)
+        self.seq = 0
+        self.entities = {}  # id -> (properties, move)
+        self.subscribers = set()
+        self._history = deque(maxlen=history)
+        self._snapshot = None  # (seq, body)
+
+    def feature(self, entity_id, properties, move):
+        props = dict(properties)
+        props.update(zip(self.move_fields[2:], move[2:]))
+        return {
+            "type": "Feature",
+            "id": entity_id,
+            "geometry": {"type": "Point", "coordinates": [move[0], move[1]]},
+            "properties": props,
+        }
+
+    def apply(self, upserts, removed=()):
+        """Merge ``upserts`` ({id: (properties, move)}) and ``removed`` ids.
+
+        Returns the new ``Delta`` (already fanned out to subscribers), or
+        None if nothing actually changed.
+        """
+        entities = self.entities
+        added, moved = [], []
+        for entity_id, (properties, move) in upserts.items():
+            current = entities.get(entity_id)
+            if current is None or current[0] != properties:
+                added.append((entity_id, properties, move))
+            elif current[1] != move:
+                moved.append((entity_id, move))
+            else:
+                continue
+            entities[entity_id] = (properties, move)
+        gone = [entity_id for entity_id in removed if entities.pop(entity_id, None) is not None]
+        if not (added or moved or gone):
+            return None
+        self.seq += 1
+        delta = Delta(self.seq, added, moved, gone)
+        self._history.append(delta)
+        for subscription in list(self.subscribers):
+            subscription.push(delta)
+        return delta
+
+    def replace(self, state):
+        """Make ``state`` the complete entity set, removing anything missing."""
+        removed = [entity_id for entity_id in self.entities if entity_id not in state]
+        return self.apply(state, removed)
+
+    def delta_body(self, delta):
+        if delta._body is None:
+            delta._body = encode_json(self._delta_message(
+                delta.seq,
+                [self.feature(*entity) for entity in delta.added],
+                [[entity_id, *move] for entity_id, move in delta.moved],
+                delta.removed,
+            ))
+        return delta._body
+
+    def _delta_message(self, seq, added, moved, removed):
+        return {
+            "type": "delta",
+            "layer": self.name,
+            "seq": seq,
+            "added": added,
+            "moved": moved,
+            "removed": removed,
+        }
+
+    def snapshot_message(self, entities):
+        return {
+            "type": "snapshot",
+            "layer": self.name,
+            "seq": self.seq,
+            "fields": self.move_fields,
+            "features": [self.feature(entity_id, properties, move)
+                         for entity_id, (properties, move) in entities],
+        }
+
+    def snapshot_body(self):
+        if self._snapshot is None or self._snapshot[0] != self.seq:
+            self._snapshot = (self.seq, encode_json(self.snapshot_message(self.entities.items())))
+        return self._snapshot[1]
+
+    def deltas_since(self, seq):
+        """Deltas after ``seq``, or None if the history no longer reaches back that far."""
+        if seq > self.seq:
+            return None
+        if seq == self.seq:
+            return []
+        if not self._history or self._history[0].seq > seq + 1:
+            return None
+        return [delta for delta in self._history if delta.seq > seq]
+
+
+class Subscription:
+    """One client's view of one layer, optionally restricted to a bbox."""
+
+    def __init__(self, client, layer, bbox=None):
+        self.client = client
+        self.layer = layer
+        self.bbox = bbox
+        self.known = set()
+
+    def _in_bbox(self, move):
+        return bool(bbox_mask(move[0], move[1], *self.bbox))
+
+    def push(self, delta):
+        if self.bbox is None:
+            self.client.enqueue(self.layer.delta_body(delta))
+            return
+        message = self.filter(delta)
+        if message is not None:
+            self.client.enqueue(encode_json(message))
+
+    def filter(self, delta):
+        """Translate a layer delta into this client's viewport."""
+        layer, known = self.layer, self.known
+        added, moved, removed = [], [], []
+        for entity_id, properties, move in delta.added:
+            if self._in_bbox(move):
+                known.add(entity_id)
+                added.append(layer.feature(entity_id, properties, move))
+            elif entity_id in known:
+                known.discard(entity_id)
+                removed.append(entity_id)
+        for entity_id, move in delta.moved:
+            if self._in_bbox(move):
+                if entity_id in known:
+                    moved.append([entity_id, *move])
+                else:
+                    known.add(entity_id)
+                    added.append(layer.feature(entity_id, *layer.entities[entity_id]))
+            elif entity_id in known:
+                known.discard(entity_id)
+                removed.append(entity_id)
+        for entity_id in delta.removed:
+            if entity_id in known:
+                known.discard(entity_id)
+                removed.append(entity_id)
+        if not (added or moved or removed):
+            return None
+        return layer._delta_message(delta.seq, added, moved, removed)
+
+    def snapshot(self):
+        if self.bbox is None:
+            return self.layer.snapshot_body()
+        entities = [(entity_id, entity) for entity_id, entity in self.layer.entities.items()
+                    if self._in_bbox(entity[1])]
+        self.known = {entity_id for entity_id, _ in entities}
+        return encode_json(self.layer.snapshot_message(entities))
+
+    def catch_up(self, since):
+        """Bodies bringing a client at ``since`` up to date."""
+        deltas = None if since is None or self.bbox is not None else self.layer.deltas_since(since)
+        if deltas is None:
+            return [self.snapshot()]
+        return [self.layer.delta_body(delta) for delta in deltas]
+
+
+class LiveClient:
+    """A connected dashboard: subscriptions plus a bounded outgoing queue."""
+
+    def __init__(self, queue_size=DEFAULT_QUEUE_SIZE):
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.subscriptions = {}
+        self.resyncs = 0
+
+    def enqueue(self, body):
+        try:
+            self.queue.put_nowait(body)
+        except asyncio.QueueFull:
+            self.overflow()
+
+    def overflow(self):
+        """Drop everything queued and schedule fresh snapshots instead."""
+        self.resyncs += 1
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(RESYNC)
+
+    def subscribe(self, layer, since=None, bbox=None):
+        self.unsubscribe(layer.name)
+        subscription = Subscription(self, layer, bbox)
+        self.subscriptions[layer.name] = subscription
+        layer.subscribers.add(subscription)
+        for body in subscription.catch_up(since):
+            self.enqueue(body)
+
+    def unsubscribe(self, name):
+        subscription = self.subscriptions.pop(name, None)
+        if subscription is not None:
+            subscription.layer.subscribers.discard(subscription)
+
+    def close(self):
+        for name in list(self.subscriptions):
+            self.unsubscribe(name)
+
+    async def next_bodies(self):
+        """Wait for the next message(s) to send; expands resync markers into snapshots."""
+        item = await self.queue.get()
+        if item is RESYNC:
+            return [subscription.snapshot() for subscription in self.subscriptions.values()]
+        return [item]
+
+
+class LiveHub:
+    """Registry of live layers and connected clients."""
+
+    def __init__(self):
+        self.layers = {}
+        self.clients = set()
+
+    def add_layer(self, name, move_fields):
+        layer = self.layers.get(name)
+        if layer is None:
+            layer = self.layers[name] = LiveLayer(name, move_fields)
+        return layer
+
+    def subscribed(self, name):
+        layer = self.layers.get(name)
+        return layer is not None and bool(layer.subscribers)
+
+    def stats(self):
+        return {
+            "clients": len(self.clients),
+            "layers": {name: {"seq": layer.seq, "entities": len(layer.entities),
+                              "subscribers": len(layer.subscribers)}
+                       for name, layer in self.layers.items()},
+        }
@@ -0,0 +1,240 @@
+"""Precomputed lunar ephemeris table with interpolated lookups.
+
+The Moon's subpoint, distance, phase angle and illumination change slowly
+and smoothly, so instead of running several apparent-position reductions
+per request they are sampled once over a rolling window (a day behind to
+``days_ahead`` ahead, one vectorized pass) and linearly interpolated.
+Lookups are an index computation plus a few multiplications; phase events
+and moonrise/moonset for any location are derived from the same arrays.
+
+The table is filled by a ``sample(seconds)`` callable returning arrays for
+an array of Unix timestamps, so it does not depend on where the ephemeris
+comes from (``main.py`` uses Skyfield and DE421).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+PHASE_NAMES = [
+    "moon-new-moon",        # 0
+    "moon-waxing-crescent", # 1
+    "moon-first-quarter",   # 2
+    "moon-waxing-gibbous",  # 3
+    "moon-full-moon",       # 4
+    "moon-waning-gibbous",  # 5
+    "moon-last-quarter",    # 6
+    "moon-waning-crescent", # 7
+]
+# Principal phases at phase angles 0, 90, 180, 270
+QUARTER_NAMES = ["new-moon", "first-quarter", "full-moon", "last-quarter"]
+
+EARTH_RADIUS_KM = 6378.14
+# Apparent radius of the Moon divided by its horizontal parallax
+_SEMIDIAMETER_RATIO = 0.2725
+# Standard atmospheric refraction at the horizon, degrees
+_HORIZON_REFRACTION = 0.5667
+
+
+def phase_name(phase_angle):
+    """Map a Sun-Moon ecliptic longitude difference (degrees) to one of 8 named phases."""
+    return PHASE_NAMES[int((phase_angle + 22.5) / 45.0) % 8]
+
+
+SOLAR_ECLIPSES = ["Partial", "Annular", "Total", "Hybrid"]
+
+
+def solar_eclipses(new_moon_jd):
+    """Classify new moons (TT Julian dates) as solar eclipses, -1 where there is none.
+
+    Meeus, Astronomical Algorithms ch. 54: ``gamma`` is the distance of the
+    shadow axis from the Earth's centre and ``u`` the umbral radius, both in
+    Earth radii on the fundamental plane; some eclipse is visible from Earth
+    when |gamma| < 1.5433 + u, and it is central when |gamma| < 0.9972.
+    Returns indexes into ``SOLAR_ECLIPSES``.
+    """
+    jd = np.atleast_1d(np.asarray(new_moon_jd, dtype=float))
+    k = np.round((jd - 2451550.09766) / 29.530588861)
+    T = k / 1236.85
+    E = 1 - 0.002516 * T - 0.0000074 * T**2
+    M = np.radians(2.5534 + 29.10535670 * k - 0.0000014 * T**2 - 0.00000011 * T**3)
+    Mp = np.radians(201.5643 + 385.81693528 * k + 0.0107582 * T**2 + 0.00001238 * T**3
+                    - 0.000000058 * T**4)
+    F = np.radians(160.7108 + 390.67050284 * k - 0.0016118 * T**2 - 0.00000227 * T**3
+                   + 0.000000011 * T**4)
+    omega = np.radians(124.7746 - 1.56375588 * k + 0.0020672 * T**2 + 0.00000215 * T**3)
+    F1 = F - np.radians(0.02665) * np.sin(omega)
+
+    P = (0.2070 * E * np.sin(M) + 0.0024 * E * np.sin(2 * M) - 0.0392 * np.sin(Mp)
+         + 0.0116 * np.sin(2 * Mp) - 0.0073 * E * np.sin(Mp + M) + 0.0067 * E * np.sin(Mp - M)
+         + 0.0118 * np.sin(2 * F1))
+    Q = (5.2207 - 0.0048 * E * np.cos(M) + 0.0020 * E * np.cos(2 * M) - 0.3299 * np.cos(Mp)
+         - 0.0060 * E * np.cos(Mp + M) + 0.0041 * E * np.cos(Mp - M))
+    gamma = (P * np.cos(F1) + Q * np.sin(F1)) * (1 - 0.0048 * np.abs(np.cos(F1)))
+    u = (0.0059 + 0.0046 * E * np.cos(M) - 0.0182 * np.cos(Mp) + 0.0004 * np.cos(2 * Mp)
+         - 0.0005 * np.cos(M + Mp))
+
+    g = np.abs(gamma)
+    kind = np.full(len(jd), -1)
+    kind[g < 1.5433 + u] = 0
+    central = g < 0.9972
+    # Umbra short of the Earth's surface: annular; reaching it only near the
+    # middle of the path: hybrid (annular at the ends of the track)
+    kind[central & (u < 0)] = 2
+    kind[central & (u > 0.0047)] = 1
+    between = central & (u >= 0) & (u <= 0.0047)
+    hybrid = u < 0.00464 * np.sqrt(np.clip(1 - gamma**2, 0, None))
+    kind[between & hybrid] = 3
+    kind[between & ~hybrid] = 1
+    return kind
+
+
+def iso(seconds):
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _crossings(seconds, values):
+    """Interpolated times where ``values`` changes sign, and the direction (+1 rising)."""
+    sign = np.signbit(values)
+    idx = np.flatnonzero(sign[:-1] != sign[1:])
+    v0, v1 = values[idx], values[idx + 1]
+    fraction = v0 / (v0 - v1)
+    times = seconds[idx] + fraction * (seconds[idx + 1] - seconds[idx])
+    return times, np.where(v1 > v0, 1, -1)
+
+
+class LunarTable:
+    """Rolling, evenly spaced samples of the Moon's state.
+
+    ``sample(seconds)`` must return a dict with ``latitude``, ``longitude``,
+    ``distance_km``, ``phase_angle`` (degrees, 0 = new) and
+    ``illumination`` (0..1) arrays.
+    """
+
+    def __init__(self, sample, step_seconds=60, past_hours=24, days_ahead=30, refresh_hours=6):
+        self.sample = sample
+        self.step_seconds = step_seconds
+        self.past_seconds = past_hours * 3600.0
+        self.future_seconds = days_ahead * 86400.0
+        self.refresh_seconds = refresh_hours * 3600.0
+        self.builds = 0
+        self._table = None
+
+    def build(self, now=None):
+        """Recompute the whole window around ``now`` in one vectorized pass."""
+        now = time.time() if now is None else now
+        anchor = now - now % self.step_seconds
+        start = anchor - self.past_seconds
+        count = int((self.past_seconds + self.future_seconds) // self.step_seconds) + 1
+        seconds = start + self.step_seconds * np.arange(count, dtype=float)
+        data = self.sample(seconds)
+        # Unwrap angles so neighbouring samples can be interpolated linearly
+        self._table = (
+            anchor,
+            seconds,
+            np.asarray(data["latitude"], dtype=float),
+            np.degrees(np.unwrap(np.radians(data["longitude"]))),
+            np.asarray(data["distance_km"], dtype=float),
+            np.degrees(np.unwrap(np.radians(data["phase_angle"]))),
+            np.asarray(data["illumination"], dtype=float),
+        )
+        self.builds += 1
+
+    def needs_build(self, now=None):
+        now = time.time() if now is None else now
+        return self._table is None or abs(now - self._table[0]) >= self.refresh_seconds
+
+    def ensure(self, now=None):
+        """Build synchronously only if ``now`` is not covered at all; ``run`` handles refreshes."""
+        now = time.time() if now is None else now
+        table = self._table
+        if table is None or not table[1][0] <= now <= table[1][-1]:
+            self.build(now)
+
+    def _position(self, now):
+        _, seconds, *_ = self._table
+        x = (now - seconds[0]) / self.step_seconds
+        if not 0 <= x <= len(seconds) - 1:
+            raise ValueError(f"{iso(now)} is outside the lunar table window")
+        i = min(int(x), len(seconds) - 2)
+        return i, x - i
+
+    def at(self, now=None):
+        """Interpolated Moon state at ``now``, in the ``/api/moon`` response shape."""
+        now = time.time() if now is None else now
+        self.ensure(now)
+        _, _, lat, lon, distance, phase, illumination = self._table
+        i, f = self._position(now)
+
+        def lerp(column):
+            return float(column[i] + f * (column[i + 1] - column[i]))
+
+        phase_angle = lerp(phase) % 360.0
+        return {
+            "latitude": lerp(lat),
+            "longitude": (lerp(lon) + 180.0) % 360.0 - 180.0,
+            "phase_name": phase_name(phase_angle),
+            "illumination": lerp(illumination),
+            "phase_angle": phase_angle,
+            "distance_km": lerp(distance),
+        }
+
+    def next_phases(self, now=None, count=4):
+        """The next ``count`` principal phases (new, first quarter, full, last quarter) in the window."""
+        now = time.time() if now is None else now
+        self.ensure(now)
+        _, seconds, _, _, _, phase, _ = self._table
+        i, f = self._position(now)
+        current = phase[i] + f * (phase[i + 1] - phase[i])
+        first = int(np.floor(current / 90.0)) + 1
+        targets = 90.0 * np.arange(first, first + count)
+        targets = targets[targets <= phase[-1]]
+        # Phase angle increases monotonically (the Moon always gains on the Sun)
+        times = np.interp(targets, phase, seconds)
+        return [
+            {"phase": QUARTER_NAMES[int(round(target / 90.0)) % 4], "time": iso(t), "timestamp": float(t)}
+            for target, t in zip(targets.tolist(), times.tolist())
+        ]
+
+    def altitude(self, latitude, longitude, start=None, end=None):
+        """Geocentric Moon altitude (degrees) at a location for every sample in [start, end]."""
+        _, seconds, lat, lon, distance, _, _ = self._table
+        mask = np.ones(len(seconds), dtype=bool)
+        if start is not None:
+            mask &= seconds >= start - self.step_seconds
+        if end is not None:
+            mask &= seconds <= end + self.step_seconds
+        phi, dec = np.radians(latitude), np.radians(lat[mask])
+        hour_angle = np.radians(longitude - lon[mask])
+        sin_alt = np.sin(phi) * np.sin(dec) + np.cos(phi) * np.cos(dec) * np.cos(hour_angle)
+        return seconds[mask], np.degrees(np.arcsin(np.clip(sin_alt, -1.0, 1.0))), distance[mask]
+
+    def rise_set(self, latitude, longitude, now=None, hours=48):
+        """Moonrise and moonset times at a location within the next ``hours``."""
+        now = time.time() if now is None else now
+        self.ensure(now)
+        end = now + hours * 3600.0
+        seconds, altitude, distance = self.altitude(latitude, longitude, now, end)
+        # Rise/set is when the upper limb touches the refracted horizon, seen from the surface
+        parallax = np.degrees(np.arcsin(EARTH_RADIUS_KM / distance))
+        horizon = (1.0 - _SEMIDIAMETER_RATIO) * parallax - _HORIZON_REFRACTION
+        times, direction = _crossings(seconds, altitude - horizon)
+        keep = (times >= now) & (times <= end)
+        return [
+            {"event": "rise" if d > 0 else "set", "time": iso(t), "timestamp": float(t)}
+            for t, d in zip(times[keep].tolist(), direction[keep].tolist())
+        ]
+
+    async def run(self, interval=300):
+        """Background task rebuilding the table off the event loop as the window slides."""
+        while True:
+            if self.needs_build():
+                try:
+                    await asyncio.to_thread(self.build)
+                except Exception as e:
+                    print(f"[moon] ephemeris table build failed: {e}")
+            await asyncio.sleep(interval)
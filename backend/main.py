@@ -1,21 +1,239 @@
-from fastapi import FastAPI
-from skyfield.api import load, wgs84, EarthSatellite
-from skyfield import almanac
-from datetime import datetime, timezone, timedelta
+from fastapi import FastAPI, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
+from skyfield.api import wgs84, EarthSatellite
+from skyfield import almanac, eclipselib
+from skyfield.framelib import ecliptic_frame
+import hashlib
 import json
 import os
-import requests
+import time
+from typing import Optional
+
+import numpy as np
+
+import upstream
+from ais import AisIngest
+from ais_regions import AisRegions, parse_regions, to_aisstream
+from almanac_cache import AlmanacCache
+from compute import EndpointLimits, process_pool_enabled, run_compute, run_process, shutdown_executors
+from conjunctions import ConjunctionService
+from feeds import Feed, FeedCache, FeedUnavailable
+from flights import FlightEngine
+from geojson_points import feature_collection, point_features
+from live import LiveClient, LiveHub
+from lunar import SOLAR_ECLIPSES, LunarTable, iso, solar_eclipses
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, LAG_BUCKETS, Registry, RequestMetrics, current_profile, monitor_event_loop
+from packed import MEDIA_TYPE as PACKED_MEDIA_TYPE, MIN_COMPRESS_SIZE, choose_encoding, compress, pack_points, wants_packed
+from passes import Observer, PassPredictor
+from propagation import Constellation, epoch_times, subpoints_from_file, unix_seconds
+from response_cache import ResponseCache, encode_json
+from shared_state import SharedShipView, run_snapshot_writer, shared_dir, ship_snapshot_path
+from ship_store import ShipStore
+from spatial import cluster_cell_degrees, cluster_points, parse_bbox
+from startup import StartupTimer, data_dir, load_timescale, open_ephemeris
+from terminator import terminator_features
+from tle_catalog import BUNDLED_DIR, TLECatalog
+from track import TrackEngine, split_antimeridian
+from vessel_tracks import VesselTrackStore
+from volcanoes import ALERT_LEVELS, VolcanoIndex, VolcanoLayer
 
 app = FastAPI()
+startup_timer = StartupTimer()
+
+# Deployment role (AETHRA_ROLE). "standalone" runs everything in one process. To scale
+# across cores, run a single "ingest" process (AIS feed, TLE downloads) next to any
+# number of "api" workers, which read its state from AETHRA_SHARED_DIR and TLE files
+ROLE = os.getenv("AETHRA_ROLE", "standalone")
+if ROLE not in ("standalone", "ingest", "api"):
+    raise ValueError(f"AETHRA_ROLE must be standalone, ingest or api, not {ROLE!r}")
+SHARED_SNAPSHOT_INTERVAL = float(os.getenv("AETHRA_SHARED_SNAPSHOT_INTERVAL", 1))
+
+# Instrumentation, scraped from /metrics in the Prometheus text format. With
+# AETHRA_PROFILING=1, requests sent with X-Aethra-Profile: 1 (or ?profile=1) also
+# get a Server-Timing header splitting their time into compute, serialize and compress
+PROFILING = os.getenv("AETHRA_PROFILING", "0") == "1"
+metrics = Registry()
+http_request_duration = metrics.histogram(
+    "http_request_duration_seconds", "HTTP request latency to the first response byte",
+    ("method", "route", "status"))
+app.add_middleware(RequestMetrics, duration=http_request_duration, profiling=PROFILING)
+upstream.instrument(
+    metrics.histogram("upstream_request_duration_seconds", "Upstream HTTP request latency to response headers",
+                      ("host",)),
+    metrics.counter("upstream_errors_total", "Failed upstream HTTP requests by error or status code",
+                    ("host", "reason")))
+ais_reconnects = metrics.counter("ais_reconnects_total", "AisStream connection failures followed by a reconnect")
+ais_connected = metrics.gauge("ais_connected", "Whether the AisStream WebSocket is connected")
+event_loop_lag = metrics.histogram("event_loop_lag_seconds", "Delay in waking a sleeping task on the event loop",
+                                   buckets=LAG_BUCKETS)
+event_loop_lag_last = metrics.gauge("event_loop_lag_last_seconds", "Most recent event loop lag sample")
 
 # Initialize Skyfield
-# This will download the file if not present, which might take a moment on first run.
-ts = load.timescale()
-ephemeris = load('de421.bsp')
+# de421.bsp is prefetched into the image (python startup.py) and memory-mapped, so
+# workers share its pages; the timescale uses Skyfield's bundled tables
+with startup_timer.phase("timescale"):
+    ts = load_timescale()
+with startup_timer.phase("ephemeris"):
+    ephemeris = open_ephemeris()
 moon = ephemeris['moon']
 earth = ephemeris['earth']
 sun = ephemeris['sun']
 
+def moon_samples(seconds):
+    """
+    Moon subpoint, distance, phase angle and illumination for an array of Unix times,
+    computed in one vectorized Skyfield pass (feeds the lunar ephemeris table)
+    """
+    t = epoch_times(ts, seconds)
+    e = earth.at(t)
+    astrometric = e.observe(moon)
+    subpoint = wgs84.subpoint(astrometric)
+    # Phase angle from apparent ecliptic longitudes: 0 = new, 90 = first quarter, 180 = full
+    _, sun_lon, _ = e.observe(sun).apparent().frame_latlon(ecliptic_frame)
+    _, moon_lon, _ = astrometric.apparent().frame_latlon(ecliptic_frame)
+    return {
+        "latitude": subpoint.latitude.degrees,
+        "longitude": subpoint.longitude.degrees,
+        "distance_km": astrometric.distance().km,
+        "phase_angle": (moon_lon.degrees - sun_lon.degrees) % 360.0,
+        "illumination": almanac.fraction_illuminated(ephemeris, 'moon', t),
+    }
+
+# Lunar ephemeris: minute samples from a day ago to MOON_DAYS_AHEAD ahead, interpolated per request
+MOON_STEP_SECONDS = int(os.getenv("AETHRA_MOON_STEP_SECONDS", 60))
+MOON_DAYS_AHEAD = float(os.getenv("AETHRA_MOON_DAYS_AHEAD", 30))
+lunar_table = LunarTable(moon_samples, step_seconds=MOON_STEP_SECONDS, days_ahead=MOON_DAYS_AHEAD)
+
+def parse_locations(value):
+    """
+    Parse "Name:lat:lon;Name:lat:lon" into (name, lat, lon) tuples
+    """
+    locations = []
+    for item in filter(None, (part.strip() for part in value.split(";"))):
+        name, lat, lon = item.rsplit(":", 2)
+        locations.append((name, float(lat), float(lon)))
+    return locations
+
+# Locations reported by /api/moon/events when no lat/lon is given
+MOON_LOCATIONS = parse_locations(os.getenv("AETHRA_MOON_LOCATIONS", "Greenwich:51.4779:-0.0015"))
+
+def almanac_events(start, end):
+    """
+    Seasons, moon phases and eclipses between two Unix times, as (timestamp, kind, name)
+    Runs Skyfield's root finders once over the whole window (feeds the almanac cache)
+    """
+    t0, t1 = epoch_times(ts, start), epoch_times(ts, end)
+    events = []
+
+    t, y = almanac.find_discrete(t0, t1, almanac.seasons(ephemeris))
+    events.extend(zip(unix_seconds(t).tolist(), ["season"] * len(y),
+                      [almanac.SEASON_EVENTS[i] for i in y]))
+
+    t, y = almanac.find_discrete(t0, t1, almanac.moon_phases(ephemeris))
+    events.extend(zip(unix_seconds(t).tolist(), ["moon-phase"] * len(y),
+                      [almanac.MOON_PHASES[i] for i in y]))
+
+    new_moons = t[y == 0]
+    if len(new_moons):
+        kinds = solar_eclipses(new_moons.tt)
+        eclipses = kinds >= 0
+        events.extend(zip(unix_seconds(new_moons[eclipses]).tolist(), ["solar-eclipse"] * int(eclipses.sum()),
+                          [f"{SOLAR_ECLIPSES[i]} Solar Eclipse" for i in kinds[eclipses]]))
+
+    t, y, _ = eclipselib.lunar_eclipses(t0, t1, ephemeris)
+    events.extend(zip(unix_seconds(t).tolist(), ["lunar-eclipse"] * len(y),
+                      [f"{eclipselib.LUNAR_ECLIPSES[i]} Lunar Eclipse" for i in y]))
+    return events
+
+# Astronomical events: searched once over a long window in the background, looked up by bisection
+almanac_cache = AlmanacCache(almanac_events)
+
+# TLE catalog: parsed once, refreshed in the background (see startup_event)
+ISS_NORAD_ID = 25544
+catalog = TLECatalog(ts, os.getenv("AETHRA_TLE_DIR", os.path.join(data_dir(), "tle")), seed_dir=BUNDLED_DIR)
+with startup_timer.phase("catalog"):
+    catalog.load_from_disk()
+
+
+def get_iss():
+    snapshot = catalog.get('stations')
+    if snapshot is None or ISS_NORAD_ID not in snapshot.by_id:
+        raise HTTPException(status_code=503, detail="ISS elements not loaded yet")
+    return snapshot.by_id[ISS_NORAD_ID]
+
+# Shared result cache: every caller within the same time bucket gets the same bytes.
+# Bucket sizes (seconds) can be overridden with e.g. AETHRA_CACHE_TTL_ISS=2
+CACHE_TTLS = {
+    name: float(os.getenv(f"AETHRA_CACHE_TTL_{name.upper()}", ttl))
+    for name, ttl in {
+        "iss": 1,
+        "iss_track": 60,
+        "moon": 60,
+        "satellites": 5,
+        "terminator": 60,
+        "subpoints": 10,
+        "passes": 60,
+        "conjunctions": 60,
+        "flights": 2,
+    }.items()
+}
+response_cache = ResponseCache()
+
+# Per-endpoint concurrency limits (AETHRA_LIMIT_<NAME>), so one slow feed can't starve the rest
+limits = EndpointLimits()
+# Groups at least this large are propagated in the process pool when it is enabled
+PROCESS_POOL_MIN_SATELLITES = int(os.getenv("AETHRA_PROCESS_POOL_MIN_SATELLITES", 2000))
+
+
+async def offload(name, fn, *args):
+    """Run ``fn`` and its JSON encoding on the compute pool under ``name``'s limit."""
+    profile = current_profile()
+
+    def work():
+        with profile.phase("compute"):
+            result = fn(*args)
+        with profile.phase("serialize"):
+            return encode_json(result)
+    return await limits.run(name, run_compute(work))
+
+def layer_format(request, format):
+    """
+    Resolve ?format= / Accept into whether the packed point encoding was requested
+    """
+    if format not in (None, "geojson", "packed"):
+        raise HTTPException(status_code=400, detail="format must be geojson or packed")
+    return wants_packed(format, request.headers.get("accept"))
+
+def layer_response(body, packed, encoding=None):
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=PACKED_MEDIA_TYPE if packed else "application/json",
+                    headers=headers)
+
+async def compressed(request, body, key=None, ttl=None):
+    """
+    Compress ``body`` for the client's Accept-Encoding; with ``key``, the result is cached
+    Returns (body, encoding)
+    """
+    encoding = choose_encoding(request.headers.get("accept-encoding"))
+    if encoding is None or len(body) < MIN_COMPRESS_SIZE:
+        return body, None
+    with current_profile().phase("compress"):
+        if key is None:
+            return await run_compute(compress, body, encoding), encoding
+        return await response_cache.get_bytes_async(key + (encoding,), ttl,
+                                                    lambda: run_compute(compress, body, encoding)), encoding
+
+# Decimal places for coordinates in large GeoJSON layers (5 is about a meter)
+COORDINATE_PRECISION = int(os.getenv("AETHRA_COORDINATE_PRECISION", 5))
+
+# Orbit tracks: one sliding ring buffer per satellite, sliced per request
+TRACK_STEP_SECONDS = 30
+TRACK_PAST_MINUTES = 180
+TRACK_FUTURE_MINUTES = 180
+track_engine = TrackEngine(catalog, ts, step_seconds=TRACK_STEP_SECONDS,
+                           past_minutes=TRACK_PAST_MINUTES, future_minutes=TRACK_FUTURE_MINUTES)
+
 frontend_dist_path = os.path.join(os.path.dirname(__file__), "dist")
 if not os.path.exists(frontend_dist_path):
     @app.get("/")
@@ -23,69 +241,115 @@ if not os.path.exists(frontend_dist_path):
         return {"message": "Aethra Backend Online"}
 
 @app.get("/api/health")
-def health_check():
-    return {"status": "healthy"}
+async def health_check():
+    return {"status": "healthy", "startup": startup_timer.report()}
+
+@app.get("/api/catalog")
+async def get_catalog_status():
+    """
+    Report age, size and staleness of every TLE group in the catalog
+    """
+    return catalog.status()
 
 @app.get("/api/moon")
-def get_moon_data():
+async def get_moon_data():
+    return await response_cache.get_async(("moon",), CACHE_TTLS["moon"],
+                                          lambda: offload("moon", compute_moon_data))
+
+def compute_moon_data():
+    # Interpolated from the precomputed table; rebuilt in the background as time moves on
+    return lunar_table.at()
+
+@app.get("/api/moon/events")
+async def get_moon_events(
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lon: Optional[float] = Query(None, ge=-180, le=180),
+    hours: float = Query(48, gt=0, le=24 * 7),
+):
+    """
+    Upcoming principal moon phases, plus moonrise/moonset for the configured
+    locations (AETHRA_MOON_LOCATIONS) or the given lat/lon
+    """
+    if (lat is None) != (lon is None):
+        raise HTTPException(status_code=400, detail="lat and lon must be given together")
+    locations = MOON_LOCATIONS if lat is None else [("Requested location", lat, lon)]
+    return await offload("moon", compute_moon_events, locations, hours)
+
+def compute_moon_events(locations, hours):
+    return {
+        "phases": lunar_table.next_phases(),
+        "locations": [
+            {
+                "name": name,
+                "latitude": lat,
+                "longitude": lon,
+                "events": lunar_table.rise_set(lat, lon, hours=hours)
+            }
+            for name, lat, lon in locations
+        ]
+    }
+
+@app.get("/api/terminator")
+async def get_terminator(resolution: float = Query(2, ge=0.25, le=10, description="Longitude step in degrees")):
+    """
+    Day side, night side and civil/nautical/astronomical twilight bands as GeoJSON polygons
+    Computed once per cache bucket from the solar subpoint and shared by every client
+    """
+    return await response_cache.get_async(("terminator", resolution), CACHE_TTLS["terminator"],
+                                          lambda: offload("terminator", compute_terminator, resolution))
+
+def compute_terminator(resolution):
     t = ts.now()
-    
-    # Position
-    astrometric = earth.at(t).observe(moon)
-    subpoint = wgs84.subpoint(astrometric)
-    
-    # Phase calculation
-    # Calculate phase angle to determine the correct image
-    e = earth.at(t)
-    
-    # Use ecliptic frame for phase angle calculation
-    from skyfield.framelib import ecliptic_frame
-    _, sun_lon, _ = e.observe(sun).apparent().frame_latlon(ecliptic_frame)
-    _, moon_lon, _ = e.observe(moon).apparent().frame_latlon(ecliptic_frame)
-    
-    phase_angle = (moon_lon.degrees - sun_lon.degrees) % 360.0
-    
-    # Map angle to 8 phases
-    # 0 = New, 90 = First Quarter, 180 = Full, 270 = Last Quarter
-    # Segments are centered on these:
-    # New: 337.5 - 22.5
-    # Waxing Crescent: 22.5 - 67.5
-    # First Quarter: 67.5 - 112.5
-    # ...
-    
-    phase_idx = int((phase_angle + 22.5) / 45.0) % 8
-    
-    phases = [
-        "moon-new-moon",       # 0
-        "moon-waxing-crescent",# 1
-        "moon-first-quarter",  # 2
-        "moon-waxing-gibbous", # 3
-        "moon-full-moon",      # 4
-        "moon-waning-gibbous", # 5
-        "moon-last-quarter",   # 6
-        "moon-waning-crescent" # 7
-    ]
-    phase_name = phases[phase_idx]
-    
-    # Fraction illuminated
-    percent = almanac.fraction_illuminated(ephemeris, 'moon', t)
+    subpoint = sun_subpoint(t)
+    features = terminator_features(subpoint.latitude.degrees, subpoint.longitude.degrees,
+                                   resolution, t.utc_iso())
+    return {"type": "FeatureCollection", "features": features}
+
+def sun_subpoint(t):
+    return wgs84.subpoint(earth.at(t).observe(sun))
+
+@app.get("/api/subpoints")
+async def get_subpoints():
+    """
+    Sun and moon subpoints plus the current season
+    """
+    return await response_cache.get_async(("subpoints",), CACHE_TTLS["subpoints"],
+                                          lambda: offload("almanac", compute_subpoints))
 
+def compute_subpoints():
+    t = ts.now()
+    sun_sp = sun_subpoint(t)
+    moon_state = lunar_table.at()
     return {
-        "latitude": subpoint.latitude.degrees,
-        "longitude": subpoint.longitude.degrees,
-        "phase_name": phase_name,
-        "illumination": percent,
-        "phase_angle": phase_angle
+        "timestamp": t.utc_iso(),
+        "sun": {"lat": sun_sp.latitude.degrees, "lon": sun_sp.longitude.degrees},
+        "moon": {"lat": moon_state["latitude"], "lon": moon_state["longitude"]},
+        "season": almanac_cache.season()
     }
 
+@app.get("/api/events")
+async def get_events(
+    kinds: Optional[str] = Query(None, description="Comma separated: season, moon-phase, solar-eclipse, lunar-eclipse"),
+    limit: int = Query(10, ge=1, le=200),
+    days: Optional[float] = Query(None, gt=0, le=365 * 5),
+):
+    """
+    Upcoming solstices/equinoxes, moon phases and eclipses from the precomputed almanac
+    """
+    selected = [kind.strip() for kind in kinds.split(",") if kind.strip()] if kinds else None
+    horizon = days * 86400 if days is not None else None
+    return await offload("almanac", lambda: {
+        "events": almanac_cache.upcoming(kinds=selected, limit=limit, horizon=horizon),
+        "season": almanac_cache.season()
+    })
+
 @app.get("/api/iss")
-def get_iss_position():
-    # Load ISS TLE data (stations.txt)
-    # Using the cached file or downloading if needed
-    stations_url = 'http://celestrak.org/NORAD/elements/stations.txt'
-    satellites = load.tle_file(stations_url)
-    by_name = {sat.name: sat for sat in satellites}
-    iss = by_name['ISS (ZARYA)']
+async def get_iss_position():
+    return await response_cache.get_async(("iss",), CACHE_TTLS["iss"],
+                                          lambda: offload("iss", compute_iss_position))
+
+def compute_iss_position():
+    iss = get_iss()
 
     t = ts.now()
     geocentric = iss.at(t)
@@ -97,67 +361,48 @@ def get_iss_position():
     }
 
 @app.get("/api/iss/track")
-def get_iss_track():
+async def get_iss_track(
+    past_minutes: float = Query(45, ge=0, le=TRACK_PAST_MINUTES),
+    future_minutes: float = Query(47, ge=0, le=TRACK_FUTURE_MINUTES),
+    resolution: int = Query(60, ge=TRACK_STEP_SECONDS, le=3600),
+):
+    """
+    ISS orbital track, by default covering one full ~93 minute orbit
+    Returns a GeoJSON Feature with a MultiLineString geometry
+    """
+    return await response_cache.get_async(
+        ("iss_track", past_minutes, future_minutes, resolution), CACHE_TTLS["iss_track"],
+        lambda: offload("track", compute_track, ISS_NORAD_ID, past_minutes, future_minutes,
+                        resolution, "ISS Orbit Track"))
+
+@app.get("/api/track/{norad_id}")
+async def get_satellite_track(
+    norad_id: int,
+    past_minutes: float = Query(45, ge=0, le=TRACK_PAST_MINUTES),
+    future_minutes: float = Query(47, ge=0, le=TRACK_FUTURE_MINUTES),
+    resolution: int = Query(60, ge=TRACK_STEP_SECONDS, le=3600),
+):
     """
-    Calculate ISS orbital track coordinates for one full orbital period
+    Orbital track for any satellite in the TLE catalog, by NORAD id
     Returns a GeoJSON Feature with a MultiLineString geometry
     """
+    if catalog.find(norad_id) is None:
+        raise HTTPException(status_code=404, detail=f"Satellite {norad_id} not in catalog")
+    return await response_cache.get_async(
+        ("track", norad_id, past_minutes, future_minutes, resolution), CACHE_TTLS["iss_track"],
+        lambda: offload("track", compute_track, norad_id, past_minutes, future_minutes, resolution))
+
+def compute_track(norad_id, past_minutes, future_minutes, resolution, name=None):
+    """
+    Slice a window out of the precomputed track buffer and split it at the antimeridian
+    """
     try:
-        stations_url = 'http://celestrak.org/NORAD/elements/stations.txt'
-        satellites = load.tle_file(stations_url)
-        by_name = {sat.name: sat for sat in satellites}
-        iss = by_name['ISS (ZARYA)']
-        
-        now = datetime.utcnow().replace(tzinfo=timezone.utc)
-        coordinates = []
-        
-        # Calculate positions from -45 to +48 minutes (covering a full 93-minute orbit)
-        for offset_min in range(-45, 48):
-            t_dt = now + timedelta(minutes=offset_min)
-            t = ts.from_datetime(t_dt)
-            
-            geocentric = iss.at(t)
-            subpoint = wgs84.subpoint(geocentric)
-            
-            lon = subpoint.longitude.degrees
-            lat = subpoint.latitude.degrees
-            
-            if lon is not None and lat is not None:
-                coordinates.append((lon, lat))
-            
-        # Split coordinates into segments when crossing the antimeridian
-        segments = []
-        current_segment = []
-        
-        for coord in coordinates:
-            if not current_segment:
-                current_segment.append(coord)
-            else:
-                prev_lon = current_segment[-1][0]
-                curr_lon = coord[0]
-                
-                # Split segment if longitude jump > 180 degrees
-                if abs(curr_lon - prev_lon) > 180:
-                    segments.append(current_segment)
-                    current_segment = [coord]
-                else:
-                    current_segment.append(coord)
-                    
-        if current_segment:
-            segments.append(current_segment)
-            
-        return {
-            "type": "Feature",
-            "geometry": {
-                "type": "MultiLineString",
-                "coordinates": segments
-            },
-            "properties": {
-                "name": "ISS Orbit Track"
-            }
-        }
+        feature = track_engine.geojson(norad_id, past_minutes, future_minutes, resolution, name)
+        if feature is None:
+            raise LookupError(f"Satellite {norad_id} not loaded yet")
+        return feature
     except Exception as e:
-        print(f"Error generating ISS track: {e}")
+        print(f"Error generating track for {norad_id}: {e}")
         return {
             "type": "Feature",
             "geometry": {
@@ -169,198 +414,680 @@ def get_iss_track():
             }
         }
 
+# Pass prediction: coarse screen of whole groups, refinement only near candidate passes
+# Whole groups keep a state table per satellite, so their window is shorter
+PASS_MAX_HOURS = 72
+PASS_MAX_GROUP_HOURS = 24
+pass_predictor = PassPredictor()
+
+@app.get("/api/passes")
+async def get_passes(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    elevation: float = Query(0, ge=-500, le=9000, description="Observer elevation in meters"),
+    norad_id: Optional[int] = Query(None, description="Single satellite (default: the ISS)"),
+    group: Optional[str] = Query(None, description="Screen every satellite in a catalog group"),
+    hours: float = Query(24, gt=0, le=PASS_MAX_HOURS),
+    min_altitude: float = Query(10, ge=0, le=80),
+    visible_only: bool = False,
+    limit: int = Query(50, ge=1, le=1000),
+):
+    """
+    Upcoming passes over a location: rise, culmination and set times with look
+    angles, whether the satellite is sunlit and whether it is visible to the eye
+    (sunlit while the observer's sky is dark)
+    """
+    if norad_id is not None and group is not None:
+        raise HTTPException(status_code=400, detail="Give either norad_id or group, not both")
+    if group is not None and group not in catalog:
+        raise HTTPException(status_code=404, detail=f"Invalid group. Options: {', '.join(catalog.groups)}")
+    if group is not None and hours > PASS_MAX_GROUP_HOURS:
+        raise HTTPException(status_code=400, detail=f"hours is limited to {PASS_MAX_GROUP_HOURS} for groups")
+    if group is None and catalog.find(norad_id or ISS_NORAD_ID) is None:
+        raise HTTPException(status_code=404, detail=f"Satellite {norad_id or ISS_NORAD_ID} not in catalog")
+    key = ("passes", round(lat, 3), round(lon, 3), elevation, norad_id, group, hours, min_altitude,
+           visible_only, limit)
+    return await response_cache.get_async(key, CACHE_TTLS["passes"], lambda: offload(
+        "passes", compute_passes, lat, lon, elevation, norad_id, group, hours, min_altitude,
+        visible_only, limit))
+
+def compute_passes(lat, lon, elevation, norad_id, group, hours, min_altitude, visible_only, limit):
+    if group is not None:
+        snapshot = catalog.get(group)
+        constellation = snapshot.constellation if snapshot is not None else Constellation([])
+    else:
+        constellation = Constellation([catalog.find(norad_id or ISS_NORAD_ID)])
+    start = time.time()
+    passes = pass_predictor.predict(constellation, Observer(lat, lon, elevation), start, start + hours * 3600,
+                                    min_altitude=min_altitude, visible_only=visible_only, limit=limit)
+    return {
+        "observer": {"latitude": lat, "longitude": lon, "elevation": elevation},
+        "start": iso(start),
+        "hours": hours,
+        "screened": len(constellation),
+        "passes": passes
+    }
+
 @app.get("/api/satellites/{group}")
-def get_satellites(group: str):
+async def get_satellites(
+    group: str,
+    request: Request,
+    format: Optional[str] = Query(None, description="geojson (default) or packed"),
+):
     """
     Get positions for a satellite group (gps, iridium, starlink)
-    Returns GeoJSON FeatureCollection
+    Returns GeoJSON FeatureCollection, or the packed columnar encoding
+    with ?format=packed or Accept: application/x-aethra-points
+    """
+    if group not in catalog:
+        return {"error": f"Invalid group. Options: {', '.join(catalog.groups)}"}
+    packed = layer_format(request, format)
+    key, ttl = ("satellites", group, packed), CACHE_TTLS["satellites"]
+    body = await response_cache.get_bytes_async(
+        key, ttl, lambda: limits.run("satellites", compute_satellites(group, packed)))
+    body, encoding = await compressed(request, body, key, ttl)
+    return layer_response(body, packed, encoding)
+
+async def compute_satellites(group, packed=False):
+    encode = satellite_packed if packed else satellite_collection
+    snapshot = catalog.get(group)
+    if snapshot is None:
+        # Cold start with nothing on disk; the background refresh will fill it in
+        return encode(group, None, None)
+    constellation = snapshot.constellation
+    subpoints = None
+    profile = current_profile()
+    try:
+        with profile.phase("compute"):
+            if process_pool_enabled() and len(constellation) >= PROCESS_POOL_MIN_SATELLITES:
+                ids, subpoints = await run_process(subpoints_from_file, catalog.path(group), time.time())
+                if not np.array_equal(ids, constellation.ids):
+                    # The file on disk was swapped by a refresh; use our own snapshot instead
+                    subpoints = None
+            if subpoints is None:
+                subpoints = await run_compute(constellation.subpoints, ts.now())
+    except Exception as e:
+        print(f"Error fetching satellite group {group}: {e}")
+        return encode(group, None, None)
+    with profile.phase("serialize"):
+        return await run_compute(encode, group, constellation, subpoints)
+
+def satellite_collection(group, constellation, subpoints):
+    """
+    Encode the GeoJSON FeatureCollection for one propagated group straight from the arrays
+    """
+    if constellation is None:
+        return feature_collection()
+    valid = subpoints.valid
+    features = point_features(
+        subpoints.longitude[valid],
+        subpoints.latitude[valid],
+        [
+            ("name", [name for name, ok in zip(constellation.names, valid) if ok]),
+            ("id", constellation.ids[valid]),
+            ("altitude_km", subpoints.altitude_km[valid], 3),
+        ],
+        precision=COORDINATE_PRECISION,
+    )
+
+    print(f"[{group}] Loaded {len(features)} satellites")
+    return feature_collection(features)
+
+def satellite_packed(group, constellation, subpoints):
+    """
+    Encode one propagated group in the packed columnar format
+    """
+    if constellation is None:
+        valid, names, ids = np.empty(0, dtype=bool), [], np.empty(0)
+        lon = lat = alt = np.empty(0)
+    else:
+        valid = subpoints.valid
+        names = [name for name, ok in zip(constellation.names, valid) if ok]
+        ids = constellation.ids[valid]
+        lon, lat, alt = subpoints.longitude[valid], subpoints.latitude[valid], subpoints.altitude_km[valid]
+    return pack_points([
+        ("lon", lon, "float32"),
+        ("lat", lat, "float32"),
+        ("altitude_km", alt, "float32"),
+        ("id", ids, "uint32"),
+        ("name", names, "string"),
+    ])
+
+# Conjunctions: every loaded group is screened together for close approaches in the
+# background (again whenever a TLE file changes), so requests only filter the latest report.
+# The screen reaches a refresh interval past AETHRA_CONJUNCTION_HOURS to serve until the next one.
+# Only standalone/ingest screen; ingest saves each report where API workers load it from
+CONJUNCTION_HOURS = float(os.getenv("AETHRA_CONJUNCTION_HOURS", 24))
+CONJUNCTION_CHECK_INTERVAL = 60
+conjunctions = ConjunctionService(
+    distance_km=float(os.getenv("AETHRA_CONJUNCTION_DISTANCE_KM", 10)),
+    step=float(os.getenv("AETHRA_CONJUNCTION_STEP_SECONDS", 30)),
+    hours=CONJUNCTION_HOURS,
+    margin_hours=catalog.refresh_interval / 3600,
+    path=os.path.join(shared_dir(), "aethra-conjunctions.npz") if ROLE != "standalone" else None,
+)
+
+def conjunction_source():
     """
-    urls = {
-        'gps': 'https://celestrak.org/NORAD/elements/gp.php?GROUP=gps-ops&FORMAT=tle',
-        'iridium': 'https://celestrak.org/NORAD/elements/gp.php?GROUP=iridium&FORMAT=tle',
-        'starlink': 'https://celestrak.org/NORAD/elements/gp.php?GROUP=starlink&FORMAT=tle',
+    The catalog's TLE files on disk and their modification times, as (version, paths)
+    """
+    version, paths = [], []
+    for group in catalog.groups:
+        path = catalog.path(group)
+        try:
+            version.append((group, os.path.getmtime(path)))
+        except OSError:
+            continue
+        paths.append(path)
+    return tuple(version), paths
+
+def conjunction_report():
+    report = conjunctions.report
+    if report is None:
+        raise HTTPException(status_code=503, detail="Conjunction screening has not finished yet")
+    return report
+
+def conjunction_filters(report, distance_km, hours):
+    if distance_km is not None and distance_km > report.distance_km:
+        raise HTTPException(status_code=400,
+                            detail=f"distance_km is limited to the screening distance, {report.distance_km}")
+    start = time.time()
+    return start, start + hours * 3600
+
+@app.get("/api/conjunctions")
+async def get_conjunctions(
+    norad_id: Optional[int] = Query(None, description="Only approaches involving this satellite"),
+    distance_km: Optional[float] = Query(None, gt=0, description="Largest miss distance"),
+    hours: float = Query(CONJUNCTION_HOURS, gt=0, le=CONJUNCTION_HOURS),
+    limit: int = Query(100, ge=1, le=5000),
+):
+    """
+    Close approaches between satellites of the loaded catalog over the next hours, in time
+    order: time of closest approach, miss distance, relative speed and where it happens
+    """
+    report = conjunction_report()
+    if norad_id is not None and catalog.find(norad_id) is None:
+        raise HTTPException(status_code=404, detail=f"Satellite {norad_id} not in catalog")
+    start, end = conjunction_filters(report, distance_km, hours)
+    key = ("conjunctions", report.computed_at, norad_id, distance_km, hours, limit)
+    return await response_cache.get_async(key, CACHE_TTLS["conjunctions"], lambda: offload(
+        "conjunctions", compute_conjunctions, report, norad_id, distance_km, start, end, limit))
+
+def compute_conjunctions(report, norad_id, distance_km, start, end, limit):
+    index = report.select(norad_id, distance_km, start, end)
+    return {
+        "start": iso(start),
+        "hours": round((end - start) / 3600, 3),
+        "norad_id": norad_id,
+        "distance_km": distance_km or report.distance_km,
+        "screen": report.summary(),
+        "count": len(index),
+        "conjunctions": report.describe(index[:limit], norad_id),
     }
-    
-    if group not in urls:
-        return {"error": "Invalid group. Options: gps, iridium, starlink"}
-        
+
+@app.get("/api/conjunctions/map")
+async def get_conjunction_map(
+    request: Request,
+    distance_km: Optional[float] = Query(None, gt=0, description="Largest miss distance"),
+    hours: float = Query(CONJUNCTION_HOURS, gt=0, le=CONJUNCTION_HOURS),
+    limit: int = Query(2000, ge=1, le=50000),
+    format: Optional[str] = Query(None, description="geojson (default) or packed"),
+):
+    """
+    Map layer of the closest approaches over the next hours, one point where each happens
+    """
+    report = conjunction_report()
+    packed = layer_format(request, format)
+    start, end = conjunction_filters(report, distance_km, hours)
+    key, ttl = ("conjunction_map", report.computed_at, distance_km, hours, limit, packed), CACHE_TTLS["conjunctions"]
+    body = await response_cache.get_bytes_async(key, ttl, lambda: limits.run("conjunctions", run_compute(
+        conjunction_layer, report, distance_km, start, end, limit, packed)))
+    body, encoding = await compressed(request, body, key, ttl)
+    return layer_response(body, packed, encoding)
+
+def conjunction_layer(report, distance_km, start, end, limit, packed):
+    """
+    Encode the ``limit`` closest approaches in the window as points, in GeoJSON or packed form
+    """
+    index = report.select(None, distance_km, start, end)
+    events = report.events
+    index = index[np.argsort(events["miss_km"][index], kind="stable")[:limit]]
+    first, second = events["first"][index], events["second"][index]
+    columns = [
+        ("miss_km", events["miss_km"][index], 3),
+        ("tca", events["tca"][index], 0),
+        ("relative_speed_kms", events["speed_kms"][index], 3),
+        ("id", report.ids[first]),
+        ("name", [report.names[row] for row in first.tolist()]),
+        ("other_id", report.ids[second]),
+        ("other_name", [report.names[row] for row in second.tolist()]),
+    ]
+    lon, lat = events["lon"][index], events["lat"][index]
+    if packed:
+        types = ("float32", "float64", "float32", "uint32", "string", "uint32", "string")
+        return pack_points([("lon", lon, "float32"), ("lat", lat, "float32")]
+                           + [(column[0], column[1], kind) for column, kind in zip(columns, types)])
+    return feature_collection(point_features(lon, lat, columns, precision=COORDINATE_PRECISION))
+
+@app.get("/api/conjunctions/status")
+async def get_conjunction_status():
+    """
+    Report the latest conjunction screen: window, satellites screened, approaches found and duration
+    """
+    return conjunctions.status()
+
+# --- Upstream feeds ---
+# Third-party feeds are fetched by the backend at most once per TTL (conditionally, with
+# stale-while-revalidate and per-feed backoff) and persisted to AETHRA_FEED_DIR, so any
+# number of clients costs one upstream request. TTLs: AETHRA_FEED_TTL_<NAME>
+
+def feed_ttl(name, default):
+    return float(os.getenv(f"AETHRA_FEED_TTL_{name.upper()}", default))
+
+def aurora_features(content):
+    """
+    OVATION aurora grid to a FeatureCollection of the cells with non-zero intensity
+    """
+    grid = np.asarray(json.loads(content)["coordinates"], dtype=float).reshape(-1, 3)
+    grid = grid[grid[:, 2] > 0]
+    return feature_collection(point_features(grid[:, 0], grid[:, 1], [("intensity", grid[:, 2])], precision=2))
+
+def gvp_active_volcanoes(content):
+    """
+    Names (as a JSON list) of the volcanoes in the GVP Weekly Report RSS
+    """
+    import feedparser
+
+    feed = feedparser.parse(content)
+    if feed.bozo and not feed.entries:
+        raise ValueError(f"unreadable RSS: {feed.bozo_exception}")
+    active_volcanoes = set()
+    for entry in feed.entries:
+        # Entry title format: "Volcano Name (Country) - Activity Description"
+        title = entry.get('title', '')
+        if ' (' in title:
+            active_volcanoes.add(title.split(' (')[0].strip())
+    return encode_json(sorted(active_volcanoes))
+
+# Anonymous OpenSky access gets 400 API credits a day and a global states/all poll
+# costs 4, so the flights feed is polled every 15 minutes (96 polls a day) by default.
+# Deployments with a larger quota can poll faster with AETHRA_FEED_TTL_FLIGHTS. Only the
+# standalone or ingest process polls; api workers read the copy it persists.
+FLIGHT_FEED_TTL = feed_ttl("flights", 900)
+
+feed_cache = FeedCache(os.getenv("AETHRA_FEED_DIR", os.path.join(data_dir(), "feeds")), [
+    Feed("earthquakes", "https://earthquake.usgs.gov/earthquakes/feed/v1.0/summary/2.5_week.geojson",
+         feed_ttl("earthquakes", 300)),
+    Feed("aurora", "https://services.swpc.noaa.gov/json/ovation_aurora_latest.json",
+         feed_ttl("aurora", 300), transform=aurora_features),
+    Feed("kp", "https://services.swpc.noaa.gov/json/planetary_k_index_1m.json", feed_ttl("kp", 300)),
+    Feed("radar", "https://api.rainviewer.com/public/weather-maps.json", feed_ttl("radar", 120)),
+    # Polled by flight_engine, at most once per FLIGHT_FEED_TTL
+    Feed("flights", "https://opensky-network.org/api/states/all", FLIGHT_FEED_TTL),
+    Feed("gvp", "https://volcano.si.edu/news/WeeklyVolcanoRSS.xml", feed_ttl("gvp", 3600),
+         transform=gvp_active_volcanoes),
+])
+with startup_timer.phase("feeds"):
+    feed_cache.load_from_disk()
+
+async def feed_response(request, name):
+    """
+    Serve a cached feed with an ETag (answering If-None-Match with 304) and compression.
+    Fails with 503 while there is no payload at all yet
+    """
+    feed = feed_cache.feeds[name]
     try:
-        url = urls[group]
-        # Use explicit unique filename per group to prevent cache contamination
-        cache_filename = f'tle_{group}.txt'
-        satellites = load.tle_file(url, filename=cache_filename)
-        
-        features = []
-        t = ts.now()
-        
-        for sat in satellites:
-            try:
-                geocentric = sat.at(t)
-                subpoint = wgs84.subpoint(geocentric)
-                
-                if subpoint.latitude.degrees is None: 
-                    continue
-                    
-                feature = {
-                    "type": "Feature",
-                    "geometry": {
-                        "type": "Point",
-                        "coordinates": [subpoint.longitude.degrees, subpoint.latitude.degrees]
-                    },
-                    "properties": {
-                        "name": sat.name,
-                        "id": sat.model.satnum,
-                        "altitude_km": subpoint.elevation.km
-                    }
-                }
-                features.append(feature)
-            except Exception:
-                continue
+        entry = await feed_cache.get(name)
+    except FeedUnavailable:
+        raise HTTPException(status_code=503, detail=f"The {name} feed is not available yet")
+    headers = {
+        "ETag": entry.tag,
+        "Cache-Control": f"public, max-age={max(int(feed.ttl - entry.age()), 0)}",
+        "Vary": "Accept-Encoding",
+    }
+    if request.headers.get("if-none-match") == entry.tag:
+        return Response(status_code=304, headers=headers)
+    body, encoding = await compressed(request, entry.body, ("feed", name, entry.tag), feed.ttl)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=feed.media_type, headers=headers)
 
-        print(f"[{group}] Loaded {len(features)} satellites")
-        return {"type": "FeatureCollection", "features": features}
+@app.get("/api/feeds")
+async def get_feed_status():
+    """
+    Report age, source and failures of every cached upstream feed
+    """
+    return feed_cache.status()
 
-    except Exception as e:
-        print(f"Error fetching satellite group {group}: {e}")
-        return {"type": "FeatureCollection", "features": []}
-@app.get("/api/volcanoes")
-def get_volcanoes():
+@app.get("/api/earthquakes")
+async def get_earthquakes(request: Request):
+    """
+    USGS M2.5+ earthquakes of the past 7 days (GeoJSON)
+    """
+    return await feed_response(request, "earthquakes")
+
+@app.get("/api/aurora")
+async def get_aurora(request: Request):
+    """
+    NOAA SWPC OVATION aurora forecast as a FeatureCollection of non-zero intensity cells
+    """
+    return await feed_response(request, "aurora")
+
+@app.get("/api/space-weather/kp")
+async def get_kp_index(request: Request):
+    """
+    NOAA SWPC planetary K-index, one-minute resolution
     """
-    Get volcano data as GeoJSON enriched with real-time activity from GVP Weekly Report
+    return await feed_response(request, "kp")
+
+@app.get("/api/weather/radar")
+async def get_weather_radar(request: Request):
     """
+    RainViewer index of available weather radar frames
+    """
+    return await feed_response(request, "radar")
+
+# Volcanoes: the dataset is indexed once (AETHRA_VOLCANO_FILE takes a larger GeoJSON export,
+# e.g. the GVP Holocene list) and the weekly report is merged in the background into a
+# versioned layer whose features are already serialized
+VOLCANO_FILE = os.getenv("AETHRA_VOLCANO_FILE",
+                         os.path.join(os.path.dirname(os.path.abspath(__file__)), "volcanoes.json"))
+VOLCANO_REFRESH_INTERVAL = 300
+with startup_timer.phase("volcanoes"):
     try:
-        # Load base volcano data from volcanoes.json
-        volcano_file_path = os.path.join(os.path.dirname(__file__), 'volcanoes.json')
-        
-        with open(volcano_file_path, 'r') as f:
-            volcano_data = json.load(f)
-        
-        # Fetch current volcanic activity from GVP RSS
-        try:
-            import feedparser
-            
-            gvp_rss_url = 'https://volcano.si.edu/news/WeeklyVolcanoRSS.xml'
-            feed = feedparser.parse(gvp_rss_url)
-            
-            # Extract volcano names from RSS entries
-            active_volcanoes = set()
-            for entry in feed.entries:
-                # Entry title format: "Volcano Name (Country) - Activity Description"
-                title = entry.get('title', '')
-                if ' (' in title:
-                    volcano_name = title.split(' (')[0].strip()
-                    active_volcanoes.add(volcano_name.lower())
-            
-            # Enrich volcano data with current status
-            for feature in volcano_data['features']:
-                volcano_name = feature['properties'].get('name', '').lower()
-                
-                # If volcano is in the GVP weekly report, mark as erupting
-                if volcano_name in active_volcanoes:
-                    feature['properties']['status'] = 'Erupting'
-                    feature['properties']['alert_level'] = 'high'
-                # Otherwise keep existing status or mark as monitored
-                elif feature['properties'].get('status') == 'Erupting':
-                    # Downgrade if not in current reports
-                    feature['properties']['status'] = 'Active'
-                    feature['properties']['alert_level'] = 'medium'
-                else:
-                    feature['properties']['alert_level'] = 'low'
-            
-            print(f"Successfully enriched volcano data with {len(active_volcanoes)} active volcanoes from GVP")
-            
-        except Exception as rss_error:
-            print(f"Warning: Could not fetch GVP RSS feed: {rss_error}")
-            # Continue with static data if RSS fails
-            for feature in volcano_data['features']:
-                # Set default alert levels based on existing status
-                status = feature['properties'].get('status', 'Monitored')
-                if status == 'Erupting':
-                    feature['properties']['alert_level'] = 'high'
-                elif status in ['Active', 'Restless']:
-                    feature['properties']['alert_level'] = 'medium'
-                else:
-                    feature['properties']['alert_level'] = 'low'
-        
-        return volcano_data
-        
+        volcano_layer = VolcanoLayer(VolcanoIndex.from_file(VOLCANO_FILE))
     except FileNotFoundError:
-        return {"type": "FeatureCollection", "features": []}
-    except Exception as e:
-        print(f"Error loading volcano data: {e}")
-        return {"type": "FeatureCollection", "features": []}
+        print(f"[volcanoes] {VOLCANO_FILE} not found, serving an empty layer")
+        volcano_layer = VolcanoLayer(VolcanoIndex([]))
+
+async def gvp_weekly_report():
+    """
+    Names of the volcanoes in the cached GVP Weekly Report
+    """
+    return json.loads((await feed_cache.get("gvp")).body)
+
+@app.get("/api/volcanoes")
+async def get_volcanoes(
+    request: Request,
+    bbox: Optional[str] = Query(None, description="Area as west,south,east,north"),
+    alert_level: Optional[str] = Query(None, description="Comma-separated subset of low,medium,high"),
+):
+    """
+    Get volcano data as GeoJSON enriched with real-time activity from GVP Weekly Report,
+    optionally limited to an area and to some alert levels
+    """
+    try:
+        box = parse_bbox(bbox) if bbox else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    levels = None
+    if alert_level:
+        levels = [level.strip() for level in alert_level.split(",")]
+        if not set(levels) <= set(ALERT_LEVELS):
+            raise HTTPException(status_code=400, detail=f"alert_level must be among {', '.join(ALERT_LEVELS)}")
+    snapshot = volcano_layer.snapshot
+    tag = snapshot.tag
+    if box is not None or levels is not None:
+        tag = tag[:-1] + "-" + hashlib.sha1(repr((box, levels)).encode()).hexdigest()[:8] + '"'
+    headers = {"ETag": tag, "Vary": "Accept-Encoding"}
+    if request.headers.get("if-none-match") == tag:
+        return Response(status_code=304, headers=headers)
+    if box is None and levels is None:
+        body, encoding = await compressed(request, snapshot.body, ("volcanoes", tag), VOLCANO_REFRESH_INTERVAL)
+    else:
+        body, encoding = await compressed(request, volcano_layer.query(box, levels))
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@app.get("/api/volcanoes/status")
+async def get_volcano_status():
+    """
+    Report the volcano layer's version, alert level counts and unmatched report names
+    """
+    return volcano_layer.status()
+
 
+# Flights: OpenSky polls parsed into columnar snapshots in the background; requests
+# dead-reckon positions to the current time (for at most AETHRA_FLIGHT_MAX_EXTRAPOLATION
+# seconds, then they hold) and filter by viewport. Polls are far apart, so every aircraft
+# carries its position_age and clients can show stale ones differently
+flight_engine = FlightEngine(
+    max_extrapolation=float(os.getenv("AETHRA_FLIGHT_MAX_EXTRAPOLATION", 120)),
+    max_age=float(os.getenv("AETHRA_FLIGHT_MAX_AGE", 300)),
+)
+FLIGHT_POLL_INTERVAL = 15
+# Requests with a zoom below this get clustered aircraft
+FLIGHT_CLUSTER_MAX_ZOOM = float(os.getenv("AETHRA_FLIGHT_CLUSTER_MAX_ZOOM", 4))
+
+async def opensky_states():
+    """
+    Latest OpenSky payload; the feed cache enforces the request interval and backoff
+    """
+    await feed_cache.refresh("flights")
+    return feed_cache.current("flights")
+
+async def persisted_opensky_states():
+    """
+    Latest OpenSky payload persisted by the ingest process. API workers only read it: the
+    daily quota fits one poller, not one per worker
+    """
+    await feed_cache.adopt("flights")
+    return feed_cache.current("flights")
 
 @app.get("/api/flights")
-def get_flights():
+async def get_flights(
+    request: Request,
+    bbox: Optional[str] = Query(None, description="Viewport as west,south,east,north"),
+    zoom: Optional[float] = Query(None, ge=0, le=24),
+    limit: Optional[int] = Query(None, ge=1),
+    format: Optional[str] = Query(None, description="geojson (default) or packed"),
+):
     """
     Get real-time flight data from OpenSky Network
-    Returns GeoJSON of aircraft positions
+    Returns GeoJSON of aircraft positions, dead-reckoned to now and optionally limited
+    to a viewport. Below FLIGHT_CLUSTER_MAX_ZOOM nearby aircraft are aggregated into clusters.
+    ?format=packed or Accept: application/x-aethra-points selects the packed encoding.
     """
-    import requests
-    
     try:
-        response = requests.get(
-            'https://opensky-network.org/api/states/all',
-            timeout=10
-        )
-        
-        if response.status_code != 200:
-            print(f"OpenSky API error: {response.status_code}")
-            return {"type": "FeatureCollection", "features": []}
-        
-        data = response.json()
-        states = data.get('states', [])
-        
-        features = []
-        for state in states[:500]:  # Limit for performance
-            if state[5] is None or state[6] is None:
-                continue
-            
-            feature = {
-                "type": "Feature",
-                "geometry": {
-                    "type": "Point",
-                    "coordinates": [state[5], state[6]]
-                },
-                "properties": {
-                    "icao24": state[0],
-                    "callsign": (state[1] or "").strip(),
-                    "country": state[2],
-                    "altitude": state[7],
-                    "on_ground": state[8],
-                    "velocity": state[9],
-                    "heading": state[10],
-                    "vertical_rate": state[11]
-                }
-            }
-            features.append(feature)
-        
-        print(f"Returning {len(features)} aircraft")
-        return {"type": "FeatureCollection", "features": features}
-        
-    except Exception as e:
-        print(f"Error fetching flights: {e}")
-        return {"type": "FeatureCollection", "features": []}
+        box = parse_bbox(bbox) if bbox else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    packed = layer_format(request, format)
+    if zoom is not None and zoom >= FLIGHT_CLUSTER_MAX_ZOOM:
+        zoom = None
+    key = ("flights", box, None if zoom is None else round(zoom, 1), limit, packed)
+    body = await response_cache.get_bytes_async(key, CACHE_TTLS["flights"], lambda: limits.run(
+        "flights", run_compute(compute_flights, box, zoom, limit, packed)))
+    body, encoding = await compressed(request, body)
+    return layer_response(body, packed, encoding)
+
+def compute_flights(box, zoom, limit, packed):
+    now = time.time()
+    snapshot, rows, lon, lat = flight_engine.query(box, None if zoom is not None else limit, now)
+    clusters = None
+    if zoom is not None and len(rows):
+        inverse, counts, mean_lon, mean_lat = cluster_points(lon, lat, cluster_cell_degrees(zoom))
+        single = counts[inverse] == 1
+        multi = np.flatnonzero(counts > 1)
+        rows, lon, lat = rows[single], lon[single], lat[single]
+        clusters = (mean_lon[multi], mean_lat[multi], counts[multi])
+    if packed:
+        return flight_packed(snapshot, rows, lon, lat, now, clusters)
+    features = flight_features(snapshot, rows, lon, lat, now)
+    if clusters is not None:
+        features.extend(point_features(
+            clusters[0],
+            clusters[1],
+            [
+                ("cluster", np.ones(len(clusters[2]), dtype=bool)),
+                ("point_count", clusters[2]),
+            ],
+            precision=4,
+        ))
+    return feature_collection(features)
+
+def flight_features(snapshot, rows, lon, lat, now):
+    """
+    GeoJSON aircraft feature dicts for the given snapshot rows; position_age is the
+    seconds since each one last reported its position
+    """
+    if snapshot is None:
+        return []
+    return point_features(
+        lon,
+        lat,
+        [
+            ("icao24", [f"{address:06x}" for address in snapshot.icao24[rows].tolist()]),
+            ("callsign", [snapshot.callsign[row] for row in rows.tolist()]),
+            ("country", [snapshot.country[row] for row in rows.tolist()]),
+            ("altitude", snapshot.altitude[rows], 0),
+            ("on_ground", snapshot.on_ground[rows]),
+            ("velocity", snapshot.velocity[rows], 1),
+            ("heading", snapshot.heading[rows], 1),
+            ("vertical_rate", snapshot.vertical_rate[rows], 1),
+            ("position_age", now - snapshot.position_time[rows], 0),
+        ],
+        precision=COORDINATE_PRECISION,
+    )
+
+def flight_packed(snapshot, rows, lon, lat, now, clusters=None):
+    """
+    Aircraft in the packed columnar format. Cluster rows (if any) follow the aircraft,
+    with point_count > 1 and empty aircraft fields; point_count is 1 for aircraft.
+    """
+    n = len(rows)
+    cluster_lon, cluster_lat, cluster_counts = clusters or (np.empty(0), np.empty(0), np.empty(0, dtype=np.int64))
+    pad = np.zeros(len(cluster_counts))
+    blank = [""] * len(cluster_counts)
+    if snapshot is None:
+        address, callsign = np.empty(0), []
+        altitude = velocity = heading = position_age = np.empty(0)
+    else:
+        address, callsign = snapshot.icao24[rows], [snapshot.callsign[row] for row in rows.tolist()]
+        altitude, velocity, heading = snapshot.altitude[rows], snapshot.velocity[rows], snapshot.heading[rows]
+        position_age = now - snapshot.position_time[rows]
+    return pack_points([
+        ("lon", np.concatenate([lon, cluster_lon]), "float32"),
+        ("lat", np.concatenate([lat, cluster_lat]), "float32"),
+        ("icao24", np.concatenate([address, pad]), "uint32"),
+        ("callsign", callsign + blank, "string"),
+        ("altitude", np.concatenate([altitude, pad]), "float32"),
+        ("velocity", np.concatenate([velocity, pad]), "float32"),
+        ("heading", np.concatenate([heading, pad]), "float32"),
+        ("position_age", np.concatenate([position_age, pad]), "float32"),
+        ("point_count", np.concatenate([np.ones(n, dtype=np.int64), cluster_counts]), "uint32"),
+    ])
+
+def finite_or_none(value):
+    return float(value) if np.isfinite(value) else None
+
+@app.get("/api/flights/{icao24}")
+async def get_flight(icao24: str):
+    """
+    One aircraft's latest state and its recent reported positions (oldest first)
+    Returns a GeoJSON Feature with a LineString geometry ending at the dead-reckoned position
+    """
+    try:
+        address = int(icao24, 16)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="icao24 must be a hex address")
+    snapshot, rows, lon, lat = flight_engine.query()
+    row = snapshot.row(address) if snapshot is not None else None
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"Aircraft {icao24} not in the current snapshot")
+    times, trail_lon, trail_lat = flight_engine.history(address)
+    now = time.time()
+    now_lon, now_lat = snapshot.positions(np.array([row]), now, flight_engine.max_extrapolation)
+    return {
+        "type": "Feature",
+        "geometry": {
+            "type": "LineString",
+            "coordinates": np.column_stack((np.append(trail_lon, now_lon), np.append(trail_lat, now_lat))).tolist()
+        },
+        "properties": {
+            "icao24": f"{address:06x}",
+            "callsign": snapshot.callsign[row],
+            "country": snapshot.country[row],
+            "altitude": finite_or_none(snapshot.altitude[row]),
+            "on_ground": bool(snapshot.on_ground[row]),
+            "velocity": finite_or_none(snapshot.velocity[row]),
+            "heading": finite_or_none(snapshot.heading[row]),
+            "vertical_rate": finite_or_none(snapshot.vertical_rate[row]),
+            "position_age": round(now - float(snapshot.position_time[row])),
+            "times": times.tolist(),
+        }
+    }
 
 
 # --- Maritime Tracking (AisStream.io) ---
 
 import asyncio
-import websockets
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-# Global in-memory storage for ship data
-# { mmsi: { lat, lon, name, etc, timestamp } }
-ships_data = {}
+# Global in-memory storage for ship data: slot-backed columns keyed by MMSI.
+# API workers read the ingest process's snapshots instead of holding their own feed
+ship_snapshot = ship_snapshot_path()
+ships = SharedShipView(ship_snapshot) if ROLE == "api" else ShipStore()
+# Vessels not heard from in this long are hidden from /api/ships
+SHIP_DISPLAY_MAX_AGE = 600
+# Requests with a zoom below this get clustered ships
+SHIP_CLUSTER_MAX_ZOOM = float(os.getenv("AETHRA_SHIP_CLUSTER_MAX_ZOOM", 5))
+
+# Position history for wakes and replay, one directory of column files per UTC day.
+# Written by the process that owns the AIS feed; api workers read the same directory,
+# so it must be shared between them. AETHRA_TRACK_RETENTION_DAYS=0 disables it
+TRACK_RETENTION_DAYS = int(os.getenv("AETHRA_TRACK_RETENTION_DAYS", 7))
+vessel_tracks = VesselTrackStore(
+    os.getenv("AETHRA_TRACK_DIR", os.path.join(data_dir(), "tracks")),
+    min_interval=float(os.getenv("AETHRA_TRACK_MIN_INTERVAL", 10)),
+    min_distance=float(os.getenv("AETHRA_TRACK_MIN_DISTANCE", 50)),
+    max_interval=float(os.getenv("AETHRA_TRACK_MAX_INTERVAL", 300)),
+    retention_days=TRACK_RETENTION_DAYS,
+)
+# Live AIS frames: the socket reader only queues them; a consumer decodes and applies
+# them in batches, keeping only each vessel's latest report per batch
+ais_ingest = AisIngest(
+    ships,
+    vessel_tracks if TRACK_RETENTION_DAYS > 0 else None,
+    max_queue=int(os.getenv("AETHRA_AIS_QUEUE", 50000)),
+    batch_size=int(os.getenv("AETHRA_AIS_BATCH", 5000)),
+    interval=float(os.getenv("AETHRA_AIS_BATCH_INTERVAL", 0.25)),
+)
+# AisStream subscription regions follow demand: the union of viewports displayed in the
+# last AETHRA_AIS_DEMAND_TTL seconds (from /api/ships and live subscriptions) plus the
+# always-on AETHRA_AIS_REGIONS ("w,s,e,n;..." or "world"). AETHRA_AIS_DEMAND=0 always
+# subscribes to the whole world, as does any client asking for ships without a bbox.
+# Track retention records only what this subscription receives: to keep history where
+# nobody is looking, list those waters (or "world") in AETHRA_AIS_REGIONS
+ais_regions = AisRegions(
+    always_on=parse_regions(os.getenv("AETHRA_AIS_REGIONS", "")),
+    demand_ttl=float(os.getenv("AETHRA_AIS_DEMAND_TTL", 120)),
+    cell_degrees=float(os.getenv("AETHRA_AIS_REGION_CELL", 1)),
+    max_boxes=int(os.getenv("AETHRA_AIS_MAX_BOXES", 16)),
+    enabled=os.getenv("AETHRA_AIS_DEMAND", "1") == "1",
+)
+AIS_REGION_INTERVAL = 5
+# Where api workers leave their viewport demand for the ingest process
+ais_demand_path = os.path.join(shared_dir(), f"aethra-ais-demand-{os.getpid()}.json")
+
+def live_ship_viewports():
+    """
+    Bboxes of live ships subscriptions (None for a subscription without one)
+    """
+    return [subscription.bbox for subscription in list(live_hub.layers["ships"].subscribers)]
+
+# Longest time ranges served by the track and history endpoints
+SHIP_TRACK_MAX_HOURS = 24 * 7
+SHIP_HISTORY_MAX_HOURS = 24
 
 async def connect_to_aisstream():
     """
     Background task to connect to AisStream.io WebSocket
-    and update ships_data in real-time.
+    and update the ship store in real-time.
     """
     api_key = os.getenv("AISSTREAM_API_KEY")
     if not api_key:
@@ -368,116 +1095,538 @@ async def connect_to_aisstream():
         return
 
     print(f"Starting AisStream connection with key: {api_key[:5]}...")
+    # Only deployments with an AIS key pay for importing the WebSocket client
+    import websockets
     
-    # Subscribe to PositionReport and ShipStaticData messages for the whole world
-    subscription_message = {
-        "APIKey": api_key,
-        "BoundingBoxes": [[[-90, -180], [90, 180]]], # Global coverage
-        "FilterMessageTypes": ["PositionReport", "ShipStaticData"],
-        "FilterShipMMSI": [] 
-    }
+    # Subscribe to PositionReport and ShipStaticData messages in the demanded regions
+    def subscription_message(regions):
+        return json.dumps({
+            "APIKey": api_key,
+            "BoundingBoxes": to_aisstream(regions),
+            "FilterMessageTypes": ["PositionReport", "ShipStaticData"],
+            "FilterShipMMSI": []
+        })
+
+    async def follow_regions(websocket, version):
+        # Resubscribe on the open socket; the ship store keeps what it already has
+        while True:
+            regions = await ais_regions.wait_for_change(version)
+            version = ais_regions.version
+            if not regions:
+                print("AisStream: nothing displayed, disconnecting until there is")
+                await websocket.close()
+                return
+            try:
+                await websocket.send(subscription_message(regions))
+            except Exception:
+                return  # The reader sees the broken connection and reconnects
 
     while True:
+        regions = await ais_regions.wait_for_regions()
+        version = ais_regions.version
         try:
             async with websockets.connect("wss://stream.aisstream.io/v0/stream") as websocket:
-                await websocket.send(json.dumps(subscription_message))
-                print("Connected to AisStream.io WebSocket")
+                await websocket.send(subscription_message(regions))
+                print(f"Connected to AisStream.io WebSocket ({len(regions)} regions)")
+                ais_connected.set(1)
+                follower = asyncio.create_task(follow_regions(websocket, version))
                 
-                async for message_json in websocket:
-                    try:
-                        message = json.loads(message_json)
-                        msg_type = message.get("MessageType")
-                        
-                        if msg_type == "PositionReport":
-                            report = message["Message"]["PositionReport"]
-                            mmsi = report["UserID"]
-                            
-                            # Create or update entry
-                            if mmsi not in ships_data:
-                                ships_data[mmsi] = {}
-                                
-                            ships_data[mmsi].update({
-                                "mmsi": mmsi,
-                                "lat": report["Latitude"],
-                                "lon": report["Longitude"],
-                                "sog": report.get("Sog", 0),  # Speed over ground
-                                "cog": report.get("Cog", 0),  # Course over ground
-                                "timestamp": datetime.now(timezone.utc).timestamp()
-                            })
-                            
-                        elif msg_type == "ShipStaticData":
-                            report = message["Message"]["ShipStaticData"]
-                            mmsi = report["UserID"]
-                            
-                            if mmsi not in ships_data:
-                                ships_data[mmsi] = {}
-                                
-                            ships_data[mmsi].update({
-                                "name": report.get("Name", "Unknown").strip(),
-                                "ship_type": report.get("Type", 0),
-                                "callsign": report.get("CallSign", "").strip(),
-                                "destination": report.get("Destination", "").strip(),
-                                "timestamp": datetime.now(timezone.utc).timestamp()
-                            })
-                            
-                        # Prune old ships (simulated garbage collection)
-                        # In a production app, do this periodically, not every message
-                        if len(ships_data) > 2000:
-                            # Keep only recent 1000 ships
-                            sorted_ships = sorted(ships_data.items(), key=lambda x: x[1].get('timestamp', 0), reverse=True)
-                            ships_data.clear()
-                            ships_data.update(dict(sorted_ships[:1000]))
-                            
-                    except Exception as msg_error:
-                        # Ignore malformed messages
-                        pass
+                # Only queue here, so the socket is drained as fast as frames arrive;
+                # decoding, malformed-message accounting and pruning happen elsewhere
+                offer = ais_ingest.offer
+                try:
+                    async for message_json in websocket:
+                        offer(message_json)
+                finally:
+                    follower.cancel()
+                ais_connected.set(0)
                         
         except Exception as e:
             print(f"AisStream WebSocket error: {e}")
             print("Reconnecting in 10 seconds...")
+            ais_connected.set(0)
+            ais_reconnects.inc()
             await asyncio.sleep(10)
 
+@metrics.collector
+def component_metrics():
+    """
+    Gauges and counters read from the components' own stats at scrape time
+    """
+    ship_stats = ships.stats()
+    yield "ships", "gauge", "Vessels in the live ship store", [({}, ship_stats["size"])]
+    for name, help in (("updates", "Position reports applied to the ship store"),
+                       ("evicted", "Vessels evicted from the full ship store"),
+                       ("pruned", "Silent vessels pruned from the ship store")):
+        if name in ship_stats:  # api workers only see the shared snapshot
+            yield f"ship_{name}_total", "counter", help, [({}, ship_stats[name])]
+    ais = ais_ingest.stats()
+    yield "ais_frames_total", "counter", "AisStream frames by outcome", [
+        ({"outcome": name}, ais[name]) for name in ("received", "applied", "coalesced", "malformed", "dropped")]
+    yield "ais_messages_total", "counter", "Decoded AisStream messages by type", [
+        ({"type": msg_type}, count) for msg_type, count in ais["types"].items()]
+    yield "ais_queue_depth", "gauge", "AisStream frames waiting to be decoded", [({}, ais["queued"])]
+    regions = ais_regions.stats()
+    yield "ais_subscription_boxes", "gauge", "Bounding boxes in the AisStream subscription", [({}, regions["boxes"])]
+    yield "ais_subscription_coverage", "gauge", "Fraction of the Earth's surface subscribed to", [
+        ({}, regions["coverage"])]
+    yield "ais_subscription_changes_total", "counter", "AisStream subscription region changes", [
+        ({}, regions["changes"])]
+    cache = response_cache.stats()
+    yield "response_cache_requests_total", "counter", "Response cache lookups by result", [
+        ({"result": "hit"}, cache["hits"]), ({"result": "miss"}, cache["misses"])]
+    yield "response_cache_entries", "gauge", "Bodies held in the response cache", [({}, cache["entries"])]
+    feeds = feed_cache.status()
+    yield "feed_cache_events_total", "counter", "Upstream feed cache events", [
+        ({"event": name}, feeds[name]) for name in feed_cache.counters]
+    yield "feed_age_seconds", "gauge", "Age of each upstream feed's cached copy", [
+        ({"feed": name}, feed["age_seconds"]) for name, feed in feeds["feeds"].items() if feed["loaded"]]
+    yield "feed_failures", "gauge", "Consecutive failed refreshes per feed", [
+        ({"feed": name}, feed["failures"]) for name, feed in feeds["feeds"].items()]
+    groups = catalog.status()
+    yield "catalog_satellites", "gauge", "Satellites loaded per TLE group", [
+        ({"group": group}, status["satellites"]) for group, status in groups.items()]
+    yield "catalog_age_seconds", "gauge", "Age of each TLE group", [
+        ({"group": group}, status["age_seconds"]) for group, status in groups.items() if status["loaded"]]
+    yield "catalog_failures", "gauge", "Consecutive failed refreshes per TLE group", [
+        ({"group": group}, status["failures"]) for group, status in groups.items()]
+    report = conjunctions.report
+    if report is not None:
+        yield "conjunctions", "gauge", "Close approaches in the latest conjunction screen", [({}, len(report))]
+        yield "conjunction_screen_seconds", "gauge", "Duration of the latest conjunction screen", [
+            ({}, report.duration)]
+    flight_stats = flight_engine.stats()
+    yield "aircraft", "gauge", "Aircraft in the current OpenSky snapshot", [({}, flight_stats["aircraft"])]
+    yield "flight_polls_total", "counter", "OpenSky snapshots ingested", [({}, flight_stats["polls"])]
+    yield "live_clients", "gauge", "Connected /api/live WebSocket clients", [({}, live_hub.stats()["clients"])]
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Prometheus metrics for this process
+    """
+    return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await upstream.close_client()
+    if ROLE != "api":
+        vessel_tracks.flush()
+    shutdown_executors()
+
 @app.on_event("startup")
 async def startup_event():
-    # Start the AIS background task
-    asyncio.create_task(connect_to_aisstream())
+    if ROLE == "api":
+        # The ingest process downloads TLEs and owns the AIS feed; just follow its files
+        asyncio.create_task(catalog.watch())
+        asyncio.create_task(ais_regions.publish(ais_demand_path, live_ship_viewports, AIS_REGION_INTERVAL))
+    else:
+        # Keep TLEs fresh without ever blocking a request on CelesTrak
+        asyncio.create_task(catalog.run())
+        # Start the AIS background task
+        asyncio.create_task(connect_to_aisstream())
+        asyncio.create_task(ais_ingest.run())
+        asyncio.create_task(ais_regions.run(live_ship_viewports, AIS_REGION_INTERVAL,
+                                            shared_dir() if ROLE == "ingest" else None))
+        asyncio.create_task(ships.run_pruner())
+        if TRACK_RETENTION_DAYS > 0:
+            asyncio.create_task(vessel_tracks.run())
+    if ROLE == "ingest":
+        asyncio.create_task(run_snapshot_writer(ships, ship_snapshot, SHARED_SNAPSHOT_INTERVAL))
+    # Build and slide the lunar ephemeris table and the almanac events off the request path
+    asyncio.create_task(lunar_table.run())
+    asyncio.create_task(almanac_cache.run())
+    asyncio.create_task(volcano_layer.run(gvp_weekly_report, VOLCANO_REFRESH_INTERVAL))
+    if ROLE == "api":
+        asyncio.create_task(conjunctions.watch(CONJUNCTION_CHECK_INTERVAL))
+    else:
+        asyncio.create_task(conjunctions.run(conjunction_source, CONJUNCTION_CHECK_INTERVAL))
+    asyncio.create_task(flight_engine.run(persisted_opensky_states if ROLE == "api" else opensky_states,
+                                          FLIGHT_POLL_INTERVAL))
+    asyncio.create_task(monitor_event_loop(event_loop_lag, event_loop_lag_last))
+    # Push deltas for the live layers to WebSocket subscribers
+    asyncio.create_task(publish_ships())
+    asyncio.create_task(publish_orbits())
+    startup_timer.mark_ready()
+
+def ship_features(slots):
+    """
+    GeoJSON ship feature dicts for the given store slots
+    """
+    names, destinations = ships.name, ships.destination
+    return point_features(
+        ships.lon[slots],
+        ships.lat[slots],
+        [
+            ("mmsi", ships.mmsi[slots]),
+            ("name", [names[slot] if names[slot] is not None else "Unknown" for slot in slots.tolist()]),
+            ("type", ships.ship_type[slots]),
+            # float32 columns: round to the precision AIS actually reports
+            ("speed", ships.sog[slots], 1),
+            ("heading", ships.cog[slots], 1),
+            ("destination", [destinations[slot] if destinations[slot] is not None else "Unknown"
+                             for slot in slots.tolist()]),
+        ],
+        precision=COORDINATE_PRECISION,
+    )
+
+def cluster_ships(slots, zoom):
+    """
+    Aggregate ships into grid-cell clusters for low zoom levels.
+    Returns the slots of ships alone in their cell, and (lon, lat, count) arrays
+    for cells holding more than one ship.
+    """
+    lon = ships.lon[slots].astype(float)
+    lat = ships.lat[slots].astype(float)
+    inverse, counts, mean_lon, mean_lat = cluster_points(lon, lat, cluster_cell_degrees(zoom))
+    multi = np.flatnonzero(counts > 1)
+    return slots[counts[inverse] == 1], (mean_lon[multi], mean_lat[multi], counts[multi])
+
+def ship_cluster_features(slots, zoom):
+    """
+    Clustered ship features: single ships as normal features, plus one point per cluster
+    """
+    single, (cluster_lon, cluster_lat, cluster_counts) = cluster_ships(slots, zoom)
+    features = ship_features(single)
+    features.extend(point_features(
+        cluster_lon,
+        cluster_lat,
+        [
+            ("cluster", np.ones(len(cluster_counts), dtype=bool)),
+            ("point_count", cluster_counts),
+        ],
+        precision=4,
+    ))
+    return features
+
+def ship_packed(slots, clusters=None):
+    """
+    Ships in the packed columnar format. Cluster rows (if any) follow the ships,
+    with point_count > 1 and empty ship fields; point_count is 1 for ships.
+    """
+    n = len(slots)
+    cluster_lon, cluster_lat, cluster_counts = clusters or (np.empty(0), np.empty(0), np.empty(0, dtype=np.int64))
+    pad = np.zeros(len(cluster_counts))
+    blank = [""] * len(cluster_counts)
+    names, destinations = ships.name, ships.destination
+    return pack_points([
+        ("lon", np.concatenate([ships.lon[slots], cluster_lon]), "float32"),
+        ("lat", np.concatenate([ships.lat[slots], cluster_lat]), "float32"),
+        ("mmsi", np.concatenate([ships.mmsi[slots], pad]), "uint32"),
+        ("name", [names[slot] or "Unknown" for slot in slots.tolist()] + blank, "string"),
+        ("type", np.concatenate([ships.ship_type[slots], pad]), "uint16"),
+        ("speed", np.concatenate([ships.sog[slots], pad]), "float32"),
+        ("heading", np.concatenate([ships.cog[slots], pad]), "float32"),
+        ("destination", [destinations[slot] or "Unknown" for slot in slots.tolist()] + blank, "string"),
+        ("point_count", np.concatenate([np.ones(n, dtype=np.int64), cluster_counts]), "uint32"),
+    ])
+
+@app.get("/api/ais")
+async def get_ais_status():
+    """
+    AIS ingest counters and the current demand-driven subscription regions
+    (in api workers, only this worker's viewport demand is meaningful)
+    """
+    return {"ingest": ais_ingest.stats(), "subscription": ais_regions.stats()}
 
 @app.get("/api/ships")
-def get_ships():
+async def get_ships(
+    request: Request,
+    bbox: Optional[str] = Query(None, description="Viewport as west,south,east,north"),
+    zoom: Optional[float] = Query(None, ge=0, le=24),
+    limit: Optional[int] = Query(None, ge=1),
+    format: Optional[str] = Query(None, description="geojson (default) or packed"),
+):
     """
     Get real-time maritime traffic data
-    Returns GeoJSON of ship positions
+    Returns GeoJSON of ship positions, optionally limited to a viewport.
+    Below SHIP_CLUSTER_MAX_ZOOM nearby ships are aggregated into clusters.
+    ?format=packed or Accept: application/x-aethra-points selects the packed encoding.
     """
-    features = []
-    current_time = datetime.now(timezone.utc).timestamp()
-    
-    # Convert dict to list for iteration to avoid runtime errors if dict changes size
-    for mmsi, data in list(ships_data.items()):
-        # Filter out very old stale data (> 10 minutes)
-        if current_time - data.get('timestamp', 0) > 600:
-            continue
-            
-        if 'lat' not in data or 'lon' not in data:
+    try:
+        box = parse_bbox(bbox) if bbox else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    packed = layer_format(request, format)
+    ais_regions.touch(box)
+
+    profile = current_profile()
+    if zoom is not None and zoom < SHIP_CLUSTER_MAX_ZOOM:
+        with profile.phase("compute"):
+            slots = ships.query(SHIP_DISPLAY_MAX_AGE, box)
+        with profile.phase("serialize"):
+            if packed:
+                body = ship_packed(*cluster_ships(slots, zoom))
+            else:
+                body = feature_collection(ship_cluster_features(slots, zoom))
+    else:
+        with profile.phase("compute"):
+            slots = ships.query(SHIP_DISPLAY_MAX_AGE, box, limit)
+        with profile.phase("serialize"):
+            body = ship_packed(slots) if packed else feature_collection(ship_features(slots))
+
+    body, encoding = await compressed(request, body)
+    return layer_response(body, packed, encoding)
+
+
+def history_window(start, end, hours, max_hours):
+    """
+    Resolve start/end (Unix seconds) and a default span in hours into a validated range
+    """
+    end = time.time() if end is None else end
+    start = end - hours * 3600 if start is None else start
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    if end - start > max_hours * 3600:
+        raise HTTPException(status_code=400, detail=f"Time range is limited to {max_hours} hours")
+    return start, end
+
+@app.get("/api/ships/history")
+async def get_ship_history(
+    request: Request,
+    bbox: Optional[str] = Query(None, description="Area as west,south,east,north"),
+    start: Optional[float] = Query(None, description="Unix seconds (default: end minus hours)"),
+    end: Optional[float] = Query(None, description="Unix seconds (default: now)"),
+    hours: float = Query(1, gt=0, le=SHIP_HISTORY_MAX_HOURS),
+    limit: int = Query(200000, ge=1, le=2000000),
+    format: Optional[str] = Query(None, description="geojson (default) or packed"),
+):
+    """
+    Stored position reports of all traffic in an area over a time range, for replay
+    Points are in time order; above ``limit`` they are thinned evenly.
+    ?format=packed or Accept: application/x-aethra-points selects the packed encoding.
+    """
+    try:
+        box = parse_bbox(bbox) if bbox else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    start, end = history_window(start, end, hours, SHIP_HISTORY_MAX_HOURS)
+    packed = layer_format(request, format)
+    body = await limits.run("ship_history", run_compute(compute_ship_history, box, start, end, limit, packed))
+    body, encoding = await compressed(request, body)
+    return layer_response(body, packed, encoding)
+
+def compute_ship_history(box, start, end, limit, packed):
+    points = vessel_tracks.traffic(start, end, box)
+    count = len(points["time"])
+    if count > limit:
+        keep = np.linspace(0, count - 1, limit).astype(np.int64)
+        points = {column: values[keep] for column, values in points.items()}
+    columns = [
+        ("mmsi", points["mmsi"], "uint32"),
+        ("time", points["time"], "float64"),
+        ("speed", points["sog"], "float32"),
+        ("heading", points["cog"], "float32"),
+    ]
+    if packed:
+        return pack_points([("lon", points["lon"], "float32"), ("lat", points["lat"], "float32")] + columns)
+    return feature_collection(point_features(
+        points["lon"],
+        points["lat"],
+        [
+            ("mmsi", points["mmsi"]),
+            ("time", points["time"], 1),
+            ("speed", points["sog"], 1),
+            ("heading", points["cog"], 1),
+        ],
+        precision=COORDINATE_PRECISION,
+    ))
+
+@app.get("/api/ships/{mmsi}/track")
+async def get_ship_track(
+    mmsi: int,
+    start: Optional[float] = Query(None, description="Unix seconds (default: end minus hours)"),
+    end: Optional[float] = Query(None, description="Unix seconds (default: now)"),
+    hours: float = Query(6, gt=0, le=SHIP_TRACK_MAX_HOURS),
+):
+    """
+    Stored track of one vessel over a time range
+    Returns a GeoJSON Feature with a MultiLineString geometry; properties.times holds
+    the Unix time of every coordinate, in order
+    """
+    start, end = history_window(start, end, hours, SHIP_TRACK_MAX_HOURS)
+    # Looked up on the event loop: the ship store isn't shared with the compute threads
+    record = ships.get(mmsi)
+    name = record["name"] if record is not None and record["name"] is not None else "Unknown"
+    return Response(content=await offload("ship_history", compute_ship_track, mmsi, name, start, end),
+                    media_type="application/json")
+
+def compute_ship_track(mmsi, name, start, end):
+    times, lon, lat, sog, cog = vessel_tracks.track(mmsi, start, end)
+    return {
+        "type": "Feature",
+        "geometry": {
+            "type": "MultiLineString",
+            "coordinates": split_antimeridian(np.round(lon.astype(float), COORDINATE_PRECISION),
+                                              np.round(lat.astype(float), COORDINATE_PRECISION))
+        },
+        "properties": {
+            "mmsi": mmsi,
+            "name": name,
+            "start": start,
+            "end": end,
+            "points": len(times),
+            "times": np.round(times, 1),
+            "speed": np.round(sog.astype(float), 1),
+            "heading": np.round(cog.astype(float), 1),
+        }
+    }
+
+
+# --- Live push channel (/api/live) ---
+# Clients subscribe to "ships", "iss" or "satellites:<group>" and receive a
+# snapshot followed by sequence-numbered added/moved/removed deltas.
+
+live_hub = LiveHub()
+LIVE_SHIPS_INTERVAL = float(os.getenv("AETHRA_LIVE_SHIPS_INTERVAL", 2))
+LIVE_ORBIT_INTERVAL = float(os.getenv("AETHRA_LIVE_ORBIT_INTERVAL", 2))
+live_hub.add_layer("ships", ["lon", "lat", "speed", "heading"])
+live_hub.add_layer("iss", ["lon", "lat"])
+
+def live_layer(name):
+    """
+    Look up (creating satellite group layers on demand) a live layer, or None if unknown
+    """
+    if name.startswith("satellites:") and name.split(":", 1)[1] in catalog:
+        return live_hub.add_layer(name, ["lon", "lat", "altitude_km"])
+    return live_hub.layers.get(name)
+
+def ship_live_state(mmsis):
+    """
+    Live layer entries (properties, move) for the given MMSIs that have a position
+    """
+    state = {}
+    for mmsi in mmsis:
+        record = ships.get(mmsi)
+        if record is None or not (np.isfinite(record["lat"]) and np.isfinite(record["lon"])):
             continue
-            
-        feature = {
-            "type": "Feature",
-            "geometry": {
-                "type": "Point",
-                "coordinates": [data['lon'], data['lat']]
-            },
-            "properties": {
-                "mmsi": data.get("mmsi"),
-                "name": data.get("name", "Unknown"),
-                "type": data.get("ship_type", 0),
-                "speed": data.get("sog", 0),
-                "heading": data.get("cog", 0),
-                "destination": data.get("destination", "Unknown")
-            }
+        properties = {
+            "mmsi": mmsi,
+            "name": record["name"] if record["name"] is not None else "Unknown",
+            "type": record["ship_type"],
+            "destination": record["destination"] if record["destination"] is not None else "Unknown"
         }
-        features.append(feature)
-    
-    return {"type": "FeatureCollection", "features": features}
+        move = (round(record["lon"], 5), round(record["lat"], 5),
+                round(record["sog"], 1), round(record["cog"], 1))
+        state[mmsi] = (properties, move)
+    return state
+
+async def publish_ships():
+    """
+    Turn ShipStore changes into ships layer deltas every LIVE_SHIPS_INTERVAL seconds
+    """
+    layer = live_hub.layers["ships"]
+    last_cutoff = time.time() - SHIP_DISPLAY_MAX_AGE
+    while True:
+        await asyncio.sleep(LIVE_SHIPS_INTERVAL)
+        try:
+            cutoff = time.time() - SHIP_DISPLAY_MAX_AGE
+            changed, released = ships.drain_changes()
+            released.update(ships.expired_between(last_cutoff, cutoff))
+            last_cutoff = cutoff
+            layer.apply(ship_live_state(changed), released)
+        except Exception as e:
+            print(f"[live] ships publish failed: {e}")
+
+def orbit_live_state(name):
+    """
+    Propagate a live orbit layer ("iss" or "satellites:<group>") to now
+    """
+    if name == "iss":
+        position = compute_iss_position()
+        return {ISS_NORAD_ID: ({"name": "ISS"},
+                               (round(position["longitude"], 4), round(position["latitude"], 4)))}
+    snapshot = catalog.get(name.split(":", 1)[1])
+    if snapshot is None:
+        return {}
+    constellation = snapshot.constellation
+    subpoints = constellation.subpoints(ts.now())
+    valid = subpoints.valid
+    return {
+        sat_id: ({"name": sat_name, "id": sat_id}, (lon, lat, alt))
+        for sat_name, sat_id, lon, lat, alt in zip(
+            [sat_name for sat_name, ok in zip(constellation.names, valid) if ok],
+            constellation.ids[valid].tolist(),
+            subpoints.longitude[valid].round(3).tolist(),
+            subpoints.latitude[valid].round(3).tolist(),
+            subpoints.altitude_km[valid].round(1).tolist(),
+        )
+    }
+
+async def publish_orbit_layer(layer):
+    try:
+        state = await limits.run("satellites", run_compute(orbit_live_state, layer.name))
+    except Exception as e:
+        print(f"[live] {layer.name} publish failed: {e}")
+        return
+    layer.replace(state)
+
+async def publish_orbits():
+    """
+    Re-propagate orbit layers that have subscribers every LIVE_ORBIT_INTERVAL seconds
+    """
+    while True:
+        await asyncio.sleep(LIVE_ORBIT_INTERVAL)
+        for name, layer in list(live_hub.layers.items()):
+            if name != "ships" and layer.subscribers:
+                await publish_orbit_layer(layer)
+
+async def handle_live_message(client, message):
+    if "unsubscribe" in message:
+        client.unsubscribe(message["unsubscribe"])
+        return
+    layer = live_layer(str(message.get("subscribe", "")))
+    if layer is None:
+        client.enqueue(encode_json({"type": "error", "detail": f"Unknown layer: {message.get('subscribe')}"}))
+        return
+    bbox = message.get("bbox")
+    try:
+        box = parse_bbox(bbox if isinstance(bbox, str) else ",".join(map(str, bbox))) if bbox else None
+        since = int(message["since"]) if message.get("since") is not None else None
+    except (TypeError, ValueError) as e:
+        client.enqueue(encode_json({"type": "error", "layer": layer.name, "detail": str(e)}))
+        return
+    if layer.name != "ships" and layer.seq == 0:
+        # First subscriber to an orbit layer: propagate now instead of sending an empty snapshot
+        await publish_orbit_layer(layer)
+    client.subscribe(layer, since, box)
+
+async def send_live(websocket, client):
+    try:
+        while True:
+            for body in await client.next_bodies():
+                await websocket.send_bytes(body)
+    except Exception:
+        # Disconnects surface in the receive loop, which cleans up
+        pass
+
+@app.websocket("/api/live")
+async def live_socket(websocket: WebSocket):
+    """
+    Push channel for live layers. Send {"subscribe": layer, "since": seq, "bbox": "w,s,e,n"}
+    or {"unsubscribe": layer}; receive JSON snapshot and delta messages.
+    A client that falls too far behind is resynchronized with a fresh snapshot.
+    """
+    await websocket.accept()
+    client = LiveClient()
+    live_hub.clients.add(client)
+    sender = asyncio.create_task(send_live(websocket, client))
+    try:
+        while True:
+            text = await websocket.receive_text()
+            try:
+                message = json.loads(text)
+            except ValueError:
+                client.enqueue(encode_json({"type": "error", "detail": "Invalid JSON"}))
+                continue
+            if isinstance(message, dict):
+                await handle_live_message(client, message)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        client.close()
+        live_hub.clients.discard(client)
 
 if os.path.exists(frontend_dist_path):
     from fastapi.staticfiles import StaticFiles
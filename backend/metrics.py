@@ -0,0 +1,340 @@
+"""In-process metrics in the Prometheus text exposition format, plus request profiling.
+
+``Registry`` holds counters, gauges and histograms that the app updates as
+things happen (request latency, upstream fetches, AIS messages, event-loop
+lag).  State that components already keep in their ``stats()``/``status()``
+dicts is not counted twice: ``Registry.collector`` registers a callback that
+reads it at scrape time.  Each process exposes its own values, so with
+several API workers every worker is scraped (or labelled) separately.
+
+``Profile`` records named phases (compute, serialize, compress, ...) of one
+request; ``current_profile()`` returns the profile of the request being
+handled, or a no-op one when profiling is off.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+import httpx
+from starlette.datastructures import Headers, MutableHeaders, QueryParams
+
+# Seconds; covers cache hits (sub-millisecond) up to slow upstreams
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{_escape(value)}"' for name, value in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return "NaN"
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.label_names:
+            # Unlabelled series are reported from the start, even at zero
+            self.labels()
+
+    def labels(self, *values):
+        """The child series for one combination of label values (cached; keep a reference on hot paths)."""
+        values = tuple(str(value) for value in values)
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._child())
+        return child
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class _Value:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0):
+        with self._lock:
+            self.value += amount
+
+    def set(self, value):
+        self.value = value
+
+
+class Counter(_Metric):
+    kind = "counter"
+    _child = _Value
+
+    def inc(self, amount=1.0):
+        self.labels().inc(amount)
+
+    def render(self):
+        lines = self.header()
+        for values, child in sorted(self._children.items()):
+            lines.append(f"{self.name}{_labels(self.label_names, values)} {_number(child.value)}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value):
+        self.labels().set(value)
+
+
+class _Buckets:
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        # Linear scan: a dozen buckets is faster than bisect's call overhead
+        i = 0
+        for bound in self.bounds:
+            if value <= bound:
+                break
+            i += 1
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(name, help, labels)
+
+    def _child(self):
+        return _Buckets(self.buckets)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+    def render(self):
+        lines = self.header()
+        for values, child in sorted(self._children.items()):
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, values, [('le', _number(bound))])} "
+                             f"{cumulative}")
+            labels = _labels(self.label_names, values)
+            lines.append(f"{self.name}_sum{labels} {_number(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Every metric of the process, rendered together for ``/metrics``."""
+
+    def __init__(self, prefix="aethra_"):
+        self.prefix = prefix
+        self._metrics = {}
+        self._collectors = []
+
+    def _add(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labels=()):
+        return self._add(Counter(self.prefix + name, help, labels))
+
+    def gauge(self, name, help, labels=()):
+        return self._add(Gauge(self.prefix + name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(self.prefix + name, help, labels, buckets))
+
+    def collector(self, fn):
+        """Register ``fn()`` returning ``(name, kind, help, samples)`` tuples, read at scrape time.
+
+        ``samples`` is a list of ``(labels dict, value)``.  Usable as a decorator.
+        """
+        self._collectors.append(fn)
+        return fn
+
+    def render(self):
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for collect in self._collectors:
+            try:
+                families = list(collect())
+            except Exception as e:
+                print(f"[metrics] collector {collect.__name__} failed: {e}")
+                continue
+            for name, kind, help, samples in families:
+                name = self.prefix + name
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_labels(labels.keys(), labels.values())} {_number(value)}")
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+# --- Requests ---
+
+class RequestMetrics:
+    """ASGI middleware observing each HTTP request's latency by method, route template and status class.
+
+    With ``profiling`` on, requests carrying ``X-Aethra-Profile: 1`` or
+    ``?profile=1`` get a ``Server-Timing`` header with their profile's phases.
+    """
+
+    def __init__(self, app, duration, profiling=False):
+        self.app = app
+        self.duration = duration
+        self.profiling = profiling
+
+    def _wants_profile(self, scope):
+        return (Headers(scope=scope).get("x-aethra-profile") == "1"
+                or QueryParams(scope.get("query_string", b"")).get("profile") == "1")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = 500
+        profile = None
+        if self.profiling and self._wants_profile(scope):
+            profile = Profile()
+            token = _current.set(profile)
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if profile is not None:
+                    MutableHeaders(scope=message).append(
+                        "Server-Timing", profile.server_timing(time.perf_counter() - start))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            if profile is not None:
+                _current.reset(token)
+            route = scope.get("route")
+            self.duration.labels(scope["method"], getattr(route, "path", "other"), f"{status // 100}xx").observe(
+                time.perf_counter() - start)
+
+
+# --- Upstream HTTP ---
+
+class InstrumentedTransport(httpx.AsyncHTTPTransport):
+    """httpx transport timing every upstream request (to response headers) by host."""
+
+    def __init__(self, duration, errors, **kwargs):
+        super().__init__(**kwargs)
+        self.duration = duration
+        self.errors = errors
+
+    async def handle_async_request(self, request):
+        host = request.url.host
+        start = time.perf_counter()
+        try:
+            response = await super().handle_async_request(request)
+        except Exception as e:
+            self.errors.labels(host, type(e).__name__).inc()
+            raise
+        finally:
+            self.duration.labels(host).observe(time.perf_counter() - start)
+        if response.status_code >= 400:
+            self.errors.labels(host, str(response.status_code)).inc()
+        return response
+
+
+# --- Event loop ---
+
+async def monitor_event_loop(histogram, gauge, interval=0.5):
+    """Background task measuring how late the loop wakes a sleeping task (callbacks blocking it)."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - start - interval)
+        histogram.observe(lag)
+        gauge.set(lag)
+
+
+# --- Per-request profiling ---
+
+class Profile:
+    """Durations of the named phases of one request, reported as a ``Server-Timing`` header."""
+
+    def __init__(self):
+        self.phases = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        # Phases may run on compute threads, so they are appended under a lock
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.phases.append((name, time.perf_counter() - start))
+
+    def server_timing(self, total=None):
+        totals = {}
+        with self._lock:
+            for name, seconds in self.phases:
+                totals[name] = totals.get(name, 0.0) + seconds
+        entries = [f"{name};dur={seconds * 1000:.3f}" for name, seconds in totals.items()]
+        if total is not None:
+            entries.append(f"total;dur={total * 1000:.3f}")
+        return ", ".join(entries)
+
+
+class _NoProfile:
+    @contextmanager
+    def phase(self, name):
+        yield
+
+
+NO_PROFILE = _NoProfile()
+_current = contextvars.ContextVar("aethra_profile", default=NO_PROFILE)
+
+
+def current_profile():
+    """The profile of the request being handled; call on the event loop, before handing work to a thread."""
+    return _current.get()
+
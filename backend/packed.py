@@ -0,0 +1,139 @@
+"""Packed columnar encoding for point layers, plus response compression.
+
+The packed format carries the same information as a point FeatureCollection
+without repeating keys per feature, so it is a fraction of the size and can
+be read by a browser straight into typed arrays::
+
+    magic       4 bytes   b"AEP1"
+    header_len  uint32    little-endian length of the JSON header
+    header      JSON      {"count": n, "columns": [{"name", "type", "offset", ["table"]}]}
+    padding               zero bytes up to a multiple of 8
+    columns               little-endian arrays, each starting on an 8-byte boundary
+
+Numeric column types are NumPy names (``float32``, ``uint32``...).
+``string`` columns are stored as ``uint32`` indices into the column's
+``table`` of distinct values, which is listed in the header.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import struct
+
+import numpy as np
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+MAGIC = b"AEP1"
+MEDIA_TYPE = "application/x-aethra-points"
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 1024
+
+_NUMERIC_TYPES = ("float32", "float64", "int8", "int16", "int32", "uint8", "uint16", "uint32")
+
+
+def _align(n):
+    return (n + 7) & ~7
+
+
+def _string_column(values):
+    table = {}
+    indices = np.fromiter((table.setdefault("" if value is None else value, len(table)) for value in values),
+                          dtype="<u4", count=len(values))
+    return indices, list(table)
+
+
+def pack_points(columns):
+    """Encode ``columns`` -- a sequence of ``(name, values, type)`` -- as bytes.
+
+    All columns must have the same length.  By convention the first two are
+    ``lon`` and ``lat``.
+    """
+    count = None
+    specs, arrays = [], []
+    for name, values, kind in columns:
+        if kind == "string":
+            array, table = _string_column(values)
+            spec = {"name": name, "type": kind, "table": table}
+        elif kind in _NUMERIC_TYPES:
+            array = np.ascontiguousarray(values, dtype=np.dtype(kind).newbyteorder("<"))
+            spec = {"name": name, "type": kind}
+        else:
+            raise ValueError(f"Unsupported column type: {kind}")
+        if count is None:
+            count = len(array)
+        elif len(array) != count:
+            raise ValueError(f"Column {name} has {len(array)} values, expected {count}")
+        specs.append(spec)
+        arrays.append(array)
+
+    # Offsets are relative to the start of the column data section
+    offset = 0
+    for spec, array in zip(specs, arrays):
+        spec["offset"] = offset
+        offset = _align(offset + array.nbytes)
+
+    header = json.dumps({"count": count or 0, "columns": specs},
+                        ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    prefix_len = _align(8 + len(header))
+    out = bytearray(prefix_len + offset)
+    out[0:8] = MAGIC + struct.pack("<I", len(header))
+    out[8:8 + len(header)] = header
+    for spec, array in zip(specs, arrays):
+        start = prefix_len + spec["offset"]
+        out[start:start + array.nbytes] = array.tobytes()
+    return bytes(out)
+
+
+def unpack_points(body):
+    """Decode a packed body into ``{name: array or list of str}`` (used by tests and tools)."""
+    if body[:4] != MAGIC:
+        raise ValueError("Not a packed point body")
+    (header_len,) = struct.unpack("<I", body[4:8])
+    header = json.loads(body[8:8 + header_len])
+    base = _align(8 + header_len)
+    count = header["count"]
+    columns = {}
+    for spec in header["columns"]:
+        dtype = np.dtype("<u4" if spec["type"] == "string" else spec["type"]).newbyteorder("<")
+        array = np.frombuffer(body, dtype=dtype, count=count, offset=base + spec["offset"])
+        if spec["type"] == "string":
+            table = spec["table"]
+            columns[spec["name"]] = [table[i] for i in array.tolist()]
+        else:
+            columns[spec["name"]] = array
+    return columns
+
+
+def wants_packed(format, accept):
+    """True if the ``format`` query parameter or Accept header asks for the packed encoding."""
+    if format is not None:
+        return format == "packed"
+    return MEDIA_TYPE in (accept or "")
+
+
+def choose_encoding(accept_encoding):
+    """Pick ``br`` or ``gzip`` from an Accept-Encoding header, or None."""
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        token, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(token.strip().lower())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=6, mtime=0)
+    raise ValueError(f"Unsupported encoding: {encoding}")
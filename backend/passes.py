@@ -0,0 +1,329 @@
+"""Satellite pass prediction for an observer, screened across whole groups.
+
+Finding passes with per-satellite root finding (``EarthSatellite.find_events``)
+costs thousands of Skyfield position reductions per satellite.  Instead, a
+``PassPredictor`` works in three vectorized stages:
+
+1. Propagate: every satellite in a ``Constellation`` is propagated on a
+   coarse time grid (default 5 minutes) with one ``SatrecArray`` call.
+   Positions and velocities at the grid points define a cubic Hermite
+   interpolant, accurate to about 100 m for low orbits, so later stages can
+   evaluate any satellite at any time without calling SGP4 again.
+2. Screen: a satellite can only climb above the minimum altitude during a
+   grid interval if its angular distance from the observer at the two ends,
+   less the most it can move in between, is inside its visibility circle.
+   Only the intervals passing this test (a few percent) are sampled finely.
+3. Refine: altitude crossings in the fine samples are polished by regula
+   falsi and each pass's culmination found by golden-section search, all as
+   array operations over every candidate at once.
+
+Positions stay in SGP4's TEME frame, which differs from the Earth-fixed
+frame only by a rotation through Greenwich mean sidereal time (polar motion
+is a few meters and ignored).  The Sun comes from a low-precision analytic
+model (about 0.01 degrees), plenty for the Earth-shadow test and for
+"is the sky dark at the observer", so no ephemeris is needed.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from lunar import iso
+from propagation import _WGS84_A_KM, _WGS84_E2
+
+DEFAULT_COARSE_STEP = 300.0
+# Passes that stay above the minimum altitude for less than this are missed
+DEFAULT_FINE_STEP = 10.0
+# Passes already in progress at the window start (or still running at the
+# end) are screened this far outside it so their rise and set can be found
+DEFAULT_PADDING = 20 * 60.0
+# The observer's sky counts as dark once the Sun is below civil twilight
+DARK_SUN_ALTITUDE = -6.0
+
+EARTH_RADIUS_KM = _WGS84_A_KM
+EARTH_ROTATION_RATE = 7.2921159e-5  # rad/s
+_SGP4_EARTH_RADIUS_KM = 6378.135
+_UNIX_EPOCH_JD = 2440587.5
+# Slack on the visibility-circle test for geodetic vs geocentric vertical and interpolation
+_SCREEN_MARGIN = np.radians(0.5)
+_GOLDEN = (np.sqrt(5.0) - 1.0) / 2.0
+_REFINE_ITERATIONS = 6
+_FINE_BLOCK = 20_000
+_CULMINATION_ITERATIONS = 40
+
+
+def julian_dates(seconds):
+    """Split Unix timestamps into SGP4 (jd, fraction) arrays (UTC)."""
+    days, seconds_of_day = np.divmod(np.asarray(seconds, dtype=float), 86400.0)
+    return _UNIX_EPOCH_JD + days, seconds_of_day / 86400.0
+
+
+def gmst(seconds):
+    """Greenwich mean sidereal time in radians for Unix timestamps (IAU 1982, the angle defining TEME)."""
+    t = (np.asarray(seconds, dtype=float) / 86400.0 + (_UNIX_EPOCH_JD - 2451545.0)) / 36525.0
+    angle = ((-6.2e-6 * t + 0.093104) * t + 876600.0 * 3600.0 + 8640184.812866) * t + 67310.54841
+    return np.radians(angle / 240.0) % (2.0 * np.pi)
+
+
+def teme_to_earth_fixed(r, theta):
+    """Rotate TEME vectors (..., 3) into the Earth-fixed frame at sidereal angles ``theta`` (...)."""
+    c, s = np.cos(theta), np.sin(theta)
+    x, y = r[..., 0], r[..., 1]
+    return np.stack([c * x + s * y, c * y - s * x, r[..., 2]], axis=-1)
+
+
+def sun_direction(seconds):
+    """Unit vectors (..., 3) towards the Sun in the equatorial frame of date (TEME)."""
+    n = np.asarray(seconds, dtype=float) / 86400.0 + (_UNIX_EPOCH_JD - 2451545.0)
+    mean_lon = np.radians(280.460 + 0.9856474 * n)
+    anomaly = np.radians(357.528 + 0.9856003 * n)
+    ecliptic_lon = mean_lon + np.radians(1.915 * np.sin(anomaly) + 0.020 * np.sin(2.0 * anomaly))
+    obliquity = np.radians(23.439 - 4e-7 * n)
+    return np.stack([np.cos(ecliptic_lon),
+                     np.cos(obliquity) * np.sin(ecliptic_lon),
+                     np.sin(obliquity) * np.sin(ecliptic_lon)], axis=-1)
+
+
+def sunlit(r, sun):
+    """True where TEME positions ``r`` are outside Earth's (cylindrical) shadow."""
+    along = np.sum(r * sun, axis=-1)
+    across = np.linalg.norm(r - along[..., np.newaxis] * sun, axis=-1)
+    return (along > 0) | (across > EARTH_RADIUS_KM)
+
+
+class Observer:
+    """A WGS84 location with its Earth-fixed position and local horizon axes."""
+
+    def __init__(self, latitude, longitude, elevation_m=0.0):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.elevation_m = elevation_m
+        phi, lam = np.radians(latitude), np.radians(longitude)
+        sin_phi, cos_phi = np.sin(phi), np.cos(phi)
+        n = _WGS84_A_KM / np.sqrt(1.0 - _WGS84_E2 * sin_phi * sin_phi)
+        h = elevation_m / 1000.0
+        self.position = np.array([(n + h) * cos_phi * np.cos(lam),
+                                  (n + h) * cos_phi * np.sin(lam),
+                                  (n * (1.0 - _WGS84_E2) + h) * sin_phi])
+        self.up = np.array([cos_phi * np.cos(lam), cos_phi * np.sin(lam), sin_phi])
+        self.east = np.array([-np.sin(lam), np.cos(lam), 0.0])
+        self.north = np.array([-sin_phi * np.cos(lam), -sin_phi * np.sin(lam), cos_phi])
+
+    def altitude(self, r):
+        """Topocentric altitude in degrees of Earth-fixed positions ``r`` (..., 3)."""
+        relative = r - self.position
+        sin_alt = (relative @ self.up) / np.linalg.norm(relative, axis=-1)
+        return np.degrees(np.arcsin(np.clip(sin_alt, -1.0, 1.0)))
+
+    def look(self, r):
+        """Altitude, azimuth (degrees from north) and range (km) of Earth-fixed positions."""
+        relative = r - self.position
+        distance = np.linalg.norm(relative, axis=-1)
+        altitude = np.degrees(np.arcsin(np.clip((relative @ self.up) / distance, -1.0, 1.0)))
+        azimuth = np.degrees(np.arctan2(relative @ self.east, relative @ self.north)) % 360.0
+        return altitude, azimuth, distance
+
+
+def _hermite_basis(tau):
+    tau2, tau3 = tau * tau, tau * tau * tau
+    return 2 * tau3 - 3 * tau2 + 1, tau3 - 2 * tau2 + tau, 3 * tau2 - 2 * tau3, tau3 - tau2
+
+
+class GroupEphemeris:
+    """SGP4 states of a whole constellation on a grid, interpolated in between.
+
+    Positions and velocities are kept as float32 (meter-level precision)
+    so a day of a few thousand satellites fits in tens of megabytes.
+    """
+
+    def __init__(self, constellation, seconds):
+        self.seconds = seconds
+        self.step = float(seconds[1] - seconds[0])
+        jd, fraction = julian_dates(seconds)
+        n, m = len(constellation), len(seconds)
+        self.r = np.empty((n, m, 3), dtype=np.float32)
+        self.v = np.empty((n, m, 3), dtype=np.float32)
+        self.valid = np.empty((n, m), dtype=bool)
+        # Chunk over time so the float64 SGP4 output stays small
+        chunk = max(2, 500_000 // max(n, 1))
+        for first in range(0, m, chunk):
+            window = slice(first, first + chunk)
+            r, v, error = constellation.teme_states(jd[window], fraction[window])
+            self.r[:, window], self.v[:, window] = r, v
+            self.valid[:, window] = ~error & np.isfinite(r).all(axis=-1)
+
+    def teme(self, rows, t):
+        """TEME positions (..., 3) of satellites ``rows`` at times ``t`` (broadcast together)."""
+        x = (t - self.seconds[0]) / self.step
+        i = np.clip(np.floor(x).astype(np.int64), 0, len(self.seconds) - 2)
+        h00, h10, h01, h11 = (b[..., np.newaxis] for b in _hermite_basis(x - i))
+        r, v = self.r, self.v
+        return (h00 * r[rows, i] + h01 * r[rows, i + 1]
+                + self.step * (h10 * v[rows, i] + h11 * v[rows, i + 1]))
+
+    def altitude(self, observer, rows, t):
+        return observer.altitude(teme_to_earth_fixed(self.teme(rows, t), gmst(t)))
+
+
+class PassPredictor:
+    """Predicts passes of every satellite in a ``Constellation`` over an ``Observer``."""
+
+    def __init__(self, coarse_step=DEFAULT_COARSE_STEP, fine_step=DEFAULT_FINE_STEP,
+                 padding=DEFAULT_PADDING):
+        self.coarse_step = float(coarse_step)
+        self.substeps = max(1, int(round(coarse_step / fine_step)))
+        self.padding = padding
+
+    def screen(self, constellation, ephemeris, observer, min_altitude):
+        """Grid intervals (satellite rows, interval indices) where a pass is geometrically possible."""
+        r = teme_to_earth_fixed(ephemeris.r, gmst(ephemeris.seconds)[np.newaxis, :])
+        radius = np.linalg.norm(r, axis=-1)
+        site = observer.position / np.linalg.norm(observer.position)
+        # Angular distance between the sub-satellite point and the observer
+        separation = np.arccos(np.clip((r @ site) / radius, -1.0, 1.0))
+        # Largest such distance at which the satellite is above min_altitude
+        e = np.radians(min_altitude)
+        horizon = np.arccos(np.clip(np.linalg.norm(observer.position) * np.cos(e) / radius, -1.0, 1.0)) - e
+
+        # Fastest the sub-satellite point can move relative to the observer: at perigee
+        models = [sat.model for sat in constellation.satellites]
+        perigee = np.array([m.a * (1.0 - m.ecco) for m in models]) * _SGP4_EARTH_RADIUS_KM
+        momentum = np.linalg.norm(np.cross(ephemeris.r[:, 0], ephemeris.v[:, 0]), axis=-1)
+        rate = 1.05 * momentum / perigee ** 2 + EARTH_ROTATION_RATE
+
+        reach = np.maximum(horizon[:, :-1], horizon[:, 1:]) * 2.0 + _SCREEN_MARGIN
+        possible = (separation[:, :-1] + separation[:, 1:]
+                    <= reach + (rate * self.coarse_step)[:, np.newaxis])
+        possible &= ephemeris.valid[:, :-1] & ephemeris.valid[:, 1:]
+        return np.nonzero(possible)
+
+    def _crossings(self, ephemeris, observer, rows, intervals, min_altitude):
+        """Refined (row, time, direction) of every min_altitude crossing in the screened intervals."""
+        k = np.arange(self.substeps + 1) / self.substeps
+        brackets = [(rows[:0], np.empty(0), np.empty(0), np.empty(0), np.empty(0))]
+        # Sample in blocks so the (intervals x substeps x 3) temporaries stay small
+        for first in range(0, len(rows), _FINE_BLOCK):
+            block_rows = rows[first:first + _FINE_BLOCK]
+            times = ephemeris.seconds[intervals[first:first + _FINE_BLOCK]][:, np.newaxis] + self.coarse_step * k
+            altitude = ephemeris.altitude(observer, block_rows[:, np.newaxis], times) - min_altitude
+            above = altitude >= 0
+            p, j = np.nonzero(above[:, 1:] != above[:, :-1])
+            brackets.append((block_rows[p], times[p, j], times[p, j + 1], altitude[p, j], altitude[p, j + 1]))
+        row, lo, hi, f_lo, f_hi = (np.concatenate(column) for column in zip(*brackets))
+        direction = np.where(f_hi > f_lo, 1, -1)
+        # Illinois-style regula falsi on the interpolated altitude
+        for _ in range(_REFINE_ITERATIONS):
+            t = lo - f_lo * (hi - lo) / (f_hi - f_lo)
+            f = ephemeris.altitude(observer, row, t) - min_altitude
+            same = np.signbit(f) == np.signbit(f_lo)
+            # Halve the stale end's value so it can't get stuck (Illinois variant)
+            lo, f_lo, hi, f_hi = (np.where(same, t, lo), np.where(same, f, f_lo * 0.5),
+                                  np.where(same, hi, t), np.where(same, f_hi * 0.5, f))
+        t = lo - f_lo * (hi - lo) / (f_hi - f_lo)
+        order = np.lexsort((t, row))
+        return row[order], t[order], direction[order]
+
+    def _culminations(self, ephemeris, observer, rows, lo, hi):
+        """Time of maximum altitude in [lo, hi] for each pass (golden-section search)."""
+        a, b = lo.copy(), hi.copy()
+        c, d = b - _GOLDEN * (b - a), a + _GOLDEN * (b - a)
+        fc, fd = ephemeris.altitude(observer, rows, c), ephemeris.altitude(observer, rows, d)
+        for _ in range(_CULMINATION_ITERATIONS):
+            left = fc > fd
+            # Keep [a, d] when the maximum is left of d, else [c, b]
+            a, b = np.where(left, a, c), np.where(left, d, b)
+            new = np.where(left, b - _GOLDEN * (b - a), a + _GOLDEN * (b - a))
+            fnew = ephemeris.altitude(observer, rows, new)
+            c, d, fc, fd = (np.where(left, new, d), np.where(left, c, new),
+                            np.where(left, fnew, fd), np.where(left, fc, fnew))
+        return (a + b) / 2.0
+
+    def predict(self, constellation, observer, start, end, min_altitude=10.0,
+                visible_only=False, limit=None):
+        """Passes overlapping [start, end] (Unix seconds), sorted by rise time.
+
+        Each pass is a dict with ``rise``, ``culmination`` and ``set`` events
+        (``None`` if the pass started or ends beyond the screened window),
+        each holding time, altitude, azimuth, range and whether the satellite
+        is sunlit, plus an overall ``visible`` flag: sunlit at some event
+        while the observer's sky is dark.
+        """
+        if len(constellation) == 0:
+            return []
+        first = np.floor((start - self.padding) / self.coarse_step) * self.coarse_step
+        count = int(np.ceil((end + self.padding - first) / self.coarse_step)) + 1
+        seconds = first + self.coarse_step * np.arange(max(count, 2), dtype=float)
+        ephemeris = GroupEphemeris(constellation, seconds)
+
+        rows, intervals = self.screen(constellation, ephemeris, observer, min_altitude)
+        row, t, direction = self._crossings(ephemeris, observer, rows, intervals, min_altitude)
+
+        # Pair each rise with the following set of the same satellite; a set
+        # with no rise before it (or a rise with no set) is cut by the grid edge
+        same_next = np.append(row[1:] == row[:-1], False)
+        paired = (direction == 1) & same_next & (np.append(direction[1:], 0) == -1)
+        closing = np.zeros_like(paired)
+        closing[1:] = paired[:-1]
+        lone_rise = (direction == 1) & ~paired
+        lone_set = (direction == -1) & ~closing
+        rise = np.concatenate([t[paired], t[lone_rise], np.full(lone_set.sum(), np.nan)])
+        set_ = np.concatenate([t[closing], np.full(lone_rise.sum(), np.nan), t[lone_set]])
+        pass_rows = np.concatenate([row[paired], row[lone_rise], row[lone_set]])
+
+        lo = np.where(np.isnan(rise), seconds[0], rise)
+        hi = np.where(np.isnan(set_), seconds[-1], set_)
+        keep = (hi >= start) & (lo <= end)
+        rise, set_, pass_rows, lo, hi = rise[keep], set_[keep], pass_rows[keep], lo[keep], hi[keep]
+        culmination = self._culminations(ephemeris, observer, pass_rows, lo, hi)
+
+        return self._describe(constellation, ephemeris, observer, pass_rows, rise, culmination, set_,
+                              visible_only, limit)
+
+    def _describe(self, constellation, ephemeris, observer, rows, rise, culmination, set_,
+                  visible_only=False, limit=None):
+        """Look angles, illumination and visibility at every event, for all passes at once."""
+        times = np.stack([rise, culmination, set_], axis=1)
+        known = ~np.isnan(times)
+        times = np.where(known, times, culmination[:, np.newaxis])
+        r = ephemeris.teme(rows[:, np.newaxis], times)
+        theta = gmst(times)
+        altitude, azimuth, distance = observer.look(teme_to_earth_fixed(r, theta))
+        sun = sun_direction(times)
+        lit = sunlit(r, sun)
+        dark = teme_to_earth_fixed(sun, theta) @ observer.up < np.sin(np.radians(DARK_SUN_ALTITUDE))
+        visible = np.any(lit & dark & known, axis=1)
+
+        # Only the passes actually returned are turned into dicts
+        order = np.argsort(np.where(known[:, 0], times[:, 0], times[:, 1]), kind="stable")
+        if visible_only:
+            order = order[visible[order]]
+        passes = []
+        for index in order[:limit].tolist():
+            row = int(rows[index])
+            satellite = constellation.satellites[row]
+            events = {}
+            for column, name in enumerate(("rise", "culmination", "set")):
+                if not known[index, column]:
+                    events[name] = None
+                    continue
+                t = float(times[index, column])
+                events[name] = {
+                    "time": iso(t),
+                    "timestamp": round(t, 1),
+                    "altitude": round(float(altitude[index, column]), 2),
+                    "azimuth": round(float(azimuth[index, column]), 2),
+                    "range_km": round(float(distance[index, column]), 1),
+                    "sunlit": bool(lit[index, column]),
+                }
+            duration = None
+            if known[index, 0] and known[index, 2]:
+                duration = round(float(times[index, 2] - times[index, 0]), 1)
+            passes.append(dict(
+                norad_id=int(satellite.model.satnum),
+                name=satellite.name,
+                max_altitude=events["culmination"]["altitude"],
+                duration=duration,
+                visible=bool(visible[index]),
+                **events,
+            ))
+        return passes
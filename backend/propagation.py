@@ -0,0 +1,166 @@
+"""Vectorized SGP4 propagation for whole satellite constellations."""
+
+from __future__ import annotations
+
+import io
+import os
+from collections import namedtuple
+
+import numpy as np
+from sgp4.api import SatrecArray
+from skyfield.constants import DAY_S
+from skyfield.framelib import itrs
+from skyfield.functions import mxm
+from skyfield.iokit import parse_tle_file
+from skyfield.sgp4lib import TEME
+from skyfield.toposlib import wgs84
+
+# WGS84 ellipsoid in kilometers, matching skyfield.toposlib.wgs84
+_WGS84_A_KM = wgs84.radius.km
+_WGS84_E2 = wgs84._e2
+
+Subpoints = namedtuple("Subpoints", ["longitude", "latitude", "altitude_km", "valid"])
+
+
+def epoch_times(ts, seconds):
+    """Build a Skyfield Time (scalar or array) from Unix timestamps."""
+    # Split into whole days so Skyfield applies the leap seconds of the target date
+    days, seconds_of_day = np.divmod(seconds, 86400.0)
+    return ts.utc(1970, 1, 1 + days, 0, 0, seconds_of_day)
+
+
+def unix_seconds(t):
+    """Inverse of ``epoch_times``: Unix timestamps (float array) for a Skyfield Time."""
+    utc_days = t.whole - 2440587.5 + (t.tai_fraction - t._leap_seconds() / DAY_S)
+    return utc_days * DAY_S
+
+
+def _time_arrays(t):
+    """Return SGP4 (jd, fraction) arrays for a scalar or array Time."""
+    jd = np.atleast_1d(t.whole)
+    fraction = np.atleast_1d(t.tai_fraction - t._leap_seconds() / DAY_S)
+    return jd, fraction
+
+
+def _teme_to_itrs(t):
+    """Return the TEME -> ITRS rotation as a (3, 3, m) stack of matrices."""
+    R = mxm(itrs.rotation_at(t), np.swapaxes(TEME.rotation_at(t), 0, 1))
+    if R.ndim == 2:
+        R = R[:, :, np.newaxis]
+    return R
+
+
+def geodetic(x, y, z):
+    """Convert ITRS kilometers to WGS84 (lon, lat, altitude_km) arrays.
+
+    Uses the same fixed three-iteration scheme as Skyfield so results
+    agree with ``wgs84.subpoint`` to floating point precision.
+    """
+    R = np.sqrt(x * x + y * y)
+    lat = np.arctan2(z, R)
+    for _ in range(3):
+        sin_lat = np.sin(lat)
+        e2_sin_lat = _WGS84_E2 * sin_lat
+        aC = _WGS84_A_KM / np.sqrt(1.0 - e2_sin_lat * sin_lat)
+        hyp = z + aC * e2_sin_lat
+        lat = np.arctan2(hyp, R)
+    lon = (np.arctan2(y, x) - np.pi) % (2.0 * np.pi) - np.pi
+    altitude = np.sqrt(hyp * hyp + R * R) - aC
+    return np.degrees(lon), np.degrees(lat), altitude
+
+
+class Constellation:
+    """Array-backed orbital elements for a group of ``EarthSatellite`` objects.
+
+    All satellites are propagated together through ``sgp4.api.SatrecArray``
+    so a whole group costs one C-level SGP4 call plus a handful of NumPy
+    operations per timestamp, instead of one Skyfield position per object.
+    """
+
+    def __init__(self, satellites):
+        self.satellites = list(satellites)
+        self.names = [sat.name for sat in self.satellites]
+        self.ids = np.array([sat.model.satnum for sat in self.satellites], dtype=np.int64)
+        self._array = SatrecArray([sat.model for sat in self.satellites]) if self.satellites else None
+
+    def __len__(self):
+        return len(self.satellites)
+
+    def teme_states(self, jd, fraction):
+        """Return raw SGP4 TEME positions (km) and velocities (km/s), shape (n, m, 3), and an error mask.
+
+        ``jd`` and ``fraction`` are UTC Julian date arrays as SGP4 expects them.
+        """
+        if self._array is None:
+            empty = np.empty((0, len(jd), 3))
+            return empty, empty, np.empty((0, len(jd)), dtype=bool)
+        error, r, v = self._array.sgp4(jd, fraction)
+        return r, v, error != 0
+
+    def itrs_km(self, t):
+        """Return ITRS positions in km with shape (n, m, 3) and an error mask.
+
+        ``t`` may be a scalar or array Skyfield ``Time``; ``m`` is 1 for a
+        scalar time.  The mask is True wherever SGP4 reported an error.
+        """
+        jd, fraction = _time_arrays(t)
+        if self._array is None:
+            return np.empty((0, len(jd), 3)), np.empty((0, len(jd)), dtype=bool)
+        error, r, _ = self._array.sgp4(jd, fraction)
+        R = _teme_to_itrs(t)
+        xyz = np.einsum("ijm,nmj->nmi", R, r)
+        return xyz, error != 0
+
+    def subpoints(self, t):
+        """Return WGS84 subpoints for every satellite at time ``t``.
+
+        Arrays have shape (n,) for a scalar time and (n, m) for an array
+        of m times.  ``valid`` is False for decayed or errored elements.
+        """
+        xyz, error = self.itrs_km(t)
+        lon, lat, alt = geodetic(xyz[..., 0], xyz[..., 1], xyz[..., 2])
+        valid = ~error & np.isfinite(lat) & np.isfinite(lon)
+        if np.ndim(t.tt) == 0:
+            lon, lat, alt, valid = lon[:, 0], lat[:, 0], alt[:, 0], valid[:, 0]
+        return Subpoints(lon, lat, alt, valid)
+
+
+# --- Process pool entry point ---
+# Worker processes keep their own parsed copy of each TLE file, keyed by
+# mtime, so only the timestamp and the result arrays cross the process boundary.
+
+_worker_ts = None
+_worker_constellations = {}
+
+
+def _timescale():
+    global _worker_ts
+    if _worker_ts is None:
+        from skyfield.api import load
+        _worker_ts = load.timescale()
+    return _worker_ts
+
+
+def subpoints_from_file(path, unix_seconds):
+    """Propagate the TLE file at ``path``; returns (ids, Subpoints)."""
+    ts = _timescale()
+    mtime = os.path.getmtime(path)
+    cached = _worker_constellations.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path, 'rb') as f:
+            satellites = list(parse_tle_file(io.BytesIO(f.read()), ts))
+        cached = _worker_constellations[path] = (mtime, Constellation(satellites))
+    constellation = cached[1]
+    return constellation.ids, constellation.subpoints(epoch_times(ts, unix_seconds))
+
+
+def constellation_from_files(paths):
+    """One ``Constellation`` of every satellite in the TLE files at ``paths``; the first listing of a NORAD id wins."""
+    satellites, seen = [], set()
+    for path in paths:
+        with open(path, 'rb') as f:
+            for satellite in parse_tle_file(io.BytesIO(f.read()), _timescale()):
+                if satellite.model.satnum not in seen:
+                    seen.add(satellite.model.satnum)
+                    satellites.append(satellite)
+    return Constellation(satellites)
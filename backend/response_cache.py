@@ -0,0 +1,143 @@
+"""Time-bucketed cache of pre-serialized JSON responses.
+
+Results are keyed by endpoint (plus any arguments) and a quantized time
+bucket, so every client polling within the same bucket shares one
+computation.  Concurrent misses for the same key are collapsed into a
+single computation ("single-flight"); everyone else waits for its result.
+Bodies are stored as JSON bytes so hits skip serialization entirely.
+
+The cache is only used from the event loop: ``get_bytes_async`` returns
+the body and ``get_async`` wraps it in a Response.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib encoder
+    orjson = None
+
+
+def encode_json(content):
+    """Serialize like Starlette's JSONResponse, but once.
+
+    Uses orjson when it is installed (several times faster on large
+    payloads); NumPy arrays and scalars are accepted either way.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+        default=_numpy_default,
+    ).encode("utf-8")
+
+
+def _numpy_default(value):
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class ResponseCache:
+    """Bucket cache shared by all request handlers on the event loop."""
+
+    def __init__(self, max_entries=256, clock=time.time):
+        self.max_entries = max_entries
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (bucket, body)
+        self._inflight = {}  # (key, bucket) -> asyncio.Future
+
+    def bucket(self, ttl):
+        return int(self.clock() // ttl)
+
+    def _lookup(self, key, bucket):
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == bucket:
+            self._entries.move_to_end(key)
+            return entry[1]
+        return None
+
+    def _store(self, key, bucket, body):
+        self._entries[key] = (bucket, body)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_bytes_async(self, key, ttl, compute, encode=encode_json):
+        """Return the cached body for ``key`` in the current bucket.
+
+        ``compute`` is a zero-argument callable returning an awaitable, and
+        is only called by the first caller to miss a bucket; callers
+        arriving while it runs wait for it and share its result (or its
+        exception, which is not cached).  If the awaited result is already
+        ``bytes`` it is stored as-is, which lets callers encode large
+        payloads off the event loop.
+
+        Cancelling the computing caller (its client went away) does not
+        fail the others: one of them takes over the computation.
+        """
+        bucket = self.bucket(ttl)
+        while True:
+            body = self._lookup(key, bucket)
+            if body is not None:
+                self.hits += 1
+                return body
+            future = self._inflight.get((key, bucket))
+            if future is None:
+                break
+            body = await asyncio.shield(future)
+            if body is not None:
+                self.hits += 1
+                return body
+
+        future = self._inflight[(key, bucket)] = asyncio.get_running_loop().create_future()
+        self.misses += 1
+        try:
+            result = await compute()
+            body = result if isinstance(result, bytes) else encode(result)
+            self._store(key, bucket, body)
+            future.set_result(body)
+            return body
+        except asyncio.CancelledError:
+            # None wakes the waiters without a result, so one of them recomputes
+            future.set_result(None)
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so an unobserved failure doesn't log a warning
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop((key, bucket), None)
+
+    async def get_async(self, key, ttl, compute, media_type="application/json"):
+        """Like ``get_bytes_async`` but wrapped in a ready-to-return Response."""
+        body = await self.get_bytes_async(key, ttl, compute)
+        return Response(content=body, media_type=media_type)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else None,
+        }
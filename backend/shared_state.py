@@ -0,0 +1,210 @@
+"""Ship state shared between one ingest process and many API workers.
+
+With several uvicorn workers every process would otherwise open its own AIS
+WebSocket and hold a different, partial set of vessels.  Instead a single
+``ingest`` process owns the feed and periodically writes the whole
+``ShipStore`` as one packed columnar file (see ``packed.py``) to a shared
+directory, ``/dev/shm`` by default.  The file is written to a temporary name
+and renamed into place, so readers only ever see complete snapshots.
+
+``SharedShipView`` is the API workers' read-only stand-in for ``ShipStore``:
+it memory-maps the latest snapshot, so the numeric columns are NumPy views
+of the same page-cache pages in every worker rather than copies, and it
+derives the changed/released MMSI sets the live channel needs by diffing
+consecutive snapshots.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import mmap
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from packed import pack_points, unpack_points
+from spatial import bbox_mask
+
+SHIP_SNAPSHOT_FILE = "aethra-ships.aep"
+
+
+def shared_dir():
+    """``AETHRA_SHARED_DIR``, else ``/dev/shm`` (memory backed) where it exists."""
+    default = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.getenv("AETHRA_SHARED_DIR", default)
+
+
+def ship_snapshot_path(directory=None):
+    return os.path.join(directory or shared_dir(), SHIP_SNAPSHOT_FILE)
+
+
+def write_ship_snapshot(store, path):
+    """Atomically replace ``path`` with every vessel in ``store``; returns the vessel count."""
+    slots = np.flatnonzero(store.in_use)
+    body = pack_points([
+        ("lon", store.lon[slots], "float32"),
+        ("lat", store.lat[slots], "float32"),
+        ("mmsi", store.mmsi[slots], "uint32"),
+        ("sog", store.sog[slots], "float32"),
+        ("cog", store.cog[slots], "float32"),
+        ("ship_type", store.ship_type[slots], "int16"),
+        ("updated", store.updated[slots], "float64"),
+        ("name", [store.name[slot] for slot in slots.tolist()], "string"),
+        ("callsign", [store.callsign[slot] for slot in slots.tolist()], "string"),
+        ("destination", [store.destination[slot] for slot in slots.tolist()], "string"),
+    ])
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(body)
+    os.replace(tmp_path, path)
+    return len(slots)
+
+
+async def run_snapshot_writer(store, path, interval=1.0):
+    """Background task publishing ``store`` every ``interval`` seconds (ingest role)."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            # On the event loop, so the snapshot never interleaves with an update
+            write_ship_snapshot(store, path)
+        except Exception as e:
+            print(f"[shared] ship snapshot write failed: {e}")
+
+
+def _optional(values):
+    # The packed format stores missing strings as ""
+    return [value or None for value in values]
+
+
+class SharedShipView:
+    """Read-only ``ShipStore`` interface over the ingest process's latest snapshot.
+
+    "Slots" are row indices into the current snapshot; they stay valid until
+    the next ``refresh``, which only happens inside ``query``, ``get`` and
+    ``drain_changes``.
+    """
+
+    def __init__(self, path, check_interval=0.5):
+        self.path = path
+        self.check_interval = check_interval
+        self.snapshots = 0
+        self.changed = set()
+        self.released = set()
+        self._identity = None
+        self._checked = None
+        self._rows = None
+        self._load({
+            "lon": np.empty(0, dtype=np.float32), "lat": np.empty(0, dtype=np.float32),
+            "mmsi": np.empty(0, dtype=np.uint32), "sog": np.empty(0, dtype=np.float32),
+            "cog": np.empty(0, dtype=np.float32), "ship_type": np.empty(0, dtype=np.int16),
+            "updated": np.empty(0), "name": [], "callsign": [], "destination": [],
+        })
+
+    def _load(self, columns):
+        self.lon, self.lat, self.mmsi = columns["lon"], columns["lat"], columns["mmsi"]
+        self.sog, self.cog, self.ship_type = columns["sog"], columns["cog"], columns["ship_type"]
+        self.updated = columns["updated"]
+        self.name = _optional(columns["name"])
+        self.callsign = _optional(columns["callsign"])
+        self.destination = _optional(columns["destination"])
+        self.in_use = np.ones(len(self.mmsi), dtype=bool)
+        self._rows = None
+
+    def refresh(self, now=None):
+        """Map a newer snapshot if one was published; returns True if the view changed."""
+        now = time.monotonic() if now is None else now
+        if self._checked is not None and now - self._checked < self.check_interval:
+            return False
+        self._checked = now
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if identity == self._identity:
+            return False
+        with open(self.path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        old_mmsi, old_updated = self.mmsi, self.updated
+        self._load(unpack_points(mapped))
+        self._identity = identity
+        self.snapshots += 1
+        self._diff(old_mmsi, old_updated)
+        return True
+
+    def _diff(self, old_mmsi, old_updated):
+        order = np.argsort(old_mmsi)
+        sorted_mmsi = old_mmsi[order]
+        position = np.minimum(np.searchsorted(sorted_mmsi, self.mmsi), max(len(order) - 1, 0))
+        if len(order):
+            known = sorted_mmsi[position] == self.mmsi
+            same = known & (old_updated[order[position]] == self.updated)
+        else:
+            same = np.zeros(len(self.mmsi), dtype=bool)
+        changed = self.mmsi[~same].tolist()
+        released = old_mmsi[~np.isin(old_mmsi, self.mmsi)].tolist()
+        self.changed.update(changed)
+        self.changed.difference_update(released)
+        self.released.difference_update(changed)
+        self.released.update(released)
+
+    def __len__(self):
+        return len(self.mmsi)
+
+    def __contains__(self, mmsi):
+        return self._row(mmsi) is not None
+
+    def _row(self, mmsi):
+        self.refresh()
+        if self._rows is None:
+            self._rows = dict(zip(self.mmsi.tolist(), range(len(self.mmsi))))
+        return self._rows.get(mmsi)
+
+    def get(self, mmsi):
+        row = self._row(mmsi)
+        if row is None:
+            return None
+        return {
+            "mmsi": int(self.mmsi[row]),
+            "lat": float(self.lat[row]),
+            "lon": float(self.lon[row]),
+            "sog": float(self.sog[row]),
+            "cog": float(self.cog[row]),
+            "name": self.name[row],
+            "ship_type": int(self.ship_type[row]),
+            "callsign": self.callsign[row],
+            "destination": self.destination[row],
+            "timestamp": float(self.updated[row]),
+        }
+
+    def query(self, max_age, bbox=None, limit=None, now=None):
+        """Same contract as ``ShipStore.query``, by a vectorized scan of the snapshot."""
+        self.refresh()
+        cutoff = (time.time() if now is None else now) - max_age
+        mask = (self.updated >= cutoff) & np.isfinite(self.lat) & np.isfinite(self.lon)
+        if bbox is not None:
+            mask &= bbox_mask(self.lon, self.lat, *bbox)
+        rows = np.flatnonzero(mask)
+        if limit is not None and len(rows) > limit:
+            newest = np.argpartition(-self.updated[rows], limit - 1)[:limit]
+            rows = np.sort(rows[newest])
+        return rows
+
+    def expired_between(self, start, end):
+        mask = (self.updated >= start) & (self.updated < end)
+        return self.mmsi[mask].astype(np.int64).tolist()
+
+    def drain_changes(self):
+        self.refresh()
+        changed, released = self.changed, self.released
+        self.changed, self.released = set(), set()
+        return changed, released
+
+    def stats(self):
+        return {
+            "size": len(self),
+            "snapshots": self.snapshots,
+            "source": self.path,
+        }
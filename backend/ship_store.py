@@ -0,0 +1,237 @@
+"""Compact, slot-backed store for live AIS vessel state.
+
+Every vessel occupies one slot in a set of preallocated NumPy columns
+(position, speed, course, type, last update).  The few string fields live in
+parallel Python lists.  An ``OrderedDict`` maps MMSI -> slot in
+least-recently-updated order, so updates, evictions and age-based pruning are
+all O(1) per vessel; nothing is ever sorted or rebuilt in the ingest path.
+A ``GridIndex`` over slot positions is kept up to date on every position
+report so viewport queries only touch the cells they overlap.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from spatial import GridIndex, bbox_mask
+
+DEFAULT_CAPACITY = int(os.getenv("AETHRA_SHIP_CAPACITY", 50000))
+# Vessels silent for longer than this are pruned from memory entirely
+DEFAULT_RETENTION = float(os.getenv("AETHRA_SHIP_RETENTION", 1800))
+
+
+class ShipStore:
+    """Fixed-capacity vessel table keyed by MMSI with LRU eviction."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, cell_degrees=1.0):
+        self.capacity = capacity
+        self.mmsi = np.zeros(capacity, dtype=np.int64)
+        self.lat = np.full(capacity, np.nan, dtype=np.float32)
+        self.lon = np.full(capacity, np.nan, dtype=np.float32)
+        self.sog = np.zeros(capacity, dtype=np.float32)
+        self.cog = np.zeros(capacity, dtype=np.float32)
+        self.ship_type = np.zeros(capacity, dtype=np.int16)
+        self.updated = np.zeros(capacity, dtype=np.float64)
+        self.in_use = np.zeros(capacity, dtype=bool)
+        self.name = [None] * capacity
+        self.callsign = [None] * capacity
+        self.destination = [None] * capacity
+        self._slots = OrderedDict()  # mmsi -> slot, oldest update first
+        self._free = list(range(capacity - 1, -1, -1))
+        self.index = GridIndex(cell_degrees)
+        self.evicted = 0
+        self.pruned = 0
+        self.updates = 0
+        # MMSIs touched / dropped since the last drain_changes(), for live deltas
+        self.changed = set()
+        self.released = set()
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __contains__(self, mmsi):
+        return mmsi in self._slots
+
+    def _release(self, mmsi):
+        slot = self._slots.pop(mmsi)
+        self.in_use[slot] = False
+        self.index.remove(slot)
+        self.lat[slot] = self.lon[slot] = np.nan
+        self.sog[slot] = self.cog[slot] = 0
+        self.ship_type[slot] = 0
+        self.name[slot] = self.callsign[slot] = self.destination[slot] = None
+        self._free.append(slot)
+        self.changed.discard(mmsi)
+        self.released.add(mmsi)
+
+    def _touch(self, mmsi, now):
+        """Return ``mmsi``'s slot, allocating (and evicting if full) as needed."""
+        slot = self._slots.get(mmsi)
+        if slot is None:
+            if not self._free:
+                oldest = next(iter(self._slots))
+                self._release(oldest)
+                self.evicted += 1
+            slot = self._free.pop()
+            self.mmsi[slot] = mmsi
+            self.in_use[slot] = True
+            self._slots[mmsi] = slot
+            self.released.discard(mmsi)
+        else:
+            self._slots.move_to_end(mmsi)
+        self.updated[slot] = now
+        self.updates += 1
+        self.changed.add(mmsi)
+        return slot
+
+    def update_position(self, mmsi, lat, lon, sog, cog, now=None):
+        slot = self._touch(mmsi, time.time() if now is None else now)
+        self.lat[slot] = lat
+        self.lon[slot] = lon
+        self.sog[slot] = sog
+        self.cog[slot] = cog
+        self.index.update(slot, lat, lon)
+        return slot
+
+    def update_positions(self, mmsis, lat, lon, sog, cog, now=None):
+        """Apply a batch of position reports, at most one per MMSI, in one step.
+
+        ``now`` may be a scalar or one timestamp per report.  Returns the slots.
+        """
+        now = time.time() if now is None else now
+        slots = np.fromiter((self._touch(mmsi, 0.0) for mmsi in mmsis), dtype=np.int64, count=len(mmsis))
+        self.updated[slots] = now
+        self.lat[slots] = lat
+        self.lon[slots] = lon
+        self.sog[slots] = sog
+        self.cog[slots] = cog
+        update = self.index.update
+        for slot, y, x in zip(slots.tolist(), self.lat[slots].tolist(), self.lon[slots].tolist()):
+            update(slot, y, x)
+        return slots
+
+    def update_static(self, mmsi, name, ship_type, callsign, destination, now=None):
+        slot = self._touch(mmsi, time.time() if now is None else now)
+        self.name[slot] = name
+        self.ship_type[slot] = ship_type
+        self.callsign[slot] = callsign
+        self.destination[slot] = destination
+        return slot
+
+    def get(self, mmsi):
+        """Return one vessel as a dict, or None."""
+        slot = self._slots.get(mmsi)
+        if slot is None:
+            return None
+        return self.record(slot)
+
+    def record(self, slot):
+        return {
+            "mmsi": int(self.mmsi[slot]),
+            "lat": float(self.lat[slot]),
+            "lon": float(self.lon[slot]),
+            "sog": float(self.sog[slot]),
+            "cog": float(self.cog[slot]),
+            "name": self.name[slot],
+            "ship_type": int(self.ship_type[slot]),
+            "callsign": self.callsign[slot],
+            "destination": self.destination[slot],
+            "timestamp": float(self.updated[slot]),
+        }
+
+    def prune(self, max_age=DEFAULT_RETENTION, now=None):
+        """Drop vessels not heard from in ``max_age`` seconds; returns the count.
+
+        Walks from the least recently updated end and stops at the first
+        fresh vessel, so the cost is proportional to what is removed.
+        """
+        cutoff = (time.time() if now is None else now) - max_age
+        removed = 0
+        while self._slots:
+            mmsi = next(iter(self._slots))
+            if self.updated[self._slots[mmsi]] >= cutoff:
+                break
+            self._release(mmsi)
+            removed += 1
+        self.pruned += removed
+        return removed
+
+    def active_slots(self, max_age, now=None):
+        """Slots of vessels with a known position updated within ``max_age`` seconds."""
+        cutoff = (time.time() if now is None else now) - max_age
+        mask = self.in_use & (self.updated >= cutoff) & np.isfinite(self.lat) & np.isfinite(self.lon)
+        return np.flatnonzero(mask)
+
+    def query(self, max_age, bbox=None, limit=None, now=None):
+        """Active slots inside ``bbox`` (west, south, east, north).
+
+        With ``limit``, only the most recently updated vessels are kept.
+        """
+        if bbox is None:
+            slots = self.active_slots(max_age, now)
+        else:
+            candidates = self.index.query(*bbox)
+            if candidates is None:
+                slots = self.active_slots(max_age, now)
+            else:
+                cutoff = (time.time() if now is None else now) - max_age
+                slots = candidates[self.updated[candidates] >= cutoff]
+            slots = slots[bbox_mask(self.lon[slots], self.lat[slots], *bbox)]
+        if limit is not None and len(slots) > limit:
+            newest = np.argpartition(-self.updated[slots], limit - 1)[:limit]
+            slots = np.sort(slots[newest])
+        return slots
+
+    def expired_between(self, start, end):
+        """MMSIs whose last update falls in ``[start, end)``.
+
+        Called with consecutive display cutoffs, this yields each vessel once
+        as it ages out of view.
+        """
+        mask = self.in_use & (self.updated >= start) & (self.updated < end)
+        return self.mmsi[mask].tolist()
+
+    def drain_changes(self):
+        """Return and reset the (changed, released) MMSI sets."""
+        changed, released = self.changed, self.released
+        self.changed, self.released = set(), set()
+        return changed, released
+
+    def nbytes(self):
+        """Approximate memory held by the store (columns plus string fields)."""
+        columns = sum(column.nbytes for column in (
+            self.mmsi, self.lat, self.lon, self.sog, self.cog,
+            self.ship_type, self.updated, self.in_use))
+        lists = 3 * sys.getsizeof(self.name)
+        strings = sum(sys.getsizeof(value) for column in (self.name, self.callsign, self.destination)
+                      for value in column if value is not None)
+        # OrderedDict entry: key int, value int and the linked-list node
+        index = len(self._slots) * 100
+        return columns + lists + strings + index
+
+    def stats(self):
+        size = len(self._slots)
+        nbytes = self.nbytes()
+        return {
+            "size": size,
+            "capacity": self.capacity,
+            "updates": self.updates,
+            "evicted": self.evicted,
+            "pruned": self.pruned,
+            "bytes": nbytes,
+            "bytes_per_vessel": round(nbytes / size) if size else None,
+        }
+
+    async def run_pruner(self, interval=30, max_age=DEFAULT_RETENTION):
+        """Background task pruning silent vessels every ``interval`` seconds."""
+        while True:
+            await asyncio.sleep(interval)
+            removed = self.prune(max_age)
+            if removed:
+                print(f"[ships] pruned {removed} silent vessels, {len(self)} tracked")
@@ -0,0 +1,140 @@
+"""Uniform lat/lon grid index and viewport helpers for point layers."""
+
+from __future__ import annotations
+
+import itertools
+import math
+
+import numpy as np
+
+# Above this many cells a query is cheaper as one vectorized scan
+MAX_QUERY_CELLS = 4096
+
+
+def parse_bbox(bbox):
+    """Parse a ``west,south,east,north`` query string into floats.
+
+    ``west`` may be greater than ``east`` for viewports that cross the
+    antimeridian.  Raises ValueError on malformed input.
+    """
+    parts = [float(part) for part in bbox.split(",")]
+    if len(parts) != 4:
+        raise ValueError("bbox must be west,south,east,north")
+    if not all(math.isfinite(part) for part in parts):
+        raise ValueError("bbox values must be finite numbers")
+    west, south, east, north = parts
+    if not (-90 <= south <= north <= 90):
+        raise ValueError("bbox latitudes must satisfy -90 <= south <= north <= 90")
+    if east - west >= 360:
+        return -180.0, south, 180.0, north
+    # Normalize longitudes (MapLibre reports values outside ±180 with world copies)
+    west = (west + 180) % 360 - 180
+    east = (east + 180) % 360 - 180
+    return west, south, east, north
+
+
+def bbox_mask(lon, lat, west, south, east, north):
+    """Boolean mask of points inside a bbox, honouring antimeridian wrap."""
+    in_lat = (lat >= south) & (lat <= north)
+    if west <= east:
+        return in_lat & (lon >= west) & (lon <= east)
+    return in_lat & ((lon >= west) | (lon <= east))
+
+
+def cluster_cell_degrees(zoom):
+    """Cluster cell size for a web-mercator zoom: a quarter of a tile width."""
+    return 360.0 / 2 ** (max(zoom, 0) + 2)
+
+
+def cluster_points(lon, lat, cell_degrees):
+    """Aggregate points into grid cells.
+
+    Returns ``(inverse, counts, mean_lon, mean_lat)`` where ``inverse`` maps
+    each input point to its cluster index.
+    """
+    if len(lon) == 0:
+        empty = np.empty(0)
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), empty, empty
+    rows = np.floor((lat + 90.0) / cell_degrees).astype(np.int64)
+    cols = np.floor((lon + 180.0) / cell_degrees).astype(np.int64)
+    keys = rows * (int(360 / cell_degrees) + 1) + cols
+    _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    mean_lon = np.bincount(inverse, weights=lon) / counts
+    mean_lat = np.bincount(inverse, weights=lat) / counts
+    return inverse, counts, mean_lon, mean_lat
+
+
+class GridIndex:
+    """Incrementally maintained map of grid cell -> set of item ids.
+
+    Items are small integers (e.g. store slots).  Moving an item is O(1);
+    a bbox query returns the candidates from the overlapping cells, which
+    callers then filter exactly with ``bbox_mask``.
+    """
+
+    def __init__(self, cell_degrees=1.0):
+        self.cell_degrees = cell_degrees
+        self.rows = int(math.ceil(180 / cell_degrees))
+        self.cols = int(math.ceil(360 / cell_degrees))
+        self._cells = {}
+        self._cell_of = {}
+
+    def __len__(self):
+        return len(self._cell_of)
+
+    def cell(self, lat, lon):
+        row = min(int((lat + 90.0) // self.cell_degrees), self.rows - 1)
+        col = int((lon + 180.0) // self.cell_degrees) % self.cols
+        return row * self.cols + col
+
+    def update(self, item, lat, lon):
+        if lat != lat or lon != lon:  # NaN
+            self.remove(item)
+            return
+        cell = self.cell(lat, lon)
+        old = self._cell_of.get(item)
+        if old == cell:
+            return
+        if old is not None:
+            members = self._cells[old]
+            members.discard(item)
+            if not members:
+                del self._cells[old]
+        self._cells.setdefault(cell, set()).add(item)
+        self._cell_of[item] = cell
+
+    def remove(self, item):
+        old = self._cell_of.pop(item, None)
+        if old is not None:
+            members = self._cells[old]
+            members.discard(item)
+            if not members:
+                del self._cells[old]
+
+    def _col_ranges(self, west, east):
+        c0 = int((west + 180.0) // self.cell_degrees)
+        c1 = min(int((east + 180.0) // self.cell_degrees), self.cols - 1)
+        if west > east:
+            return [range(c0, self.cols), range(0, c1 + 1)]
+        ranges = [range(c0, c1 + 1)]
+        if east >= 180.0 and c0 > 0:
+            # lon == 180 wraps into the first column
+            ranges.append(range(0, 1))
+        return ranges
+
+    def query(self, west, south, east, north):
+        """Return candidate item ids in cells overlapping the bbox, or None.
+
+        None means the bbox spans so many cells that a full vectorized scan
+        is cheaper; callers should fall back to filtering everything.
+        """
+        r0 = max(0, int((south + 90.0) // self.cell_degrees))
+        r1 = min(self.rows - 1, int((north + 90.0) // self.cell_degrees))
+        col_ranges = self._col_ranges(west, east)
+        n_cells = (r1 - r0 + 1) * sum(len(cols) for cols in col_ranges)
+        if n_cells > MAX_QUERY_CELLS:
+            return None
+        cells = self._cells
+        members = [cells[key] for row in range(r0, r1 + 1) for cols in col_ranges
+                   for key in (row * self.cols + col for col in cols) if key in cells]
+        return np.fromiter(itertools.chain.from_iterable(members), dtype=np.int64)
@@ -0,0 +1,103 @@
+"""Startup data loading and per-phase timing.
+
+The ephemeris (``de421.bsp``) is fetched into the image at build time
+(``python startup.py``) so a container never downloads it while its
+healthcheck is counting down, and the timescale always comes from the data
+bundled with Skyfield.  The kernel is opened straight from its file path:
+jplephem memory-maps the segments read-only on first use, so every uvicorn
+worker shares the same page-cache pages instead of holding its own copy.
+
+``StartupTimer`` records how long each phase took and prints it, so slow
+starts can be traced to imports, data loading or the catalog.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+from skyfield.iokit import Loader
+from skyfield.jpllib import SpiceKernel
+
+EPHEMERIS_FILE = "de421.bsp"
+DEFAULT_DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def data_dir():
+    return os.getenv("AETHRA_DATA_DIR", DEFAULT_DATA_DIR)
+
+
+def process_age():
+    """Seconds since this process started (Linux), or None where /proc isn't available."""
+    try:
+        with open("/proc/self/stat") as f:
+            # Fields after the parenthesised command name; starttime is field 22
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def load_timescale(directory=None):
+    """Timescale from Skyfield's bundled leap second and Delta T tables (never downloads)."""
+    return Loader(directory or data_dir(), verbose=False).timescale(builtin=True)
+
+
+def open_ephemeris(directory=None, filename=EPHEMERIS_FILE):
+    """Open the SPK kernel from ``directory``, downloading it only if it isn't there."""
+    directory = directory or data_dir()
+    path = os.path.join(directory, filename)
+    if os.path.exists(path):
+        return SpiceKernel(path)
+    print(f"[startup] {filename} not found in {directory}, downloading (prefetch it at build time)")
+    return Loader(directory)(filename)
+
+
+def prefetch(directory=None):
+    """Download everything ``open_ephemeris`` needs (run from the Dockerfile)."""
+    directory = directory or data_dir()
+    os.makedirs(directory, exist_ok=True)
+    Loader(directory).download(EPHEMERIS_FILE)
+    # Fails the build here rather than at startup if the file is unusable
+    SpiceKernel(os.path.join(directory, EPHEMERIS_FILE)).close()
+    load_timescale(directory)
+
+
+class StartupTimer:
+    """Wall-clock duration of each named startup phase."""
+
+    def __init__(self):
+        self.phases = {}
+        age = process_age()
+        if age is not None:
+            # Interpreter start plus every import before the timer existed
+            self.phases["imports"] = age
+        self._started = time.perf_counter() - (age or 0.0)
+        self.ready = None
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - start
+            print(f"[startup] {name}: {self.phases[name] * 1000:.0f} ms")
+
+    def mark_ready(self):
+        self.ready = time.perf_counter() - self._started
+        print(f"[startup] ready after {self.ready:.2f} s")
+
+    def report(self):
+        return {
+            "phases": {name: round(seconds, 3) for name, seconds in self.phases.items()},
+            "ready_seconds": None if self.ready is None else round(self.ready, 3),
+        }
+
+
+if __name__ == "__main__":
+    prefetch(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,142 @@
+"""Day/night terminator and twilight band polygons from the solar subpoint.
+
+The sun's altitude at a point is a closed-form function of the angular
+distance to the subsolar point, so the locus where the sun sits at altitude
+``h`` is a small circle of radius ``90 - h`` degrees around that point.  Each
+boundary is sampled in one vectorized step instead of searching for the
+horizon crossing with full apparent-position reductions per longitude.
+
+When the dark side of a boundary contains a pole, every meridian crosses
+it once, so its latitude is solved directly on a regular longitude grid and
+the curve is closed via that pole.  This is the shape the frontend's
+clip-path code expects (terminator points from -180 to 180, then the two
+pole corners and the first point again).  Otherwise the dark region is a
+closed ring, returned with continuous (unwrapped) longitudes.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+# Web mercator can't show the poles; polygons are clamped to this latitude
+MAX_LATITUDE = 85.0
+
+# Sun altitude (degrees) below which each band starts
+BANDS = (
+    ("night", 0.0),
+    ("civil", -6.0),
+    ("nautical", -12.0),
+    ("astronomical", -18.0),
+)
+
+
+def solar_altitude(lat, lon, sub_lat, sub_lon):
+    """Geometric sun altitude in degrees at ``lat``/``lon`` (arrays allowed)."""
+    lat, lon, sub_lat = np.radians(lat), np.radians(lon), np.radians(sub_lat)
+    hour_angle = lon - np.radians(sub_lon)
+    sin_alt = np.sin(lat) * np.sin(sub_lat) + np.cos(lat) * np.cos(sub_lat) * np.cos(hour_angle)
+    return np.degrees(np.arcsin(np.clip(sin_alt, -1.0, 1.0)))
+
+
+def altitude_circle(sub_lat, sub_lon, altitude, samples=360):
+    """Points where the sun is at ``altitude``, as (lon, lat) arrays.
+
+    Longitudes are unwrapped (continuous) and the ring is not closed.
+    """
+    distance = np.radians(90.0 - altitude)
+    phi0 = np.radians(sub_lat)
+    bearing = np.linspace(0.0, 2.0 * np.pi, samples, endpoint=False)
+    sin_lat = np.sin(phi0) * np.cos(distance) + np.cos(phi0) * np.sin(distance) * np.cos(bearing)
+    lat = np.arcsin(np.clip(sin_lat, -1.0, 1.0))
+    dlon = np.arctan2(np.sin(bearing) * np.sin(distance) * np.cos(phi0),
+                      np.cos(distance) - np.sin(phi0) * sin_lat)
+    lon = np.degrees(np.unwrap(dlon)) + sub_lon
+    return lon, np.degrees(lat)
+
+
+def dark_pole(sub_lat, altitude):
+    """The pole inside the region where the sun is below ``altitude``: +1 north, -1 south, or 0."""
+    # The dark cap is centered on the antisolar point with radius 90 + altitude
+    radius = 90.0 + altitude
+    if 90.0 + sub_lat <= radius:
+        return 1
+    if 90.0 - sub_lat <= radius:
+        return -1
+    return 0
+
+
+def boundary_latitude(lon, sub_lat, sub_lon, altitude, pole):
+    """Latitude on each meridian ``lon`` where the sun is at ``altitude``.
+
+    Only valid when the dark region contains ``pole``: every meridian then
+    crosses the boundary exactly once.  Solves
+    ``sin(h) = sin(lat) sin(dec) + cos(lat) cos(dec) cos(H)`` in closed form,
+    taking the root where the sun sinks towards the dark pole.
+    """
+    dec = np.radians(sub_lat)
+    a = np.sin(dec)
+    b = np.cos(dec) * np.cos(np.radians(lon - sub_lon))
+    # a sin(lat) + b cos(lat) = R sin(lat + psi)
+    R = np.hypot(a, b)
+    psi = np.arctan2(b, a)
+    root = np.arcsin(np.clip(np.sin(np.radians(altitude)) / np.maximum(R, 1e-12), -1.0, 1.0))
+    lat = (np.pi - root - psi) if pole > 0 else (root - psi)
+    lat = (lat + np.pi) % (2.0 * np.pi) - np.pi
+    return np.degrees(np.clip(lat, -np.pi / 2, np.pi / 2))
+
+
+def _graph_polygon(sub_lat, sub_lon, altitude, pole, resolution):
+    """Boundary sampled on a longitude grid, closed via the dark ``pole``."""
+    grid = np.arange(-180.0, 180.0 + resolution / 2, resolution)
+    grid[-1] = min(grid[-1], 180.0)
+    lat = np.clip(boundary_latitude(grid, sub_lat, sub_lon, altitude, pole), -MAX_LATITUDE, MAX_LATITUDE)
+    wrap_lat = MAX_LATITUDE * pole
+    line = np.column_stack([grid, lat.round(4)]).tolist()
+    return line + [[180.0, wrap_lat], [-180.0, wrap_lat], line[0]]
+
+
+def _ring_polygon(lon, lat):
+    center = (lon.min() + lon.max()) / 2
+    shift = 360.0 * np.round(center / 360.0)
+    ring = np.column_stack([(lon - shift).round(4), np.clip(lat, -MAX_LATITUDE, MAX_LATITUDE).round(4)]).tolist()
+    return ring + [ring[0]]
+
+
+def dark_polygon(sub_lat, sub_lon, altitude=0.0, resolution=2.0):
+    """Polygon ring of the region where the sun is below ``altitude``.
+
+    Returns ``(ring, pole)`` where ``pole`` is the enclosed pole (+1/-1) or 0.
+    """
+    pole = dark_pole(sub_lat, altitude)
+    if pole:
+        return _graph_polygon(sub_lat, sub_lon, altitude, pole, resolution), pole
+    samples = max(int(round(360.0 / resolution)), 90)
+    return _ring_polygon(*altitude_circle(sub_lat, sub_lon, altitude, samples)), pole
+
+
+def terminator_features(sub_lat, sub_lon, resolution=2.0, timestamp=None):
+    """GeoJSON features: the day side, the night side and the three twilight bands.
+
+    Bands are nested (each darker band lies inside the previous one) so they
+    can be stacked as translucent fills.
+    """
+    base = {"timestamp": timestamp, "subsolar": [round(sub_lon, 4), round(sub_lat, 4)]}
+    night, pole = dark_polygon(sub_lat, sub_lon, 0.0, resolution)
+    # The day side is the same terminator closed via the opposite pole
+    day = night[:-3] + [[180.0, -night[-3][1]], [-180.0, -night[-2][1]], night[0]]
+    features = [{
+        "type": "Feature",
+        "geometry": {"type": "Polygon", "coordinates": [day]},
+        "properties": dict(base, band="day", sun_altitude=0.0, wrapViaNorth=pole > 0),
+    }]
+    for band, altitude in BANDS:
+        if band == "night":
+            ring, band_pole = night, pole
+        else:
+            ring, band_pole = dark_polygon(sub_lat, sub_lon, altitude, resolution)
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "Polygon", "coordinates": [ring]},
+            "properties": dict(base, band=band, sun_altitude=altitude, wrapViaNorth=band_pole > 0),
+        })
+    return features
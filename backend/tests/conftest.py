@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+from skyfield.api import load
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, BACKEND_DIR)
+
+
+@pytest.fixture(scope='session')
+def ts():
+    return load.timescale()
+
+
+@pytest.fixture(scope='session')
+def stations(ts):
+    return load.tle_file(os.path.join(BACKEND_DIR, 'stations.txt'), ts=ts)
@@ -0,0 +1,44 @@
+import json
+
+from ais import AisIngest, decode_batch
+from ship_store import ShipStore
+
+
+def position(mmsi, lat, lon, sog=10.0):
+    return json.dumps({'MessageType': 'PositionReport', 'Message': {'PositionReport': {
+        'UserID': mmsi, 'Latitude': lat, 'Longitude': lon, 'Sog': sog, 'Cog': 90.0}}})
+
+
+def static(mmsi, name):
+    return json.dumps({'MessageType': 'ShipStaticData', 'Message': {'ShipStaticData': {
+        'UserID': mmsi, 'Name': name.ljust(20), 'Type': 70, 'CallSign': 'ABC ', 'Destination': 'ROTTERDAM '}}})
+
+
+def test_batch_coalesces_to_latest_report():
+    frames = [(1.0, position(1, 10.0, 20.0)), (2.0, position(2, -5.0, 100.0)), (3.0, '{not json'),
+              (4.0, position(1, 10.5, 20.5, None)), (5.0, static(2, 'EVER GIVEN')),
+              (6.0, json.dumps({'MessageType': 'PositionReport', 'Message': {}}))]
+    batch = decode_batch(frames)
+    assert batch.positions == {2: (2.0, -5.0, 100.0, 10.0, 90.0), 1: (4.0, 10.5, 20.5, 0.0, 90.0)}
+    assert batch.statics[2][1:] == ('EVER GIVEN', 70, 'ABC', 'ROTTERDAM')
+    assert (batch.coalesced, batch.malformed) == (1, 2)
+    assert batch.types == {'PositionReport': 3, 'ShipStaticData': 1}
+
+    store = ShipStore(capacity=10)
+    ingest = AisIngest(store)
+    ingest.apply(batch)
+    vessel = store.get(1)
+    assert (vessel['lat'], vessel['lon'], vessel['timestamp']) == (10.5, 20.5, 4.0)
+    assert store.get(2)['name'] == 'EVER GIVEN'
+    assert len(store.query(3600, (0.0, 0.0, 30.0, 30.0), now=5.0)) == 1
+    assert ingest.applied == 3
+
+
+def test_full_queue_drops_oldest_frames():
+    ingest = AisIngest(ShipStore(capacity=10), max_queue=3, batch_size=2)
+    for i in range(5):
+        ingest.offer(position(i, 0.0, float(i)), now=float(i))
+    assert [t for t, _ in ingest.take()] == [2.0, 3.0]
+    assert [t for t, _ in ingest.take()] == [4.0]
+    stats = ingest.stats()
+    assert (stats['received'], stats['dropped'], stats['queued']) == (5, 2, 0)
@@ -0,0 +1,69 @@
+import asyncio
+
+from ais_regions import WORLD, AisRegions, parse_regions, plan_regions, surface_fraction, to_aisstream
+
+
+def covers(regions, lon, lat):
+    return any(w <= lon <= e and s <= lat <= n for w, s, e, n in regions)
+
+
+def test_viewports_merge_into_few_boxes():
+    # Two overlapping harbour views and one far away
+    regions = plan_regions([(4.0, 51.8, 4.6, 52.1), (4.3, 51.9, 5.0, 52.4), (103.6, 1.1, 104.1, 1.5)])
+    assert len(regions) == 2
+    assert covers(regions, 4.1, 51.9) and covers(regions, 4.9, 52.3) and covers(regions, 103.8, 1.3)
+    assert not covers(regions, 50.0, 20.0)
+    assert sum(surface_fraction(box) for box in regions) < 0.001
+    # Across the antimeridian: split into a box on each side
+    regions = plan_regions([(179.0, -18.0, -179.0, -16.0)])
+    assert covers(regions, 179.5, -17.0) and covers(regions, -179.5, -17.0)
+    assert all(w <= e for w, _, e, _ in regions)
+    assert plan_regions([WORLD]) == (WORLD,)
+    assert plan_regions([]) == ()
+
+
+def test_many_viewports_capped_at_max_boxes():
+    boxes = [(lon, lat, lon + 1, lat + 1) for lon in range(-170, 170, 20) for lat in range(-60, 60, 20)]
+    regions = plan_regions(boxes, max_boxes=8)
+    assert len(regions) <= 8
+    assert all(covers(regions, w + 0.5, s + 0.5) for w, s, _, _ in boxes)
+    assert to_aisstream([(1.0, 2.0, 3.0, 4.0)]) == [[[2.0, 1.0], [4.0, 3.0]]]
+
+
+def test_demand_expires_and_followers_are_woken(tmp_path):
+    regions = AisRegions(always_on=parse_regions('-10,50,0,60'), demand_ttl=60)
+    assert len(regions.regions) == 1
+    regions.touch((100.2, 10.2, 100.8, 10.8), now=0)
+    assert regions.update(now=1) and len(regions.regions) == 2
+    # Panning within the same cells changes nothing
+    regions.touch((100.3, 10.1, 100.9, 10.7), now=2)
+    assert not regions.update(now=3)
+    assert regions.update(now=100) and len(regions.regions) == 1
+
+    # Another process's demand arrives through the shared directory
+    worker = AisRegions(demand_ttl=60)
+    worker.touch(None, now=0)
+    worker.write_demand(str(tmp_path / 'aethra-ais-demand-1.json'), now=0)
+    assert regions.read_demand(str(tmp_path), now=30) == [WORLD]
+    assert regions.read_demand(str(tmp_path), now=90) == []
+
+    async def scenario():
+        version = regions.version
+        waiter = asyncio.ensure_future(regions.wait_for_change(version))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        regions.update([None], now=100)
+        return await asyncio.wait_for(waiter, 1)
+
+    assert asyncio.run(scenario()) == (WORLD,)
+
+
+def test_default_config_narrows_to_viewports():
+    # As main.py builds it with AETHRA_AIS_REGIONS unset, track retention or not
+    regions = AisRegions(always_on=parse_regions(''), demand_ttl=120)
+    assert regions.regions == ()
+    regions.touch((100.2, 10.2, 100.8, 10.8), now=0)
+    assert regions.update(now=1)
+    assert covers(regions.regions, 100.5, 10.5) and not covers(regions.regions, 4.5, 51.5)
+    assert sum(surface_fraction(box) for box in regions.regions) < 0.001
+    assert regions.update(now=200) and regions.regions == ()
@@ -0,0 +1,42 @@
+from almanac_cache import YEAR, AlmanacCache
+
+T0 = 1_700_000_000.0
+DAY = 86400.0
+
+
+def fake_search(start, end):
+    """Seasons every quarter year and full moons every 29.5 days, from an arbitrary origin."""
+    names = ['Vernal Equinox', 'Summer Solstice', 'Autumnal Equinox', 'Winter Solstice']
+    events = []
+    k = int((start - T0) // (YEAR / 4))
+    while T0 + k * YEAR / 4 <= end:
+        events.append((T0 + k * YEAR / 4, 'season', names[k % 4]))
+        k += 1
+    k = int((start - T0) // (29.5 * DAY))
+    while T0 + k * 29.5 * DAY <= end:
+        events.append((T0 + k * 29.5 * DAY, 'moon-phase', 'Full Moon'))
+        k += 1
+    return events
+
+
+def test_upcoming_merges_kinds_in_time_order():
+    cache = AlmanacCache(fake_search, years_back=1, years_ahead=2)
+    events = cache.upcoming(now=T0 + 1, limit=5)
+    times = [event['timestamp'] for event in events]
+    assert times == sorted(times) and len(events) == 5
+    assert events[0] == {'kind': 'moon-phase', 'name': 'Full Moon',
+                         'time': '2023-12-14T10:13:20Z', 'timestamp': T0 + 29.5 * DAY}
+
+    seasons = cache.upcoming(now=T0 + 1, kinds=['season'], limit=2)
+    assert [event['name'] for event in seasons] == ['Summer Solstice', 'Autumnal Equinox']
+    assert cache.upcoming(now=T0 + 1, kinds=['season'], horizon=30 * DAY) == []
+
+
+def test_season_and_single_build():
+    cache = AlmanacCache(fake_search, years_back=1, years_ahead=2)
+    assert cache.season(T0 + DAY) == 'spring'
+    assert cache.season(T0 + YEAR / 4 + DAY) == 'summer'
+    assert cache.builds == 1
+    # Leaving the window triggers a rebuild around the new time
+    cache.upcoming(now=T0 + 3 * YEAR)
+    assert cache.builds == 2
@@ -0,0 +1,93 @@
+import numpy as np
+from sgp4.api import WGS72, Satrec
+from skyfield.api import EarthSatellite
+
+from conjunctions import ConjunctionScreener, ConjunctionService, grid_pairs
+from passes import julian_dates
+from propagation import Constellation
+
+NOW = 1768435200.0  # 2026-01-15 00:00 UTC
+HOUR = 3600.0
+
+
+def circular(ts, satnum, inclination, anomaly, revolutions=15.5):
+    satrec = Satrec()
+    satrec.sgp4init(WGS72, 'i', satnum, NOW / 86400.0 + 2440587.5 - 2433281.5, 0.0, 0.0, 0.0, 0.0005, 0.0,
+                    np.radians(inclination), np.radians(anomaly), revolutions * 2 * np.pi / 1440, 0.0)
+    return EarthSatellite.from_satrec(satrec, ts)
+
+
+def test_grid_pairs_finds_every_close_pair_once():
+    rng = np.random.default_rng(3)
+    points = rng.uniform(-1000, 1000, (2000, 3))
+    frames = rng.integers(0, 3, 2000)
+    a, b = grid_pairs(points, frames, 100.0)
+
+    pairs = sorted(zip(np.minimum(a, b).tolist(), np.maximum(a, b).tolist()))
+    assert len(pairs) == len(set(pairs)) and not np.any(a == b)
+    distance = np.linalg.norm(points[:, None] - points[None], axis=-1)
+    i, j = np.nonzero((distance < 100) & (frames[:, None] == frames[None]))
+    expected = {(p, q) for p, q in zip(i.tolist(), j.tolist()) if p < q}
+    assert {(p, q) for p, q in pairs if distance[p, q] < 100} == expected
+
+
+def test_crossing_orbits_match_brute_force(ts):
+    # Both reach the ascending node of the same plane ten minutes in
+    anomaly = -360 * 15.5 * 600 / 86400
+    first, second = circular(ts, 90001, 53, anomaly), circular(ts, 90002, 97, anomaly)
+    far = circular(ts, 90003, 53, anomaly + 180)
+    report = ConjunctionScreener(distance_km=10).screen(Constellation([first, second, far]), NOW, NOW + 3 * HOUR)
+
+    t = NOW + np.arange(0, 3 * HOUR, 0.05)
+    jd, fraction = julian_dates(t)
+    distance = np.linalg.norm(first.model.sgp4_array(jd, fraction)[1] - second.model.sgp4_array(jd, fraction)[1],
+                              axis=-1)
+    [event] = report.describe(report.select())
+    assert [o['norad_id'] for o in event['objects']] == [90001, 90002]
+    assert abs(event['timestamp'] - t[np.argmin(distance)]) < 0.1
+    assert abs(event['miss_km'] - distance.min()) < 0.01
+    assert event['relative_speed_kms'] > 5
+
+
+def test_station_neighbours_and_filters(stations):
+    report = ConjunctionScreener(distance_km=10).screen(Constellation(stations), NOW, NOW + HOUR)
+    iss = report.select(norad_id=25544)
+
+    assert 0 < len(iss) < len(report)
+    events = report.describe(iss, norad_id=25544)
+    assert all(event['objects'][0]['norad_id'] == 25544 for event in events)
+    others = {event['objects'][1]['name']: event for event in events}
+    # Modules published with the station's own elements are the same object
+    assert 'ISS (NAUKA)' not in others
+    assert others['CREW DRAGON 11']['miss_km'] < 1 and others['CREW DRAGON 11']['relative_speed_kms'] < 0.01
+    close = report.select(max_distance_km=0.5, end=NOW + 60)
+    assert all(report.events['miss_km'][close] <= 0.5) and all(report.events['tca'][close] <= NOW + 60)
+
+
+def test_service_screens_again_on_new_elements_or_short_window():
+    service = ConjunctionService(hours=24, margin_hours=6)
+    assert service.needs_screen(('v1',), NOW)
+    start, end = service.window(NOW)
+    service.report = ConjunctionScreener().screen(Constellation([]), start, end, ('v1',))
+
+    assert not service.needs_screen(('v1',), NOW + 5 * HOUR)
+    assert service.needs_screen(('v2',), NOW + HOUR)
+    assert service.needs_screen(('v1',), NOW + 7 * HOUR)
+
+
+def test_api_workers_load_the_saved_report(ts, tmp_path):
+    anomaly = -360 * 15.5 * 600 / 86400
+    constellation = Constellation([circular(ts, 90001, 53, anomaly), circular(ts, 90002, 97, anomaly)])
+    path = str(tmp_path / 'conjunctions.npz')
+    report = ConjunctionScreener(distance_km=10).screen(constellation, NOW, NOW + 3 * HOUR, ('v1',))
+    report.save(path)
+
+    reader = ConjunctionService(path=path)
+    assert reader.reload_changed() and not reader.reload_changed()
+    loaded = reader.report
+    assert loaded.describe(loaded.select()) == report.describe(report.select())
+    assert loaded.summary() == report.summary()
+    assert list(loaded.ids) == list(report.ids) and loaded.names == list(report.names)
+
+    report.save(path)
+    assert reader.reload_changed() and reader.loads == 2
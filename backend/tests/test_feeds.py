@@ -0,0 +1,137 @@
+import asyncio
+import os
+
+import feeds
+from feeds import Feed, FeedCache, FeedUnavailable
+
+
+class MockResponse:
+    def __init__(self, content=b'', status_code=200, headers=None):
+        self.content = content
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f'HTTP {self.status_code}')
+
+
+class MockClient:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    async def get(self, url, headers=None):
+        self.requests.append(headers or {})
+        await asyncio.sleep(0)
+        return self.responses.pop(0)
+
+
+def make_cache(tmp_path, monkeypatch, *responses, ttl=60, transform=None):
+    client = MockClient(*responses)
+    monkeypatch.setattr(feeds.upstream, 'get_client', lambda: client)
+    cache = FeedCache(str(tmp_path), [Feed('quakes', 'http://example.invalid/q', ttl, transform=transform)])
+    return cache, client
+
+
+def test_concurrent_first_requests_share_one_fetch(tmp_path, monkeypatch):
+    cache, client = make_cache(tmp_path, monkeypatch, MockResponse(b'[1]', headers={'ETag': '"v1"'}),
+                               transform=lambda content: content + b'!')
+
+    async def scenario():
+        return await asyncio.gather(*[cache.get('quakes') for _ in range(5)])
+
+    entries = asyncio.run(scenario())
+    assert len(client.requests) == 1
+    assert {entry.body for entry in entries} == {b'[1]!'}
+    # Fresh entries are served without touching upstream
+    asyncio.run(cache.get('quakes'))
+    assert len(client.requests) == 1
+
+
+def test_stale_entry_served_while_revalidating_with_validators(tmp_path, monkeypatch):
+    cache, client = make_cache(
+        tmp_path, monkeypatch,
+        MockResponse(b'[1]', headers={'ETag': '"v1"', 'Last-Modified': 'Thu, 15 Jan 2026 00:00:00 GMT'}),
+        MockResponse(status_code=304),
+        ttl=0,
+    )
+
+    async def scenario():
+        first = await cache.get('quakes')
+        stale = await cache.get('quakes')
+        await asyncio.sleep(0.05)
+        return first, stale
+
+    first, stale = asyncio.run(scenario())
+    assert stale is first
+    assert client.requests[1] == {'If-None-Match': '"v1"', 'If-Modified-Since': 'Thu, 15 Jan 2026 00:00:00 GMT'}
+    assert cache.counters['not_modified'] == 1
+    assert cache._entries['quakes'].body == b'[1]'
+    assert cache._entries['quakes'].fetched_at > first.fetched_at
+
+
+def test_failures_keep_last_good_and_back_off(tmp_path, monkeypatch):
+    cache, client = make_cache(tmp_path, monkeypatch, MockResponse(b'[1]'),
+                               MockResponse(status_code=429, headers={'Retry-After': '600'}), ttl=0)
+    cache.feeds['quakes'].min_interval = 0
+    assert asyncio.run(cache.refresh('quakes'))
+    assert not asyncio.run(cache.refresh('quakes'))
+
+    assert cache._entries['quakes'].body == b'[1]'
+    assert cache.status()['feeds']['quakes']['failures'] == 1
+    assert cache._retry_at['quakes'] - cache._last_request['quakes'] >= 599
+    assert not cache.can_request('quakes')
+
+
+def test_unreachable_feed_without_copy_raises(tmp_path, monkeypatch):
+    cache, _ = make_cache(tmp_path, monkeypatch, MockResponse(status_code=500))
+    try:
+        asyncio.run(cache.get('quakes'))
+        assert False, 'expected FeedUnavailable'
+    except FeedUnavailable:
+        pass
+
+
+def test_persisted_copy_survives_restart_and_is_adopted(tmp_path, monkeypatch):
+    cache, _ = make_cache(tmp_path, monkeypatch, MockResponse(b'[1]', headers={'ETag': '"v1"'}))
+    asyncio.run(cache.get('quakes'))
+
+    # Another process sharing the directory adopts the fresh copy instead of fetching
+    other, client = make_cache(tmp_path, monkeypatch)
+    assert asyncio.run(other.get('quakes')).body == b'[1]'
+    assert client.requests == []
+    assert other.counters['adopted'] == 1
+
+    restarted, _ = make_cache(tmp_path, monkeypatch)
+    restarted.load_from_disk()
+    entry = restarted._entries['quakes']
+    assert (entry.body, entry.etag, entry.source) == (b'[1]', '"v1"', 'disk')
+
+
+def test_own_writes_are_not_read_back(tmp_path, monkeypatch):
+    cache, _ = make_cache(tmp_path, monkeypatch, MockResponse(b'[1]'), ttl=0)
+    asyncio.run(cache.refresh('quakes'))
+    reads = []
+    read_disk = cache._read_disk
+    monkeypatch.setattr(cache, '_read_disk', lambda name: reads.append(name) or read_disk(name))
+
+    assert not cache._adopt_disk('quakes', 0)
+    assert reads == []
+    # Another process writing the file is still noticed
+    other, _ = make_cache(tmp_path, monkeypatch, MockResponse(b'[2]'))
+    asyncio.run(other.refresh('quakes'))
+    os.utime(tmp_path / 'quakes.json', (1, 1))
+    cache._adopt_disk('quakes', 0)
+    assert reads == ['quakes']
+
+
+def test_adopt_reads_other_processes_copy_without_fetching(tmp_path, monkeypatch):
+    reader, client = make_cache(tmp_path, monkeypatch)
+    assert not asyncio.run(reader.adopt('quakes'))
+
+    writer, _ = make_cache(tmp_path, monkeypatch, MockResponse(b'[1]'))
+    asyncio.run(writer.refresh('quakes'))
+    assert asyncio.run(reader.adopt('quakes'))
+    assert reader.current('quakes').body == b'[1]'
+    assert client.requests == []
@@ -0,0 +1,68 @@
+import json
+
+import numpy as np
+
+from flights import FlightEngine
+
+NOW = 1768435200.0
+
+
+def state(icao24, lon, lat, position_time, velocity=None, track=None, callsign='TEST1 '):
+    return [icao24, callsign, 'Nowhere', position_time, position_time, lon, lat, 10000.0, False,
+            velocity, track, 0.0, None, 10100.0, None, False, 0]
+
+
+def payload(poll_time, states):
+    return json.dumps({'time': poll_time, 'states': states}).encode()
+
+
+def test_full_world_without_a_cap():
+    rng = np.random.default_rng(1)
+    states = [state(f'{i:06x}', float(lon), float(lat), NOW, 200.0, 90.0)
+              for i, (lon, lat) in enumerate(zip(rng.uniform(-180, 180, 3000), rng.uniform(-80, 80, 3000)))]
+    states.append(state('abcdef', None, None, NOW))  # no position
+    engine = FlightEngine()
+    engine.ingest(payload(NOW, states))
+
+    snapshot, rows, lon, lat = engine.query(now=NOW)
+    assert len(rows) == 3000
+    assert np.all(np.diff(snapshot.icao24) > 0)
+    # The grid query plus exact filter agrees with a plain scan of the dead-reckoned positions
+    box = (170.0, -30.0, -170.0, 30.0)
+    _, rows, lon, lat = engine.query(box, now=NOW + 60)
+    _, every, all_lon, all_lat = engine.query(now=NOW + 60)
+    inside = ((all_lon >= 170) | (all_lon <= -170)) & (np.abs(all_lat) <= 30)
+    assert rows.tolist() == every[inside].tolist()
+
+
+def test_dead_reckoning_from_track_and_from_history():
+    engine = FlightEngine(max_extrapolation=120)
+    engine.ingest(payload(NOW, [state('000001', 0.0, 0.0, NOW, 100.0, 90.0),
+                                state('000002', 10.0, 10.0, NOW - 10)]))
+    engine.ingest(payload(NOW + 10, [state('000001', 0.009, 0.0, NOW + 10, 100.0, 90.0),
+                                     state('000002', 10.0, 10.01, NOW)]))
+    snapshot, rows, lon, lat = engine.query(now=NOW + 20)
+
+    # 100 m/s east for 10 s is about 0.009 degrees at the equator
+    assert abs(lon[0] - 0.009 - 1000 / 111320) < 1e-6 and abs(lat[0]) < 1e-9
+    # No speed reported: 0.01 degrees north per 10 s from the last two positions, for 20 s
+    assert abs(lat[1] - 10.03) < 1e-6 and abs(lon[1] - 10.0) < 1e-9
+    times, trail_lon, trail_lat = engine.history(0x000002)
+    assert times.tolist() == [NOW - 10, NOW]
+    # Extrapolation is capped
+    _, _, lon, _ = engine.query(now=NOW + 10 + 200)
+    assert abs(lon[0] - 0.009 - 12000 / 111320) < 1e-6
+
+
+def test_stale_aircraft_dropped_and_limit_keeps_newest():
+    engine = FlightEngine(max_age=300)
+    engine.ingest(payload(NOW, [state('000001', 0.0, 0.0, NOW - 600),
+                                state('000002', 1.0, 1.0, NOW - 60),
+                                state('000003', 2.0, 2.0, NOW - 5)]))
+    snapshot, rows, _, _ = engine.query(now=NOW)
+    assert snapshot.icao24[rows].tolist() == [2, 3]
+    snapshot, rows, _, _ = engine.query(limit=1, now=NOW)
+    assert snapshot.icao24[rows].tolist() == [3]
+    # Still shown until the next poll, however long that takes
+    snapshot, rows, _, _ = engine.query(now=NOW + 900)
+    assert snapshot.icao24[rows].tolist() == [2, 3]
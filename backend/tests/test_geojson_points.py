@@ -0,0 +1,37 @@
+import json
+
+import numpy as np
+
+from geojson_points import column_values, feature_collection, point_features
+
+
+def test_point_features_round_columns():
+    lon = np.array([10.123456789, -179.5])
+    lat = np.array([-45.0, 89.999999])
+    names = ['Alpha "A"', None]
+    features = point_features(lon, lat, [
+        ('name', names),
+        ('id', np.array([1, 2], dtype=np.int64)),
+        ('altitude_km', np.array([412.34567, 550.0]), 1),
+        ('flag', np.array([True, False])),
+    ], precision=5)
+
+    collection = json.loads(feature_collection(features))
+    assert collection['type'] == 'FeatureCollection'
+    first, second = collection['features']
+    assert first['geometry'] == {'type': 'Point', 'coordinates': [10.12346, -45.0]}
+    assert first['properties'] == {'name': 'Alpha "A"', 'id': 1, 'altitude_km': 412.3, 'flag': True}
+    assert second['properties']['name'] is None
+    assert second['geometry']['coordinates'] == [-179.5, 90.0]
+
+
+def test_non_finite_values_become_null():
+    assert column_values(np.array([1.5, np.nan, np.inf])) == [1.5, None, None]
+    assert column_values([float('nan'), 'x', 3]) == [None, 'x', 3]
+    body = feature_collection(point_features(np.array([1.0]), np.array([2.0]), [('speed', np.array([np.nan]))]))
+    assert json.loads(body)['features'][0]['properties'] == {'speed': None}
+
+
+def test_empty_collection_is_valid_json():
+    body = feature_collection(point_features(np.empty(0), np.empty(0), [('name', [])]))
+    assert json.loads(body) == {'type': 'FeatureCollection', 'features': []}
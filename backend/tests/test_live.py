@@ -0,0 +1,90 @@
+import asyncio
+import json
+
+from live import RESYNC, LiveClient, LiveLayer
+
+
+def _point(lon, lat):
+    return {'name': 'x'}, (lon, lat)
+
+
+def _drain(client):
+    bodies = []
+    while not client.queue.empty():
+        bodies.append(client.queue.get_nowait())
+    return bodies
+
+
+def test_apply_reports_only_what_changed():
+    layer = LiveLayer('test', ['lon', 'lat'])
+    layer.apply({1: _point(0, 0), 2: _point(1, 1)})
+    delta = layer.apply({1: _point(0, 0), 2: _point(2, 2)}, removed=[3])
+
+    assert delta.seq == 2
+    assert delta.added == []
+    assert delta.moved == [(2, (2, 2))]
+    assert delta.removed == []
+    assert layer.apply({1: _point(0, 0)}) is None
+
+    delta = layer.replace({2: _point(2, 2)})
+    assert delta.removed == [1]
+
+
+def test_subscriber_resumes_from_history_or_gets_snapshot():
+    async def run():
+        layer = LiveLayer('test', ['lon', 'lat', 'alt'], history=2)
+        for step in range(4):
+            layer.apply({1: ({'name': 'a'}, (step, 0, 400.0))})
+
+        client = LiveClient()
+        client.subscribe(layer, since=3)
+        (body,) = _drain(client)
+        message = json.loads(body)
+        assert message['type'] == 'delta'
+        assert message['moved'] == [[1, 3, 0, 400.0]]
+
+        client.subscribe(layer, since=1)
+        (body,) = _drain(client)
+        message = json.loads(body)
+        assert message['type'] == 'snapshot'
+        assert message['seq'] == 4
+        assert message['features'][0]['properties'] == {'name': 'a', 'alt': 400.0}
+
+    asyncio.run(run())
+
+
+def test_bbox_subscription_translates_moves_across_the_viewport():
+    async def run():
+        layer = LiveLayer('test', ['lon', 'lat'])
+        layer.apply({1: _point(0, 0), 2: _point(50, 50)})
+        client = LiveClient()
+        client.subscribe(layer, bbox=(-10, -10, 10, 10))
+        snapshot = json.loads(_drain(client)[0])
+        assert [feature['id'] for feature in snapshot['features']] == [1]
+
+        layer.apply({1: _point(20, 0), 2: _point(5, 5)})
+        message = json.loads(_drain(client)[0])
+        assert message['removed'] == [1]
+        assert [feature['id'] for feature in message['added']] == [2]
+
+    asyncio.run(run())
+
+
+def test_slow_client_is_resynchronized_instead_of_buffering():
+    async def run():
+        layer = LiveLayer('test', ['lon', 'lat'])
+        client = LiveClient(queue_size=3)
+        client.subscribe(layer)
+        for step in range(10):
+            layer.apply({1: _point(step, 0)})
+
+        assert client.resyncs >= 1
+        assert client.queue.qsize() <= 3
+        bodies = []
+        while not client.queue.empty():
+            bodies.extend(await client.next_bodies())
+        last = json.loads(bodies[-1])
+        assert last['seq'] == layer.seq
+        assert RESYNC not in bodies
+
+    asyncio.run(run())
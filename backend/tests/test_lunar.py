@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from lunar import SOLAR_ECLIPSES, LunarTable, phase_name, solar_eclipses
+
+DAY = 86400.0
+SYNODIC = 29.530589 * DAY
+T0 = 1_700_000_000.0
+
+
+def synthetic_moon(seconds):
+    """Smooth stand-in for the ephemeris: a tilted, slowly drifting subpoint."""
+    elapsed = seconds - T0
+    phase = (360.0 * elapsed / SYNODIC) % 360.0
+    return {
+        'latitude': 20.0 * np.sin(2 * np.pi * elapsed / (27.3 * DAY)),
+        'longitude': (-360.0 * elapsed / (1.035 * DAY) + 180.0) % 360.0 - 180.0,
+        'distance_km': 384400.0 + 20000.0 * np.sin(2 * np.pi * elapsed / (27.5 * DAY)),
+        'phase_angle': phase,
+        'illumination': (1 - np.cos(np.radians(phase))) / 2,
+    }
+
+
+@pytest.fixture
+def table():
+    table = LunarTable(synthetic_moon, step_seconds=60, past_hours=1, days_ahead=31)
+    table.build(T0)
+    return table
+
+
+def test_interpolated_state_matches_the_source(table):
+    for offset in (0.0, 1234.5, 3 * DAY + 17.0, 20 * DAY + 59.9):
+        now = T0 + offset
+        state = table.at(now)
+        exact = synthetic_moon(np.array([now]))
+        assert state['latitude'] == pytest.approx(exact['latitude'][0], abs=1e-3)
+        assert (state['longitude'] - exact['longitude'][0] + 180) % 360 - 180 == pytest.approx(0, abs=1e-3)
+        assert state['phase_angle'] == pytest.approx(exact['phase_angle'][0], abs=1e-6)
+        assert state['phase_name'] == phase_name(state['phase_angle'])
+    assert table.builds == 1
+
+
+def test_next_phases_follow_the_synodic_month(table):
+    phases = table.next_phases(T0 + 60, count=4)
+    assert [p['phase'] for p in phases] == ['first-quarter', 'full-moon', 'last-quarter', 'new-moon']
+    for k, phase in enumerate(phases, start=1):
+        assert phase['timestamp'] == pytest.approx(T0 + k * SYNODIC / 4, abs=1.0)
+
+
+def test_rise_and_set_alternate_about_daily(table):
+    events = table.rise_set(40.0, -75.0, now=T0, hours=72)
+    kinds = [e['event'] for e in events]
+    assert all(a != b for a, b in zip(kinds, kinds[1:]))
+    rises = [e['timestamp'] for e in events if e['event'] == 'rise']
+    assert np.diff(rises) == pytest.approx(1.035 * DAY, rel=0.02)
+
+
+def test_lookup_outside_window_rebuilds(table):
+    table.at(T0 + 60 * DAY)
+    assert table.builds == 2
+
+
+def test_solar_eclipses_match_published_dates(ts):
+    # New moon dates with their eclipse type per NASA's Five Millennium Canon
+    cases = [
+        ((2011, 7, 1), 'Partial'),     # |gamma| 1.49, the old latitude cut-off's edge
+        ((2013, 11, 3), 'Hybrid'),
+        ((2023, 4, 20), 'Hybrid'),
+        ((2023, 10, 14), 'Annular'),
+        ((2024, 4, 8), 'Total'),
+        ((2024, 10, 2), 'Annular'),
+        ((2025, 3, 29), 'Partial'),
+        ((2025, 9, 21), 'Partial'),
+        ((2026, 2, 17), 'Annular'),
+        ((2026, 8, 12), 'Total'),
+        ((2024, 3, 10), None),
+        ((2024, 5, 8), None),
+        ((2025, 4, 27), None),
+    ]
+    kinds = solar_eclipses([ts.utc(*date).tt for date, _ in cases])
+    names = [SOLAR_ECLIPSES[kind] if kind >= 0 else None for kind in kinds]
+    assert names == [name for _, name in cases]
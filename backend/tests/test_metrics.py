@@ -0,0 +1,38 @@
+import time
+
+from metrics import Profile, Registry
+
+
+def test_exposition_format():
+    registry = Registry()
+    requests = registry.counter('requests_total', 'Requests', ('route',))
+    lag = registry.histogram('lag_seconds', 'Lag', buckets=(0.1, 1.0))
+    requests.labels('/api/"x"').inc()
+    requests.labels('/api/"x"').inc(2)
+    for value in (0.05, 0.5, 5.0):
+        lag.observe(value)
+    registry.collector(lambda: [('ships', 'gauge', 'Ships', [({'role': 'api'}, 7), ({'role': 'ingest'}, None)])])
+
+    lines = registry.render().decode().splitlines()
+    assert '# TYPE aethra_requests_total counter' in lines
+    assert 'aethra_requests_total{route="/api/\\"x\\""} 3.0' in lines
+    # Buckets are cumulative and end with +Inf
+    assert 'aethra_lag_seconds_bucket{le="0.1"} 1' in lines
+    assert 'aethra_lag_seconds_bucket{le="1.0"} 2' in lines
+    assert 'aethra_lag_seconds_bucket{le="+Inf"} 3' in lines
+    assert 'aethra_lag_seconds_count 3' in lines
+    assert 'aethra_ships{role="api"} 7' in lines
+    assert 'aethra_ships{role="ingest"} NaN' in lines
+
+
+def test_profile_server_timing_sums_phases():
+    profile = Profile()
+    for _ in range(2):
+        with profile.phase('compute'):
+            time.sleep(0.01)
+    with profile.phase('serialize'):
+        pass
+    timing = dict(entry.split(';dur=') for entry in profile.server_timing(0.05).split(', '))
+    assert list(timing) == ['compute', 'serialize', 'total']
+    assert 20 <= float(timing['compute']) < 50
+    assert float(timing['total']) == 50
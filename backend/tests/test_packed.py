@@ -0,0 +1,44 @@
+import gzip
+
+import numpy as np
+
+import packed
+from packed import choose_encoding, compress, pack_points, unpack_points, wants_packed
+
+
+def test_pack_round_trips_numeric_and_string_columns():
+    body = pack_points([
+        ('lon', [10.5, -170.25, 0.0], 'float32'),
+        ('lat', np.array([1.0, 2.0, 3.0]), 'float32'),
+        ('id', np.array([25544, 1, 2]), 'uint32'),
+        ('name', ['ISS', None, 'ISS'], 'string'),
+    ])
+    assert body[:4] == b'AEP1'
+
+    columns = unpack_points(body)
+    assert columns['lon'].tolist() == [10.5, -170.25, 0.0]
+    assert columns['id'].dtype == np.uint32
+    assert columns['name'] == ['ISS', '', 'ISS']
+
+
+def test_columns_are_eight_byte_aligned():
+    body = pack_points([('a', [1, 2, 3], 'uint8'), ('b', [1.0, 2.0, 3.0], 'float64')])
+    # Browsers can only view typed arrays at offsets aligned to the element size
+    columns = unpack_points(body)
+    assert columns['b'].tolist() == [1.0, 2.0, 3.0]
+    assert len(body) % 8 == 0
+
+
+def test_format_negotiation():
+    assert wants_packed('packed', None)
+    assert not wants_packed('geojson', 'application/x-aethra-points')
+    assert wants_packed(None, 'application/x-aethra-points, */*')
+    assert not wants_packed(None, 'application/json')
+
+
+def test_choose_encoding_respects_q_zero(monkeypatch):
+    monkeypatch.setattr(packed, 'brotli', None)
+    assert choose_encoding('gzip, deflate, br') == 'gzip'
+    assert choose_encoding('gzip;q=0, deflate') is None
+    assert choose_encoding(None) is None
+    assert gzip.decompress(compress(b'x' * 2000, 'gzip')) == b'x' * 2000
@@ -0,0 +1,68 @@
+import numpy as np
+from skyfield.api import wgs84
+
+from passes import Observer, PassPredictor, sun_direction, sunlit
+from propagation import Constellation, epoch_times, unix_seconds
+
+NOW = 1768435200.0  # 2026-01-15 00:00 UTC
+DAY = 86400.0
+
+
+def iss(stations):
+    return next(sat for sat in stations if sat.model.satnum == 25544)
+
+
+def skyfield_passes(satellite, ts, lat, lon, start, end, altitude):
+    t, events = satellite.find_events(wgs84.latlon(lat, lon), epoch_times(ts, start),
+                                      epoch_times(ts, end), altitude_degrees=altitude)
+    seconds = unix_seconds(t)
+    return [seconds[i:i + 3] for i in range(len(events) - 2) if list(events[i:i + 3]) == [0, 1, 2]]
+
+
+def test_matches_skyfield_find_events(ts, stations):
+    predictor = PassPredictor()
+    for lat, lon in [(51.48, 0.0), (-33.9, 151.2)]:
+        passes = predictor.predict(Constellation([iss(stations)]), Observer(lat, lon), NOW, NOW + DAY, 10)
+        complete = [p for p in passes if p['rise'] and p['set']
+                    and NOW <= p['rise']['timestamp'] and p['set']['timestamp'] <= NOW + DAY]
+        expected = skyfield_passes(iss(stations), ts, lat, lon, NOW, NOW + DAY, 10)
+
+        assert len(complete) == len(expected) > 0
+        for found, (rise, culmination, set_) in zip(complete, expected):
+            assert abs(found['rise']['timestamp'] - rise) < 1
+            assert abs(found['culmination']['timestamp'] - culmination) < 1
+            assert abs(found['set']['timestamp'] - set_) < 1
+            assert abs(found['rise']['altitude'] - 10) < 0.05
+
+
+def test_group_screen_finds_every_single_satellite_pass(stations):
+    predictor = PassPredictor()
+    observer = Observer(40.0, -105.0)
+    group = predictor.predict(Constellation(stations), observer, NOW, NOW + 6 * 3600, 10)
+
+    single = []
+    for satellite in stations:
+        single.extend(predictor.predict(Constellation([satellite]), observer, NOW, NOW + 6 * 3600, 10))
+    key = lambda p: (p['norad_id'], round(p['culmination']['timestamp']))
+    assert sorted(map(key, group)) == sorted(map(key, single))
+    rises = [(p['rise'] or p['culmination'])['timestamp'] for p in group]
+    assert rises == sorted(rises)
+
+
+def test_visible_only_and_limit(stations):
+    predictor = PassPredictor()
+    observer = Observer(51.48, 0.0)
+    every = predictor.predict(Constellation(stations), observer, NOW, NOW + DAY, 10)
+    visible = predictor.predict(Constellation(stations), observer, NOW, NOW + DAY, 10, visible_only=True, limit=5)
+
+    assert len(visible) == 5
+    assert all(p['visible'] for p in visible)
+    assert visible == [p for p in every if p['visible']][:5]
+    # Visible means sunlit at some point while the sky is dark
+    assert all(any(p[name] and p[name]['sunlit'] for name in ('rise', 'culmination', 'set')) for p in visible)
+
+
+def test_earth_shadow():
+    sun = sun_direction(np.array([NOW]))
+    r = 7000.0 * np.vstack([sun, -sun, np.cross(sun, [0.0, 0.0, 1.0]) / np.linalg.norm(np.cross(sun, [0.0, 0.0, 1.0]))])
+    assert sunlit(r, sun).tolist() == [True, False, True]
@@ -0,0 +1,46 @@
+from datetime import datetime, timezone
+
+import numpy as np
+from skyfield.api import wgs84
+
+from propagation import Constellation, epoch_times, unix_seconds
+
+
+def test_subpoints_match_skyfield(ts, stations):
+    constellation = Constellation(stations)
+    t = ts.utc(2026, 1, 15, 12, 0, 0)
+    subpoints = constellation.subpoints(t)
+
+    assert subpoints.longitude.shape == (len(stations),)
+    for i, sat in enumerate(stations):
+        if not subpoints.valid[i]:
+            continue
+        expected = wgs84.subpoint(sat.at(t))
+        assert abs(expected.longitude.degrees - subpoints.longitude[i]) < 1e-9
+        assert abs(expected.latitude.degrees - subpoints.latitude[i]) < 1e-9
+        assert abs(expected.elevation.km - subpoints.altitude_km[i]) < 1e-6
+
+
+def test_subpoints_over_time_array(ts, stations):
+    constellation = Constellation(stations)
+    t = ts.utc(2026, 1, 15, 12, range(0, 30))
+    subpoints = constellation.subpoints(t)
+
+    assert subpoints.latitude.shape == (len(stations), 30)
+    iss = constellation.names.index('ISS (ZARYA)')
+    expected = wgs84.subpoint(stations[iss].at(t))
+    assert np.allclose(expected.latitude.degrees, subpoints.latitude[iss])
+
+
+def test_empty_constellation(ts):
+    subpoints = Constellation([]).subpoints(ts.now())
+    assert len(subpoints.longitude) == 0
+
+
+def test_epoch_times_apply_leap_seconds(ts):
+    seconds = np.array([1_700_000_000.25, 1_483_228_800.0])
+    t = epoch_times(ts, seconds)
+    for value, tt in zip(seconds, t.tt):
+        expected = ts.from_datetime(datetime.fromtimestamp(value, timezone.utc))
+        assert abs(tt - expected.tt) * 86400 < 1e-3
+    np.testing.assert_allclose(unix_seconds(t), seconds, atol=1e-3)
@@ -0,0 +1,105 @@
+import asyncio
+import json
+
+import pytest
+
+from response_cache import ResponseCache
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def get_bytes(cache, key, ttl, compute):
+    async def compute_async():
+        return compute()
+    return asyncio.run(cache.get_bytes_async(key, ttl, compute_async))
+
+
+def test_hits_within_bucket_and_recomputes_after():
+    clock = FakeClock()
+    cache = ResponseCache(clock=clock)
+    calls = []
+
+    def compute():
+        calls.append(clock.now)
+        return {"n": len(calls)}
+
+    assert json.loads(get_bytes(cache, ("iss",), 10, compute)) == {"n": 1}
+    clock.now += 5
+    assert json.loads(get_bytes(cache, ("iss",), 10, compute)) == {"n": 1}
+    clock.now += 5
+    assert json.loads(get_bytes(cache, ("iss",), 10, compute)) == {"n": 2}
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_errors_are_not_cached():
+    cache = ResponseCache(clock=FakeClock())
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        get_bytes(cache, ("track",), 60, fail)
+    assert get_bytes(cache, ("track",), 60, lambda: [1]) == b"[1]"
+
+
+def test_max_entries_evicts_oldest():
+    cache = ResponseCache(max_entries=2, clock=FakeClock())
+    for group in ("gps", "iridium", "starlink"):
+        get_bytes(cache, ("satellites", group), 5, lambda: group)
+    assert cache.stats()["entries"] == 2
+
+
+def test_async_concurrent_misses_compute_once():
+    cache = ResponseCache(clock=FakeClock())
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"ok": True}
+
+    async def main():
+        return await asyncio.gather(*(cache.get_bytes_async(("iss",), 1, compute) for _ in range(10)))
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert set(results) == {b'{"ok":true}'}
+
+
+def test_async_accepts_pre_encoded_bytes():
+    cache = ResponseCache(clock=FakeClock())
+
+    async def compute():
+        return b'{"raw":1}'
+
+    assert asyncio.run(cache.get_bytes_async(("moon",), 600, compute)) == b'{"raw":1}'
+
+
+def test_cancelled_leader_hands_over_to_waiting_caller():
+    cache = ResponseCache(clock=FakeClock())
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"n": len(calls)}
+
+    async def main():
+        leader = asyncio.ensure_future(cache.get_bytes_async(("moon",), 60, compute))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(cache.get_bytes_async(("moon",), 60, compute))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert json.loads(asyncio.run(main())) == {"n": 2}
+    assert len(calls) == 2
@@ -0,0 +1,50 @@
+import numpy as np
+
+from shared_state import SharedShipView, write_ship_snapshot
+from ship_store import ShipStore
+
+
+def populated_store():
+    store = ShipStore(capacity=100)
+    rng = np.random.default_rng(1)
+    for mmsi in range(200000000, 200000050):
+        store.update_position(mmsi, rng.uniform(-60, 60), rng.uniform(-180, 180), 10.0, 45.0, now=1000 + mmsi % 50)
+    store.update_static(200000001, 'EVER GIVEN', 70, 'H3RC', 'ROTTERDAM', now=1100)
+    store.update_static(300000000, 'NO FIX YET', 30, '', '', now=1100)
+    return store
+
+
+def test_view_serves_the_same_vessels_as_the_store(tmp_path):
+    store = populated_store()
+    path = str(tmp_path / 'ships.aep')
+    assert write_ship_snapshot(store, path) == 51
+    view = SharedShipView(path)
+
+    assert view.get(200000001) == store.get(200000001)
+    assert view.get(300000000)['name'] == 'NO FIX YET'
+    assert view.get(200000002)['name'] is None
+    for bbox, limit in [(None, None), ((-20, -30, 40, 30), None), ((170, -60, -170, 60), None), (None, 7)]:
+        slots = store.query(300, bbox, limit, now=1200)
+        rows = view.query(300, bbox, limit, now=1200)
+        assert sorted(store.mmsi[slots].tolist()) == sorted(view.mmsi[rows].tolist())
+    # Numeric columns are views of the mapped file, not copies
+    assert not view.lat.flags.owndata
+
+
+def test_consecutive_snapshots_become_changes(tmp_path):
+    store = populated_store()
+    path = str(tmp_path / 'ships.aep')
+    write_ship_snapshot(store, path)
+    view = SharedShipView(path, check_interval=0)
+    changed, released = view.drain_changes()
+    assert len(changed) == 51 and released == set()
+
+    store.update_position(200000003, 1.0, 2.0, 3.0, 4.0, now=1300)
+    store.update_position(400000000, 1.0, 2.0, 3.0, 4.0, now=1300)
+    store.prune(max_age=100, now=1149.5)
+    write_ship_snapshot(store, path)
+
+    changed, released = view.drain_changes()
+    assert changed == {200000003, 400000000}
+    assert released == {200000000 + i for i in range(50) if i not in (1, 3)}
+    assert view.drain_changes() == (set(), set())
@@ -0,0 +1,62 @@
+from ship_store import ShipStore
+
+
+def test_position_and_static_merge_into_one_record():
+    store = ShipStore(capacity=10)
+    store.update_position(123, 51.5, -0.12, 12.3, 90.0, now=100)
+    store.update_static(123, 'EVER GIVEN', 70, 'H3RC', 'ROTTERDAM', now=101)
+
+    record = store.get(123)
+    assert record['name'] == 'EVER GIVEN'
+    assert record['ship_type'] == 70
+    assert abs(record['lat'] - 51.5) < 1e-5
+    assert record['timestamp'] == 101
+    assert len(store) == 1
+
+
+def test_full_store_evicts_least_recently_updated():
+    store = ShipStore(capacity=3)
+    for mmsi in (1, 2, 3):
+        store.update_position(mmsi, 0, 0, 0, 0, now=mmsi)
+    store.update_position(1, 1, 1, 0, 0, now=10)
+    store.update_position(4, 0, 0, 0, 0, now=11)
+
+    assert 2 not in store
+    assert {1, 3, 4} == {mmsi for mmsi in (1, 2, 3, 4) if mmsi in store}
+    assert store.stats()['evicted'] == 1
+
+
+def test_prune_drops_only_silent_vessels():
+    store = ShipStore(capacity=10)
+    store.update_position(1, 0, 0, 0, 0, now=0)
+    store.update_static(2, 'A', 0, '', '', now=50)
+    store.update_position(3, 0, 0, 0, 0, now=90)
+
+    assert store.prune(max_age=30, now=100) == 2
+    assert len(store) == 1 and 3 in store
+    # Freed slots are reused and come back clean
+    store.update_static(5, 'B', 0, '', '', now=100)
+    assert store.get(5)['lat'] != store.get(5)['lat']  # NaN until a position arrives
+
+
+def test_active_slots_require_recent_position():
+    store = ShipStore(capacity=10)
+    store.update_position(1, 10, 20, 0, 0, now=0)
+    store.update_position(2, 10, 20, 0, 0, now=95)
+    store.update_static(3, 'NO POSITION', 0, '', '', now=95)
+
+    slots = store.active_slots(max_age=60, now=100)
+    assert store.mmsi[slots].tolist() == [2]
+
+
+def test_drain_changes_reports_touched_and_released_vessels():
+    store = ShipStore(capacity=2)
+    store.update_position(1, 0, 0, 0, 0, now=1)
+    store.update_position(2, 0, 0, 0, 0, now=2)
+    store.update_position(3, 0, 0, 0, 0, now=3)  # evicts 1
+
+    changed, released = store.drain_changes()
+    assert changed == {2, 3}
+    assert released == {1}
+    assert store.drain_changes() == (set(), set())
+    assert store.expired_between(0, 2.5) == [2]
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from spatial import GridIndex, bbox_mask, cluster_points, parse_bbox
+
+
+def test_parse_bbox_normalizes_world_copies():
+    assert parse_bbox('-10,-5,10,5') == (-10, -5, 10, 5)
+    assert parse_bbox('170,-5,190,5') == (170, -5, -170, 5)
+    assert parse_bbox('-400,-90,400,90') == (-180, -90, 180, 90)
+    with pytest.raises(ValueError):
+        parse_bbox('1,2,3')
+    with pytest.raises(ValueError):
+        parse_bbox('0,10,1,5')
+    for bbox in ('nan,0,10,10', '0,nan,10,10', 'inf,0,10,10', '0,0,-inf,10'):
+        with pytest.raises(ValueError):
+            parse_bbox(bbox)
+
+
+def test_grid_query_matches_exact_mask():
+    rng = np.random.default_rng(7)
+    lon = rng.uniform(-180, 180, 2000)
+    lat = rng.uniform(-85, 85, 2000)
+    index = GridIndex(cell_degrees=2.0)
+    for item in range(len(lon)):
+        index.update(item, lat[item], lon[item])
+
+    for bbox in [(-20, -10, 15, 30), (170, -40, -160, 40), (179, -90, 180, 90)]:
+        candidates = index.query(*bbox)
+        found = candidates[bbox_mask(lon[candidates], lat[candidates], *bbox)]
+        expected = np.flatnonzero(bbox_mask(lon, lat, *bbox))
+        assert sorted(found.tolist()) == expected.tolist()
+
+
+def test_grid_moves_and_removes_items():
+    index = GridIndex()
+    index.update(1, 10.5, 20.5)
+    index.update(1, -30.5, 100.5)
+    assert index.query(20, 10, 21, 11).tolist() == []
+    assert index.query(100, -31, 101, -30).tolist() == [1]
+    index.remove(1)
+    assert len(index) == 0
+
+
+def test_cluster_points_counts_and_centroids():
+    lon = np.array([1.0, 1.2, 50.0])
+    lat = np.array([1.0, 1.4, 50.0])
+    inverse, counts, mean_lon, mean_lat = cluster_points(lon, lat, 10.0)
+    assert sorted(counts.tolist()) == [1, 2]
+    pair = inverse[0]
+    assert inverse[1] == pair
+    assert mean_lon[pair] == pytest.approx(1.1)
+    assert mean_lat[pair] == pytest.approx(1.2)
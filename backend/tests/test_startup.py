@@ -0,0 +1,24 @@
+import time
+
+from startup import StartupTimer, load_timescale, process_age
+
+
+def test_timer_records_phases(capsys):
+    timer = StartupTimer()
+    with timer.phase('data'):
+        time.sleep(0.01)
+    timer.mark_ready()
+
+    report = timer.report()
+    assert report['phases']['data'] >= 0.01
+    assert report['ready_seconds'] >= report['phases']['data']
+    assert '[startup] data:' in capsys.readouterr().out
+
+
+def test_timescale_uses_bundled_data(tmp_path):
+    ts = load_timescale(str(tmp_path))
+    assert ts.utc(2026, 1, 1).tt > 0
+    # Nothing was downloaded into the data directory
+    assert list(tmp_path.iterdir()) == []
+    age = process_age()
+    assert age is None or age > 0
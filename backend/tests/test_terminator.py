@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from terminator import MAX_LATITUDE, boundary_latitude, dark_polygon, solar_altitude, terminator_features
+
+
+@pytest.mark.parametrize('sub_lat,altitude', [(23.4, 0.0), (-23.4, -18.0), (-10.0, -6.0), (3.0, 0.0)])
+def test_graph_boundary_sits_at_the_band_altitude(sub_lat, altitude):
+    ring, pole = dark_polygon(sub_lat, 40.0, altitude, resolution=2)
+    assert pole != 0
+    line = np.array(ring[:-3])
+    assert line[0, 0] == -180 and line[-1, 0] == 180
+    inside = np.abs(line[:, 1]) < MAX_LATITUDE
+    np.testing.assert_allclose(solar_altitude(line[inside, 1], line[inside, 0], sub_lat, 40.0),
+                               altitude, atol=1e-3)
+    # The polygon closes over the pole that is actually dark
+    assert solar_altitude(89.9 * pole, 0.0, sub_lat, 40.0) < altitude
+
+
+def test_twilight_ring_without_a_pole_is_closed():
+    ring, pole = dark_polygon(5.0, 170.0, -18.0, resolution=2)
+    assert pole == 0
+    assert ring[0] == ring[-1]
+    coords = np.array(ring)
+    np.testing.assert_allclose(solar_altitude(coords[:, 1], coords[:, 0], 5.0, 170.0), -18.0, atol=1e-3)
+
+
+def test_boundary_matches_brute_force_search():
+    lon = np.arange(-180, 181, 15.0)
+    exact = boundary_latitude(lon, 15.0, -60.0, 0.0, pole=-1)
+    grid = np.linspace(-90, 90, 180001)
+    for x, lat in zip(lon, exact):
+        altitude = solar_altitude(grid, x, 15.0, -60.0)
+        crossing = grid[np.argmin(np.abs(altitude))]
+        assert abs(crossing - lat) < 0.01
+
+
+def test_features_cover_day_night_and_twilight_bands():
+    features = terminator_features(-20.0, 10.0, resolution=5, timestamp='2026-01-01T00:00:00Z')
+    assert [f['properties']['band'] for f in features] == ['day', 'night', 'civil', 'nautical', 'astronomical']
+    day, night = features[0], features[1]
+    assert night['properties']['wrapViaNorth'] is True
+    assert day['geometry']['coordinates'][0][-3][1] == -MAX_LATITUDE
+    assert night['geometry']['coordinates'][0][-3][1] == MAX_LATITUDE
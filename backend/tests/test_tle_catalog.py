@@ -0,0 +1,87 @@
+import asyncio
+import os
+import shutil
+
+import tle_catalog
+from tle_catalog import TLECatalog
+
+from conftest import BACKEND_DIR
+
+
+class MockClient:
+    def __init__(self, response):
+        self.response = response
+
+    async def get(self, url, timeout):
+        return self.response
+
+
+class MockResponse:
+    def __init__(self, content, status_code=200):
+        self.content = content
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code != 200:
+            raise RuntimeError(f'HTTP {self.status_code}')
+
+
+def make_catalog(ts, tmp_path):
+    shutil.copy(os.path.join(BACKEND_DIR, 'stations.txt'), tmp_path / 'stations.txt')
+    groups = {'stations': ('http://example.invalid/stations.txt', 'stations.txt')}
+    return TLECatalog(ts, str(tmp_path), groups=groups)
+
+
+def test_load_from_disk_indexes_satellites(ts, tmp_path):
+    catalog = make_catalog(ts, tmp_path)
+    assert catalog.get('stations') is None
+
+    catalog.load_from_disk()
+    snapshot = catalog.get('stations')
+    assert snapshot.source == 'disk'
+    assert snapshot.by_id[25544].name == 'ISS (ZARYA)'
+    assert snapshot.by_name['ISS (ZARYA)'].model.satnum == 25544
+    assert len(snapshot.constellation) == len(snapshot.satellites)
+
+
+def test_refresh_swaps_and_persists(ts, tmp_path, monkeypatch):
+    catalog = make_catalog(ts, tmp_path)
+    catalog.load_from_disk()
+    with open(tmp_path / 'stations.txt', 'rb') as f:
+        first_three = b''.join(f.readlines()[:3])
+
+    monkeypatch.setattr(tle_catalog.upstream, 'get_client', lambda: MockClient(MockResponse(first_three)))
+    assert asyncio.run(catalog.refresh('stations'))
+
+    snapshot = catalog.get('stations')
+    assert snapshot.source == 'network'
+    assert len(snapshot.satellites) == 1
+    assert (tmp_path / 'stations.txt').read_bytes() == first_three
+    assert not catalog.needs_refresh('stations')
+
+
+def test_failed_refresh_keeps_last_good(ts, tmp_path, monkeypatch):
+    catalog = make_catalog(ts, tmp_path)
+    catalog.load_from_disk()
+    before = catalog.get('stations')
+
+    monkeypatch.setattr(tle_catalog.upstream, 'get_client', lambda: MockClient(MockResponse(b'<html>')))
+    assert not asyncio.run(catalog.refresh('stations'))
+
+    assert catalog.get('stations') is before
+    assert catalog.status()['stations']['failures'] == 1
+    # Backoff prevents an immediate retry
+    assert not catalog.needs_refresh('stations')
+
+
+def test_missing_group_is_seeded_from_bundled_copy(ts, tmp_path):
+    groups = {'stations': ('http://example.invalid/stations.txt', 'stations.txt')}
+    catalog = TLECatalog(ts, str(tmp_path / 'tle'), groups=groups, seed_dir=BACKEND_DIR)
+    catalog.load_from_disk()
+
+    assert catalog.get('stations').by_id[25544].name == 'ISS (ZARYA)'
+    seeded = tmp_path / 'tle' / 'stations.txt'
+    with open(os.path.join(BACKEND_DIR, 'stations.txt'), 'rb') as f:
+        assert seeded.read_bytes() == f.read()
+    # Later refreshes write here, not over the bundled file
+    assert catalog.path('stations') == str(seeded)
@@ -0,0 +1,71 @@
+import numpy as np
+from skyfield.api import wgs84
+
+from propagation import epoch_times
+from track import TrackEngine, TrackEphemeris, split_antimeridian
+
+NOW = 1768435200.0  # 2026-01-15 00:00 UTC
+
+
+def iss(stations):
+    return next(sat for sat in stations if sat.model.satnum == 25544)
+
+
+def test_window_matches_direct_propagation(ts, stations):
+    track = TrackEphemeris(iss(stations), ts, step_seconds=30, past_minutes=60, future_minutes=60)
+    seconds, lon, lat, _ = track.window(45, 47, 60, now=NOW)
+
+    assert len(seconds) == 93
+    assert np.all(np.diff(seconds) == 60)
+    expected = wgs84.subpoint(iss(stations).at(epoch_times(ts, seconds)))
+    assert np.allclose(expected.longitude.degrees, lon)
+    assert np.allclose(expected.latitude.degrees, lat)
+
+
+def test_sliding_only_propagates_new_points(ts, stations):
+    sat = iss(stations)
+    sliding = TrackEphemeris(sat, ts, step_seconds=30, past_minutes=30, future_minutes=30)
+    sliding.update(NOW)
+    calls = []
+    propagate = sliding._propagate
+    sliding._propagate = lambda seconds: calls.append(len(seconds)) or propagate(seconds)
+
+    later = NOW + 10 * 60
+    seconds, lon, lat, _ = sliding.window(30, 30, now=later)
+    assert calls == [20]
+
+    fresh = TrackEphemeris(sat, ts, step_seconds=30, past_minutes=30, future_minutes=30)
+    fresh_seconds, fresh_lon, fresh_lat, _ = fresh.window(30, 30, now=later)
+    assert np.array_equal(seconds, fresh_seconds)
+    assert np.allclose(lon, fresh_lon)
+    assert np.allclose(lat, fresh_lat)
+
+
+def test_split_antimeridian():
+    lon = np.array([170.0, 175.0, -178.0, -172.0, np.nan, -160.0])
+    lat = np.array([0.0, 1.0, 2.0, 3.0, 4.0, 5.0])
+    segments = split_antimeridian(lon, lat)
+    assert segments == [[[170.0, 0.0], [175.0, 1.0]], [[-178.0, 2.0], [-172.0, 3.0], [-160.0, 5.0]]]
+    assert split_antimeridian(np.array([]), np.array([])) == []
+
+
+class StationCatalog:
+    def __init__(self, stations):
+        self.by_id = {sat.model.satnum: sat for sat in stations}
+
+    def find(self, norad_id):
+        return self.by_id.get(norad_id)
+
+
+def test_engine_evicts_least_recently_used(ts, stations):
+    engine = TrackEngine(StationCatalog(stations), ts, max_tracks=2, past_minutes=10, future_minutes=10)
+    first, second, third = (sat.model.satnum for sat in stations[:3])
+
+    kept = engine.get(first)
+    engine.get(second)
+    assert engine.get(first) is kept
+    engine.get(third)
+
+    assert len(engine) == 2 and engine.evicted == 1
+    assert engine.get(first) is kept
+    assert engine.get(99999) is None
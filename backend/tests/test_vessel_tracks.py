@@ -0,0 +1,81 @@
+import os
+
+import numpy as np
+
+from vessel_tracks import COLUMNS, VesselTrackStore
+
+DAY = 86400.0
+MIDNIGHT = 1768435200.0  # 2026-01-15 00:00 UTC
+
+
+def test_track_and_traffic_across_days(tmp_path):
+    store = VesselTrackStore(str(tmp_path), min_interval=0, min_distance=0)
+    for i in range(20):
+        now = MIDNIGHT - 600 + i * 60
+        store.append(1, 10.0 + i * 0.01, 20.0, 12.5, 90.0, now)
+        store.append(2, -5.0, 179.9 + i * 0.01 - (360 if i > 9 else 0), 3.0, 45.0, now)
+    assert store.flush() == 40
+    assert store.days() == ['2026-01-14', '2026-01-15']
+
+    times, lon, lat, sog, cog = store.track(1, MIDNIGHT - 300, MIDNIGHT + 300)
+    assert times.tolist() == [MIDNIGHT - 600 + i * 60 for i in range(5, 16)]
+    assert np.allclose(lat, [10.0 + i * 0.01 for i in range(5, 16)])
+    assert np.allclose(sog, 12.5)
+
+    # A bbox across the antimeridian, over the whole range
+    points = store.traffic(MIDNIGHT - DAY, MIDNIGHT + DAY, (179.0, -6.0, -179.0, -4.0))
+    assert points['mmsi'].tolist() == [2] * 20
+    assert np.all(np.diff(points['time']) >= 0)
+    assert len(store.traffic(MIDNIGHT + 3600, MIDNIGHT + 7200)['time']) == 0
+
+
+def test_downsampling_keeps_moves_and_heartbeats(tmp_path):
+    store = VesselTrackStore(str(tmp_path), min_interval=10, min_distance=50, max_interval=300)
+    assert store.append(1, 0.0, 0.0, 0, 0, MIDNIGHT)
+    assert not store.append(1, 0.01, 0.0, 0, 0, MIDNIGHT + 5)  # too soon, however far
+    assert not store.append(1, 0.0001, 0.0, 0, 0, MIDNIGHT + 20)  # 11 m
+    assert store.append(1, 0.001, 0.0, 0, 0, MIDNIGHT + 30)  # 111 m
+    assert not store.append(1, 0.001, 0.0, 0, 0, MIDNIGHT + 300)
+    assert store.append(1, 0.001, 0.0, 0, 0, MIDNIGHT + 330)  # moored, but 300 s since the last point
+    store.flush()
+    assert store.track(1, MIDNIGHT, MIDNIGHT + DAY)[0].tolist() == [MIDNIGHT, MIDNIGHT + 30, MIDNIGHT + 330]
+
+
+def test_torn_write_is_ignored_then_repaired(tmp_path):
+    store = VesselTrackStore(str(tmp_path), min_interval=0, min_distance=0)
+    store.append(1, 1.0, 2.0, 3.0, 4.0, MIDNIGHT + 10)
+    store.flush()
+    # A crash after only some of the column files were appended
+    with open(os.path.join(str(tmp_path), '2026-01-15', 'time.f8'), 'ab') as f:
+        f.write(np.array([MIDNIGHT + 20]).tobytes())
+    assert store.track(1, MIDNIGHT, MIDNIGHT + DAY)[0].tolist() == [MIDNIGHT + 10]
+
+    reopened = VesselTrackStore(str(tmp_path), min_interval=0, min_distance=0)
+    reopened.append(1, 5.0, 6.0, 7.0, 8.0, MIDNIGHT + 30)
+    reopened.flush()
+    times, lon, lat, _, _ = reopened.track(1, MIDNIGHT, MIDNIGHT + DAY)
+    assert times.tolist() == [MIDNIGHT + 10, MIDNIGHT + 30]
+    assert lat.tolist() == [1.0, 5.0]
+    sizes = {os.path.getsize(os.path.join(str(tmp_path), '2026-01-15', f'{name}.{dtype[1:]}')) // int(dtype[2:])
+             for name, dtype in COLUMNS}
+    assert sizes == {2}
+
+
+def test_prune_days(tmp_path):
+    store = VesselTrackStore(str(tmp_path), min_interval=0, min_distance=0, retention_days=2)
+    for day in range(4):
+        store.append(1, 0.0, 0.0, 0, 0, MIDNIGHT + day * DAY)
+    store.flush()
+    assert store.prune_days(MIDNIGHT + 3 * DAY + 60) == ['2026-01-15']
+    assert store.days() == ['2026-01-16', '2026-01-17', '2026-01-18']
+
+
+def test_reports_appended_while_writing_go_to_the_next_flush(tmp_path):
+    store = VesselTrackStore(str(tmp_path), min_interval=0, min_distance=0)
+    store.append(1, 10.0, 20.0, 5.0, 90.0, MIDNIGHT)
+    rows = store.take()
+    # Arrives while the worker thread writes ``rows``
+    store.append(1, 10.1, 20.0, 5.0, 90.0, MIDNIGHT + 60)
+    assert store.write(rows) == 1
+    assert store.pending == 1 and store.flush() == 1
+    assert store.track(1, MIDNIGHT, MIDNIGHT + 60)[0].tolist() == [MIDNIGHT, MIDNIGHT + 60]
@@ -0,0 +1,51 @@
+import json
+import os
+
+from volcanoes import VolcanoIndex, VolcanoLayer, normalize_name
+
+from conftest import BACKEND_DIR
+
+
+def load_layer():
+    return VolcanoLayer(VolcanoIndex.from_file(os.path.join(BACKEND_DIR, 'volcanoes.json')))
+
+
+def by_name(body):
+    return {f['properties']['name']: f['properties'] for f in json.loads(body)['features']}
+
+
+def test_static_levels_until_a_report_is_merged():
+    layer = load_layer()
+    volcanoes = by_name(layer.query())
+    assert len(volcanoes) == 13
+    assert volcanoes['Etna']['alert_level'] == 'high'
+    assert volcanoes['Katla']['alert_level'] == volcanoes['Mauna Loa']['alert_level'] == 'medium'
+    assert json.loads(layer.query())['source'] == 'static'
+
+
+def test_weekly_report_merge_is_versioned():
+    layer = load_layer()
+    assert normalize_name(' Popocatépetl ') == normalize_name('POPOCATEPETL') == 'popocatepetl'
+    assert layer.apply(['Popocatepetl', 'Mauna Loa', 'Nowhere'])
+    volcanoes = by_name(layer.query())
+    assert volcanoes['Popocatépetl']['status'] == 'Erupting'
+    assert volcanoes['Mauna Loa']['alert_level'] == 'high'
+    # Erupting in the dataset but absent from the report
+    assert (volcanoes['Etna']['status'], volcanoes['Etna']['alert_level']) == ('Active', 'medium')
+    assert layer.snapshot.version == 2
+    assert layer.snapshot.unmatched == ['Nowhere']
+
+    before = layer.snapshot
+    assert not layer.apply(['Popocatepetl', 'Mauna Loa', 'Nowhere'])
+    assert not layer.apply(['Popocatepetl', 'Mauna Loa', 'Somewhere else'])
+    assert layer.snapshot is before
+
+
+def test_bbox_and_alert_filters():
+    layer = load_layer()
+    layer.apply(['Kilauea', 'Erebus'])
+    # Across the antimeridian: Erebus (177 E) and the Hawaiian volcanoes (155 W)
+    assert set(by_name(layer.query((170.0, -80.0, -150.0, 25.0)))) == {'Erebus', 'Kilauea', 'Mauna Loa'}
+    assert set(by_name(layer.query((170.0, -80.0, -150.0, 25.0), ['high']))) == {'Erebus', 'Kilauea'}
+    assert set(by_name(layer.query(alert_levels=['medium']))) == {
+        name for name, properties in by_name(layer.query()).items() if properties['alert_level'] == 'medium'}
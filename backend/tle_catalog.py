@@ -0,0 +1,232 @@
+"""In-memory TLE catalog with scheduled background refresh.
+
+Each satellite group is parsed once into ``EarthSatellite`` objects and kept
+as an immutable ``CatalogSnapshot``.  A background task re-downloads groups
+from CelesTrak on a schedule, writes the raw TLE text to disk as the
+last-good copy and swaps the new snapshot in atomically, so request handlers
+only ever do dictionary lookups.
+
+Downloads live in their own directory (``tle/`` under the data dir by
+default), never in the source tree.  A group with no file there yet is
+seeded from the copy bundled with the backend, if there is one.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import os
+import shutil
+import time
+
+from skyfield.iokit import parse_tle_file
+
+import upstream
+from propagation import Constellation
+
+CELESTRAK_GP = 'https://celestrak.org/NORAD/elements/gp.php?GROUP={}&FORMAT=tle'
+
+# group -> (download url, on-disk filename)
+DEFAULT_GROUPS = {
+    'stations': ('http://celestrak.org/NORAD/elements/stations.txt', 'stations.txt'),
+    'gps': (CELESTRAK_GP.format('gps-ops'), 'tle_gps.txt'),
+    'iridium': (CELESTRAK_GP.format('iridium'), 'tle_iridium.txt'),
+    'starlink': (CELESTRAK_GP.format('starlink'), 'tle_starlink.txt'),
+}
+
+# CelesTrak only updates GP data a few times a day; don't poll faster.
+DEFAULT_REFRESH_INTERVAL = 6 * 3600
+# Elements older than this are still served but reported as stale.
+DEFAULT_MAX_AGE = 3 * 86400
+MIN_RETRY_DELAY = 60
+# Checked-in TLEs used until the first download (stations.txt)
+BUNDLED_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class CatalogSnapshot:
+    """Parsed TLEs for one group, indexed by name and NORAD id."""
+
+    def __init__(self, group, satellites, fetched_at, source):
+        self.group = group
+        self.satellites = satellites
+        self.by_name = {sat.name: sat for sat in satellites}
+        self.by_id = {sat.model.satnum: sat for sat in satellites}
+        self.constellation = Constellation(satellites)
+        self.fetched_at = fetched_at
+        self.source = source
+
+    def age(self, now=None):
+        return (now or time.time()) - self.fetched_at
+
+
+class TLECatalog:
+    """Keeps every configured group's latest snapshot in memory."""
+
+    def __init__(self, ts, data_dir, groups=None,
+                 refresh_interval=DEFAULT_REFRESH_INTERVAL,
+                 max_age=DEFAULT_MAX_AGE, poll_interval=60, seed_dir=None):
+        self.ts = ts
+        self.data_dir = data_dir
+        self.seed_dir = seed_dir
+        self.groups = dict(groups or DEFAULT_GROUPS)
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self.poll_interval = poll_interval
+        self._snapshots = {}
+        self._retry_at = {}
+        self._failures = {}
+
+    def __contains__(self, group):
+        return group in self.groups
+
+    def path(self, group):
+        return os.path.join(self.data_dir, self.groups[group][1])
+
+    def get(self, group):
+        """Return the current snapshot for ``group`` or None if not loaded yet."""
+        if group not in self.groups:
+            raise KeyError(group)
+        return self._snapshots.get(group)
+
+    def find(self, norad_id):
+        """Return the ``EarthSatellite`` for ``norad_id`` from any loaded group."""
+        for snapshot in list(self._snapshots.values()):
+            satellite = snapshot.by_id.get(norad_id)
+            if satellite is not None:
+                return satellite
+        return None
+
+    def _parse(self, data):
+        satellites = list(parse_tle_file(io.BytesIO(data), self.ts))
+        if not satellites:
+            raise ValueError('no TLE records found')
+        return satellites
+
+    def _seed(self, group):
+        """Copy ``group``'s bundled file into the data dir; False if there is none."""
+        if self.seed_dir is None:
+            return False
+        seed_path = os.path.join(self.seed_dir, self.groups[group][1])
+        if not os.path.exists(seed_path):
+            return False
+        os.makedirs(self.data_dir, exist_ok=True)
+        # copy2 keeps the mtime, so the snapshot's age stays honest
+        shutil.copy2(seed_path, self.path(group))
+        return True
+
+    def load_from_disk(self):
+        """Populate the catalog from the last-good files without touching the network."""
+        for group in self.groups:
+            path = self.path(group)
+            if not os.path.exists(path) and not self._seed(group):
+                continue
+            try:
+                with open(path, 'rb') as f:
+                    satellites = self._parse(f.read())
+                self._snapshots[group] = CatalogSnapshot(
+                    group, satellites, os.path.getmtime(path), 'disk')
+                print(f"[catalog] {group}: {len(satellites)} satellites from {path}")
+            except Exception as e:
+                print(f"[catalog] {group}: could not load {path}: {e}")
+
+    def _persist(self, group, data):
+        os.makedirs(self.data_dir, exist_ok=True)
+        path = self.path(group)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _build(self, group, data):
+        satellites = self._parse(data)
+        self._persist(group, data)
+        return CatalogSnapshot(group, satellites, time.time(), 'network')
+
+    async def refresh(self, group):
+        """Download, validate, persist and swap in a new snapshot for ``group``."""
+        url = self.groups[group][0]
+        try:
+            response = await upstream.get_client().get(url, timeout=30)
+            response.raise_for_status()
+            # Parsing thousands of TLEs is CPU work; keep it off the event loop
+            snapshot = await asyncio.to_thread(self._build, group, response.content)
+            satellites = snapshot.satellites
+
+            self._snapshots[group] = snapshot
+            self._failures.pop(group, None)
+            self._retry_at.pop(group, None)
+            print(f"[catalog] {group}: refreshed {len(satellites)} satellites")
+            return True
+        except Exception as e:
+            failures = self._failures.get(group, 0) + 1
+            self._failures[group] = failures
+            delay = min(MIN_RETRY_DELAY * 2 ** (failures - 1), self.refresh_interval)
+            self._retry_at[group] = time.time() + delay
+            print(f"[catalog] {group}: refresh failed ({e}), retrying in {delay}s")
+            return False
+
+    def needs_refresh(self, group, now=None):
+        now = now or time.time()
+        if now < self._retry_at.get(group, 0):
+            return False
+        snapshot = self._snapshots.get(group)
+        return snapshot is None or snapshot.age(now) >= self.refresh_interval
+
+    def is_stale(self, group, now=None):
+        snapshot = self._snapshots.get(group)
+        return snapshot is None or snapshot.age(now) > self.max_age
+
+    def status(self):
+        now = time.time()
+        result = {}
+        for group in self.groups:
+            snapshot = self._snapshots.get(group)
+            result[group] = {
+                "loaded": snapshot is not None,
+                "satellites": len(snapshot.satellites) if snapshot else 0,
+                "age_seconds": round(snapshot.age(now)) if snapshot else None,
+                "source": snapshot.source if snapshot else None,
+                "stale": self.is_stale(group, now),
+                "failures": self._failures.get(group, 0),
+            }
+        return result
+
+    def reload_changed(self):
+        """Reload groups whose file on disk is newer than the loaded snapshot; returns their names.
+
+        Used by API workers, which leave downloading to the ingest process
+        and pick up the files it persists.
+        """
+        reloaded = []
+        for group in self.groups:
+            path = self.path(group)
+            snapshot = self._snapshots.get(group)
+            try:
+                mtime = os.path.getmtime(path)
+                if snapshot is not None and mtime <= snapshot.fetched_at:
+                    continue
+                with open(path, 'rb') as f:
+                    satellites = self._parse(f.read())
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                print(f"[catalog] {group}: could not reload {path}: {e}")
+                continue
+            self._snapshots[group] = CatalogSnapshot(group, satellites, mtime, 'disk')
+            reloaded.append(group)
+        return reloaded
+
+    async def watch(self, interval=30):
+        """Background loop picking up files written by another process, instead of ``run``."""
+        while True:
+            for group in await asyncio.to_thread(self.reload_changed):
+                print(f"[catalog] {group}: reloaded {len(self._snapshots[group].satellites)} satellites from disk")
+            await asyncio.sleep(interval)
+
+    async def run(self):
+        """Background loop refreshing due groups off the event loop."""
+        while True:
+            for group in self.groups:
+                if self.needs_refresh(group):
+                    await self.refresh(group)
+            await asyncio.sleep(self.poll_interval)
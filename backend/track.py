@@ -0,0 +1,165 @@
+"""Precomputed ground tracks served from a sliding ring buffer.
+
+A ``TrackEphemeris`` propagates one satellite over a multi-orbit window on a
+fixed time grid with a single vectorized SGP4 call.  As time advances only
+the new grid points at the leading edge are propagated; old points fall off
+the trailing edge.  Any window inside the buffer, at any multiple of the grid
+step, is served by slicing.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from propagation import Constellation, epoch_times
+
+DEFAULT_STEP_SECONDS = 30
+DEFAULT_PAST_MINUTES = 180
+DEFAULT_FUTURE_MINUTES = 180
+# About 17 KB per satellite at the default window and step
+DEFAULT_MAX_TRACKS = 1000
+
+
+def split_antimeridian(lon, lat):
+    """Split a lon/lat polyline into segments wherever it jumps across ±180°.
+
+    Non-finite points are dropped first.  Returns a list of segments,
+    each a list of ``[lon, lat]`` pairs, ready for a MultiLineString.
+    """
+    ok = np.isfinite(lon) & np.isfinite(lat)
+    lon, lat = lon[ok], lat[ok]
+    if len(lon) == 0:
+        return []
+    breaks = np.flatnonzero(np.abs(np.diff(lon)) > 180) + 1
+    coords = np.column_stack((lon, lat))
+    return [segment.tolist() for segment in np.split(coords, breaks)]
+
+
+class TrackEphemeris:
+    """Ring buffer of subpoints for one satellite on a fixed time grid."""
+
+    def __init__(self, satellite, ts, step_seconds=DEFAULT_STEP_SECONDS,
+                 past_minutes=DEFAULT_PAST_MINUTES, future_minutes=DEFAULT_FUTURE_MINUTES):
+        self.satellite = satellite
+        self.ts = ts
+        self.step = int(step_seconds)
+        self.past = int(past_minutes * 60)
+        self.future = int(future_minutes * 60)
+        self.capacity = (self.past + self.future) // self.step + 2
+        self._constellation = Constellation([satellite])
+        self._lon = np.empty(self.capacity)
+        self._lat = np.empty(self.capacity)
+        self._alt = np.empty(self.capacity)
+        self._start = 0      # ring index of the oldest grid point
+        self._t0 = None      # Unix time of the oldest grid point
+        self._lock = threading.Lock()
+
+    def _propagate(self, seconds):
+        subpoints = self._constellation.subpoints(epoch_times(self.ts, seconds))
+        lon, lat, alt = subpoints.longitude[0], subpoints.latitude[0], subpoints.altitude_km[0]
+        invalid = ~subpoints.valid[0]
+        lon[invalid] = lat[invalid] = alt[invalid] = np.nan
+        return lon, lat, alt
+
+    def _write(self, first_slot, lon, lat, alt):
+        slots = (first_slot + np.arange(len(lon))) % self.capacity
+        self._lon[slots] = lon
+        self._lat[slots] = lat
+        self._alt[slots] = alt
+
+    def update(self, now=None):
+        """Slide the buffer so it covers [now - past, now + future]."""
+        now = time.time() if now is None else now
+        t0 = math.floor((now - self.past) / self.step) * self.step
+        with self._lock:
+            shift = self.capacity if self._t0 is None else (t0 - self._t0) // self.step
+            if shift <= 0:
+                return
+            if shift >= self.capacity:
+                seconds = t0 + self.step * np.arange(self.capacity, dtype=float)
+                self._start = 0
+                self._write(0, *self._propagate(seconds))
+            else:
+                # Only the grid points past the old leading edge are new
+                first_new = self._t0 + self.step * self.capacity
+                seconds = first_new + self.step * np.arange(shift, dtype=float)
+                self._write(self._start, *self._propagate(seconds))
+                self._start = (self._start + shift) % self.capacity
+            self._t0 = t0
+
+    def window(self, past_minutes, future_minutes, resolution_seconds=None, now=None):
+        """Return (seconds, lon, lat, alt) arrays for a window around ``now``.
+
+        The window is clipped to the buffer and snapped to the grid;
+        ``resolution_seconds`` is rounded to a multiple of the grid step.
+        """
+        now = time.time() if now is None else now
+        self.update(now)
+        stride = max(1, int(round((resolution_seconds or self.step) / self.step)))
+        with self._lock:
+            t0, start = self._t0, self._start
+            first = max(0, math.ceil((now - past_minutes * 60 - t0) / self.step))
+            last = min(self.capacity - 1, math.floor((now + future_minutes * 60 - t0) / self.step))
+            offsets = np.arange(first, last + 1, stride)
+            slots = (start + offsets) % self.capacity
+            return (t0 + self.step * offsets, self._lon[slots].copy(),
+                    self._lat[slots].copy(), self._alt[slots].copy())
+
+
+class TrackEngine:
+    """Lazily keeps one ``TrackEphemeris`` per requested satellite, LRU-bounded.
+
+    Only the ``max_tracks`` most recently requested satellites keep their
+    buffers; the least recently used one is dropped to make room.
+    """
+
+    def __init__(self, catalog, ts, max_tracks=DEFAULT_MAX_TRACKS, **options):
+        self.catalog = catalog
+        self.ts = ts
+        self.max_tracks = max_tracks
+        self.options = options
+        self._tracks = OrderedDict()  # norad_id -> TrackEphemeris, least recently used first
+        self._lock = threading.Lock()
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self._tracks)
+
+    def get(self, norad_id):
+        """Return the track buffer for ``norad_id`` or None if it is not in the catalog."""
+        satellite = self.catalog.find(norad_id)
+        if satellite is None:
+            return None
+        with self._lock:
+            track = self._tracks.get(norad_id)
+            # A catalog refresh hands out new EarthSatellite objects; start over.
+            if track is None or track.satellite is not satellite:
+                track = self._tracks[norad_id] = TrackEphemeris(satellite, self.ts, **self.options)
+            self._tracks.move_to_end(norad_id)
+            while len(self._tracks) > self.max_tracks:
+                self._tracks.popitem(last=False)
+                self.evicted += 1
+            return track
+
+    def geojson(self, norad_id, past_minutes, future_minutes, resolution_seconds,
+                name=None, now=None):
+        track = self.get(norad_id)
+        if track is None:
+            return None
+        _, lon, lat, _ = track.window(past_minutes, future_minutes, resolution_seconds, now)
+        return {
+            "type": "Feature",
+            "geometry": {
+                "type": "MultiLineString",
+                "coordinates": split_antimeridian(lon, lat)
+            },
+            "properties": {
+                "name": name or f"{track.satellite.name} Orbit Track",
+                "id": norad_id
+            }
+        }
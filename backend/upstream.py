@@ -0,0 +1,64 @@
+"""Shared async HTTP client for upstream feeds (CelesTrak, OpenSky, GVP, ...).
+
+One pooled ``httpx.AsyncClient`` is reused for every outbound request so
+connections stay warm and a slow upstream never occupies a worker thread.
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+
+import httpx
+
+from metrics import InstrumentedTransport
+
+DEFAULT_TIMEOUT = httpx.Timeout(
+    float(os.getenv("AETHRA_UPSTREAM_TIMEOUT", 15)),
+    connect=float(os.getenv("AETHRA_UPSTREAM_CONNECT_TIMEOUT", 5)),
+)
+DEFAULT_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10)
+USER_AGENT = "Aethra/1.0 (+https://github.com/jospf/aethra)"
+
+_client = None
+_transport = httpx.AsyncHTTPTransport
+
+
+def instrument(duration, errors):
+    """Time requests into the ``duration`` histogram and count failures in ``errors``, both by host.
+
+    Applies to clients created afterwards, so call it before the first request.
+    """
+    global _transport
+    _transport = functools.partial(InstrumentedTransport, duration, errors)
+
+
+def get_client():
+    """Return the process-wide client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=DEFAULT_TIMEOUT,
+            # Connection limits are a transport setting
+            transport=_transport(limits=DEFAULT_LIMITS),
+            follow_redirects=True,
+            headers={"User-Agent": USER_AGENT},
+        )
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+_transport = httpx.AsyncHTTPTransport
+
+
+def instrument(duration, errors):
+    """Time requests into the ``duration`` histogram and count failures in ``errors``, both by host.
+
+    Applies to clients created afterwards, so call it before the first request.
+    """
+    global _transport
+    _transport = functools.partial(InstrumentedTransport, duration, errors)
@@ -0,0 +1,252 @@
+"""Append-only history of AIS position reports, partitioned by UTC day.
+
+Each day is a directory of column files (``time.f8``, ``mmsi.u4``,
+``lat.f4``...), raw little-endian arrays that only ever grow.  Rows are
+appended in time order, so a time range is a binary search on the time
+column, and readers map the columns with ``np.memmap`` instead of parsing
+anything.  A crash can leave the columns of the last write at different
+lengths; readers use the shortest and the writer truncates back to it.
+
+The ingest loop only appends a tuple to an in-memory buffer (after an O(1)
+per-vessel downsampling check); every few seconds ``run`` takes the buffer
+on the loop, writes it to disk from a worker thread and deletes days past
+the retention period.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from spatial import bbox_mask
+
+# (name, little-endian dtype) of every column file
+COLUMNS = (
+    ("time", "<f8"),
+    ("mmsi", "<u4"),
+    ("lat", "<f4"),
+    ("lon", "<f4"),
+    ("sog", "<f4"),
+    ("cog", "<f4"),
+)
+_RECORD = np.dtype(list(COLUMNS))
+_METERS_PER_DEGREE = 111_320.0
+
+
+def day_name(seconds):
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def _day_start(seconds):
+    return math.floor(seconds / 86400.0) * 86400.0
+
+
+class VesselTrackStore:
+    """Per-day columnar position history with downsampling on ingest.
+
+    A report is kept if at least ``min_interval`` seconds passed since the
+    vessel's last kept point and it either moved ``min_distance`` meters or
+    ``max_interval`` seconds passed (so moored vessels still leave a point
+    every few minutes).  Set ``min_interval`` and ``min_distance`` to 0 to
+    keep every report.
+    """
+
+    def __init__(self, directory, min_interval=10.0, min_distance=50.0, max_interval=300.0,
+                 retention_days=7):
+        self.directory = directory
+        self.min_interval = min_interval
+        self.min_distance = min_distance
+        self.max_interval = max_interval
+        self.retention_days = retention_days
+        self.received = 0
+        self.written = 0
+        self._buffer = []
+        self._last = {}  # mmsi -> (time, lat, lon) of the last kept point
+        self._write_lock = threading.Lock()
+        self._repaired = set()
+
+    # --- Ingest ---
+
+    def append(self, mmsi, lat, lon, sog, cog, now=None):
+        """Buffer one position report; returns False if downsampling dropped it."""
+        now = time.time() if now is None else now
+        self.received += 1
+        last = self._last.get(mmsi)
+        if last is not None:
+            elapsed = now - last[0]
+            if elapsed < self.min_interval:
+                return False
+            if elapsed < self.max_interval:
+                dy = (lat - last[1]) * _METERS_PER_DEGREE
+                dx = (lon - last[2]) * _METERS_PER_DEGREE * math.cos(math.radians(lat))
+                if dx * dx + dy * dy < self.min_distance * self.min_distance:
+                    return False
+        self._last[mmsi] = (now, lat, lon)
+        self._buffer.append((now, mmsi, lat, lon, sog, cog))
+        return True
+
+    @property
+    def pending(self):
+        return len(self._buffer)
+
+    def take(self):
+        """Remove and return the buffered reports.
+
+        Call it on the thread that appends (the event loop), so no report
+        can land in the list after it has been handed to ``write``.
+        """
+        rows, self._buffer = self._buffer, []
+        return rows
+
+    def flush(self):
+        """Write buffered reports to their day segments; returns the number of rows written."""
+        return self.write(self.take())
+
+    def write(self, rows):
+        """Write reports from ``take`` to their day segments; returns the number of rows written."""
+        if not rows:
+            return 0
+        records = np.array(rows, dtype=_RECORD)
+        records = records[np.argsort(records["time"], kind="stable")]
+        with self._write_lock:
+            days = np.floor(records["time"] / 86400.0)
+            for day in np.unique(days):
+                self._append_day(records[days == day])
+        self.written += len(records)
+        return len(records)
+
+    def _append_day(self, records):
+        path = os.path.join(self.directory, day_name(records["time"][0]))
+        os.makedirs(path, exist_ok=True)
+        if path not in self._repaired:
+            self._truncate_to_complete_rows(path)
+            self._repaired.add(path)
+        for name, dtype in COLUMNS:
+            column = np.ascontiguousarray(records[name], dtype=dtype)
+            with open(os.path.join(path, f"{name}.{dtype[1:]}"), "ab") as f:
+                f.write(column.tobytes())
+
+    def _truncate_to_complete_rows(self, path):
+        count = self._row_count(path)
+        for name, dtype in COLUMNS:
+            column_path = os.path.join(path, f"{name}.{dtype[1:]}")
+            if os.path.exists(column_path):
+                os.truncate(column_path, count * np.dtype(dtype).itemsize)
+
+    def prune_days(self, now=None):
+        """Delete day segments older than ``retention_days``; returns their names."""
+        now = time.time() if now is None else now
+        oldest = day_name(now - self.retention_days * 86400.0)
+        removed = []
+        for name in self.days():
+            if name < oldest:
+                shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+                removed.append(name)
+        return removed
+
+    def forget_idle(self, now=None):
+        """Drop downsampling state for vessels idle past ``max_interval`` (their next report is kept anyway)."""
+        cutoff = (time.time() if now is None else now) - self.max_interval
+        for mmsi in [mmsi for mmsi, last in self._last.items() if last[0] < cutoff]:
+            del self._last[mmsi]
+
+    async def run(self, interval=5.0, maintenance_interval=3600.0):
+        """Background task flushing the buffer off the event loop and enforcing retention."""
+        next_maintenance = 0.0
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.write, self.take())
+                if time.time() >= next_maintenance:
+                    self.forget_idle()
+                    removed = await asyncio.to_thread(self.prune_days)
+                    if removed:
+                        print(f"[tracks] removed {len(removed)} day segments past retention")
+                    next_maintenance = time.time() + maintenance_interval
+            except Exception as e:
+                print(f"[tracks] flush failed: {e}")
+
+    # --- Queries ---
+
+    def days(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name for name in os.listdir(self.directory) if len(name) == 10 and name[4] == "-")
+
+    def _row_count(self, path):
+        counts = []
+        for name, dtype in COLUMNS:
+            column_path = os.path.join(path, f"{name}.{dtype[1:]}")
+            size = os.path.getsize(column_path) if os.path.exists(column_path) else 0
+            counts.append(size // np.dtype(dtype).itemsize)
+        return min(counts)
+
+    def _segment(self, name, start, end):
+        """Memory-mapped columns of one day restricted to [start, end], or None."""
+        path = os.path.join(self.directory, name)
+        count = self._row_count(path)
+        if count == 0:
+            return None
+        columns = {
+            column: np.memmap(os.path.join(path, f"{column}.{dtype[1:]}"), dtype=dtype, mode="r", shape=(count,))
+            for column, dtype in COLUMNS
+        }
+        first = int(np.searchsorted(columns["time"], start, side="left"))
+        last = int(np.searchsorted(columns["time"], end, side="right"))
+        if first >= last:
+            return None
+        return {column: values[first:last] for column, values in columns.items()}
+
+    def segments(self, start, end):
+        """Column dicts (memory-mapped views) for every day overlapping [start, end], in time order."""
+        names = set(self.days())
+        day = _day_start(start)
+        while day <= end:
+            name = day_name(day)
+            if name in names:
+                segment = self._segment(name, start, end)
+                if segment is not None:
+                    yield segment
+            day += 86400.0
+
+    def track(self, mmsi, start, end):
+        """One vessel's points in [start, end] as (time, lon, lat, sog, cog) arrays."""
+        parts = []
+        for segment in self.segments(start, end):
+            mask = segment["mmsi"] == mmsi
+            if mask.any():
+                parts.append([np.asarray(segment[column][mask]) for column in ("time", "lon", "lat", "sog", "cog")])
+        if not parts:
+            return tuple(np.empty(0, dtype=dtype) for dtype in ("<f8", "<f4", "<f4", "<f4", "<f4"))
+        return tuple(np.concatenate(column) for column in zip(*parts))
+
+    def traffic(self, start, end, bbox=None):
+        """Every stored point in [start, end], optionally inside ``bbox``, as a dict of column arrays."""
+        parts = []
+        for segment in self.segments(start, end):
+            if bbox is None:
+                parts.append({column: np.asarray(values) for column, values in segment.items()})
+                continue
+            mask = bbox_mask(segment["lon"], segment["lat"], *bbox)
+            parts.append({column: np.asarray(values[mask]) for column, values in segment.items()})
+        return {
+            column: np.concatenate([part[column] for part in parts]) if parts else np.empty(0, dtype=dtype)
+            for column, dtype in COLUMNS
+        }
+
+    def stats(self):
+        days = self.days()
+        return {
+            "received": self.received,
+            "written": self.written,
+            "pending": self.pending,
+            "days": len(days),
+            "rows": sum(self._row_count(os.path.join(self.directory, name)) for name in days),
+        }
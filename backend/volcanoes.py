@@ -0,0 +1,204 @@
+"""Volcano layer: the dataset indexed once, GVP activity merged in the background.
+
+``VolcanoIndex`` loads a GeoJSON point dataset (the bundled ``volcanoes.json``
+or a larger export such as the GVP Holocene list) into columns with a
+name-normalized lookup and a ``GridIndex`` for bbox queries.
+
+``VolcanoLayer`` turns the set of volcanoes named in the GVP Weekly Report
+into an immutable ``VolcanoSnapshot``: alert levels plus every feature
+pre-serialized to JSON.  A new snapshot is only built when the report
+changes, so a request costs a grid lookup and a join of ready-made strings,
+and the unfiltered layer is a single cached body.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import re
+import time
+import unicodedata
+
+import numpy as np
+
+from response_cache import encode_json
+from spatial import GridIndex, bbox_mask
+
+ALERT_LEVELS = ("low", "medium", "high")
+LOW, MEDIUM, HIGH = range(3)
+
+# Property names used by GVP's own GeoJSON exports, mapped onto ours
+_PROPERTY_ALIASES = {
+    "Volcano_Name": "name",
+    "Country": "country",
+    "Subregion": "region",
+    "Elevation": "elevation",
+    "Primary_Volcano_Type": "type",
+    "Volcano_Number": "id",
+}
+
+
+def normalize_name(name):
+    """Lowercase ASCII words only, so "Kīlauea" and "Kilauea " match."""
+    text = unicodedata.normalize("NFKD", name or "").encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"[^a-z0-9]+", " ", text.lower()).strip()
+
+
+class VolcanoIndex:
+    """Static volcano dataset as columns, with name and spatial lookups."""
+
+    def __init__(self, features, cell_degrees=5.0):
+        points = [feature for feature in features
+                  if (feature.get("geometry") or {}).get("type") == "Point"]
+        coordinates = np.array([feature["geometry"]["coordinates"][:2] for feature in points],
+                               dtype=float).reshape(-1, 2)
+        self.lon, self.lat = coordinates[:, 0], coordinates[:, 1]
+        self.properties = [
+            {_PROPERTY_ALIASES.get(key, key): value for key, value in (feature.get("properties") or {}).items()}
+            for feature in points
+        ]
+        self.names = [properties.get("name") or "" for properties in self.properties]
+        self.by_name = {}
+        for row, name in enumerate(self.names):
+            self.by_name.setdefault(normalize_name(name), []).append(row)
+        self.grid = GridIndex(cell_degrees)
+        for row in range(len(points)):
+            self.grid.update(row, self.lat[row], self.lon[row])
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        with open(path) as f:
+            return cls(json.load(f)["features"], **kwargs)
+
+    def __len__(self):
+        return len(self.names)
+
+    def rows_named(self, names):
+        """Rows matching any of ``names`` (after normalization), and the names that matched nothing."""
+        rows, unmatched = [], []
+        for name in names:
+            found = self.by_name.get(normalize_name(name))
+            if found:
+                rows.extend(found)
+            else:
+                unmatched.append(name)
+        return np.unique(np.array(rows, dtype=np.int64)), unmatched
+
+    def query(self, bbox):
+        """Rows inside ``bbox`` (west, south, east, north), in dataset order."""
+        candidates = self.grid.query(*bbox)
+        if candidates is None:
+            return np.flatnonzero(bbox_mask(self.lon, self.lat, *bbox))
+        candidates = np.sort(candidates)
+        return candidates[bbox_mask(self.lon[candidates], self.lat[candidates], *bbox)]
+
+
+def _collection(features, members):
+    head = '{"type":"FeatureCollection",' + "".join(f'"{key}":{value},' for key, value in members)
+    return (head + '"features":[' + ",".join(features) + "]}").encode("utf-8")
+
+
+class VolcanoSnapshot:
+    """One enriched version of the layer: alert levels and pre-serialized features."""
+
+    def __init__(self, index, active, version):
+        self.version = version
+        self.generated_at = time.time()
+        # None: the weekly report is unavailable, so alert levels come from the dataset
+        self.source = "static" if active is None else "gvp"
+        statuses = [properties.get("status", "Monitored") for properties in index.properties]
+        alert = np.full(len(index), LOW, dtype=np.int8)
+        if active is None:
+            self.unmatched = []
+            for row, status in enumerate(statuses):
+                if status == "Erupting":
+                    alert[row] = HIGH
+                elif status in ("Active", "Restless"):
+                    alert[row] = MEDIUM
+        else:
+            erupting, self.unmatched = index.rows_named(active)
+            for row, status in enumerate(statuses):
+                # Listed as erupting in the dataset but not in this week's report
+                if status == "Erupting":
+                    statuses[row] = "Active"
+                    alert[row] = MEDIUM
+            for row in erupting.tolist():
+                statuses[row] = "Erupting"
+                alert[row] = HIGH
+        self.alert = alert
+        self.features = [
+            encode_json({
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [float(index.lon[row]), float(index.lat[row])]},
+                "properties": {**properties, "status": statuses[row], "alert_level": ALERT_LEVELS[alert[row]]},
+            }).decode("utf-8")
+            for row, properties in enumerate(index.properties)
+        ]
+        self.body = self.encode(range(len(index)))
+        self.tag = '"' + hashlib.sha1(self.body).hexdigest()[:20] + '"'
+
+    def encode(self, rows):
+        return _collection([self.features[row] for row in rows],
+                           [("version", self.version), ("source", json.dumps(self.source))])
+
+    def counts(self):
+        return {level: int(np.count_nonzero(self.alert == i)) for i, level in enumerate(ALERT_LEVELS)}
+
+
+class VolcanoLayer:
+    """The current ``VolcanoSnapshot`` plus the background task that replaces it."""
+
+    def __init__(self, index):
+        self.index = index
+        self._active = None
+        self.snapshot = VolcanoSnapshot(index, None, 1)
+
+    def apply(self, active):
+        """Swap in a snapshot for the given set of erupting names; returns True if it changed."""
+        active = None if active is None else frozenset(active)
+        if active == self._active:
+            return False
+        snapshot = VolcanoSnapshot(self.index, active, self.snapshot.version + 1)
+        self._active = active
+        if snapshot.source == self.snapshot.source and snapshot.features == self.snapshot.features:
+            # Only names outside the dataset changed; keep the version clients already have
+            return False
+        self.snapshot = snapshot
+        return True
+
+    def query(self, bbox=None, alert_levels=None):
+        """GeoJSON body for the volcanoes in ``bbox`` with one of ``alert_levels``."""
+        snapshot = self.snapshot
+        if bbox is None and alert_levels is None:
+            return snapshot.body
+        rows = self.index.query(bbox) if bbox is not None else np.arange(len(self.index))
+        if alert_levels is not None:
+            wanted = [ALERT_LEVELS.index(level) for level in alert_levels]
+            rows = rows[np.isin(snapshot.alert[rows], wanted)]
+        return snapshot.encode(rows.tolist())
+
+    async def run(self, fetch_active, interval=300.0):
+        """Background task merging ``await fetch_active()`` (names from the weekly report)."""
+        while True:
+            try:
+                active = await fetch_active()
+                if await asyncio.to_thread(self.apply, active):
+                    snapshot = self.snapshot
+                    print(f"[volcanoes] version {snapshot.version}: {snapshot.counts()['high']} erupting, "
+                          f"{len(snapshot.unmatched)} report names not in the dataset")
+            except Exception as e:
+                # Keep the last merged report rather than dropping back to static levels
+                print(f"[volcanoes] could not merge the GVP weekly report: {e}")
+            await asyncio.sleep(interval)
+
+    def status(self):
+        snapshot = self.snapshot
+        return {
+            "volcanoes": len(self.index),
+            "version": snapshot.version,
+            "source": snapshot.source,
+            "generated_at": snapshot.generated_at,
+            "alert_levels": snapshot.counts(),
+            "unmatched": snapshot.unmatched,
+        }
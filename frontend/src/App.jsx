@@ -50,6 +50,7 @@ function App() {
         volcanoes: false,
         flights: false,
         ships: false,
+        conjunctions: false,
         cables: false,
         gps: false,
         iridium: false,
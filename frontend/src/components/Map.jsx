@@ -5,6 +5,7 @@ import { useTerminator } from '../hooks/useTerminator';
 import { useWeather } from '../hooks/useWeather';
 import { useAurora } from '../hooks/useAurora';
 import { useFlights } from '../hooks/useFlights';
+import { useConjunctions } from '../hooks/useConjunctions';
 import { useShips } from '../hooks/useShips';
 // import { useSatellites } from '../hooks/useSatellites'; // Temporarily disabled - network issues
 import dateLineGeoJson from '../data/dateLine.json';
@@ -71,11 +72,13 @@ export default function Map({
     showTimezones = false,
     tvMode = false
 }) {
-    const { nightPolygon, dayPolygon } = useTerminator();
+    const { nightPolygon, dayPolygon, twilightBands } = useTerminator();
     const { radarPath } = useWeather();
     const { auroraData } = useAurora();
-    // const { flightData } = useFlights(); // Temporarily disabled - OpenSky rate limiting
-    const { shipData } = useShips();
+    const [viewport, setViewport] = useState(null);
+    const { flightData } = useFlights(viewport, weatherLayers.flights);
+    const { shipData } = useShips(viewport);
+    const { conjunctionData } = useConjunctions(weatherLayers.conjunctions);
     // const { data: gpsData } = useSatellites('gps'); // Temporarily disabled - network issues
     // const { data: iridiumData } = useSatellites('iridium'); // Temporarily disabled - network issues
 
@@ -440,6 +443,28 @@ export default function Map({
             });
         }
 
+        // Twilight bands: nested polygons (sun below -6°, -12°, -18°) stacked over the night layer
+        if (!map.getSource('twilight')) {
+            map.addSource('twilight', {
+                type: 'geojson',
+                data: { type: 'FeatureCollection', features: [] }
+            });
+        }
+        if (!map.getLayer('twilight-layer')) {
+            map.addLayer({
+                id: 'twilight-layer',
+                type: 'fill',
+                source: 'twilight',
+                paint: {
+                    'fill-color': '#000000',
+                    'fill-opacity': 0.1
+                },
+                layout: {
+                    'visibility': 'none'
+                }
+            });
+        }
+
         // City lights layer
         if (!map.getLayer('city-lights-layer')) {
             map.addLayer({
@@ -633,6 +658,48 @@ export default function Map({
             });
         }
 
+        // Satellite conjunctions (closest-approach points, nearest misses drawn on top)
+        if (!map.getSource('conjunctions')) {
+            map.addSource('conjunctions', {
+                type: 'geojson',
+                data: { type: 'FeatureCollection', features: [] }
+            });
+        }
+        if (!map.getLayer('conjunctions-layer')) {
+            map.addLayer({
+                id: 'conjunctions-layer',
+                type: 'circle',
+                source: 'conjunctions',
+                paint: {
+                    'circle-radius': [
+                        'interpolate',
+                        ['linear'],
+                        ['get', 'miss_km'],
+                        0, 7,
+                        1, 5,
+                        10, 2.5
+                    ],
+                    'circle-color': [
+                        'interpolate',
+                        ['linear'],
+                        ['get', 'miss_km'],
+                        0, '#f43f5e',
+                        1, '#f97316',
+                        5, '#facc15',
+                        10, '#a3e635'
+                    ],
+                    'circle-opacity': 0.85,
+                    'circle-stroke-width': 1,
+                    'circle-stroke-color': '#fff',
+                    'circle-stroke-opacity': 0.6
+                },
+                layout: {
+                    'circle-sort-key': ['-', ['get', 'miss_km']],
+                    'visibility': 'none'
+                }
+            });
+        }
+
         // Flights
         if (!map.getSource('flights')) {
             map.addSource('flights', {
@@ -641,11 +708,31 @@ export default function Map({
             });
         }
         setupFlightIcons(map);
+        if (!map.getLayer('flights-cluster-layer')) {
+            // Server-side clusters returned at low zoom levels
+            map.addLayer({
+                id: 'flights-cluster-layer',
+                type: 'circle',
+                source: 'flights',
+                filter: ['has', 'point_count'],
+                paint: {
+                    'circle-color': '#facc15',
+                    'circle-opacity': 0.6,
+                    'circle-stroke-color': '#fef9c3',
+                    'circle-stroke-width': 1,
+                    'circle-radius': ['interpolate', ['linear'], ['get', 'point_count'], 2, 4, 100, 10, 1000, 18]
+                },
+                layout: {
+                    'visibility': 'none'
+                }
+            });
+        }
         if (!map.getLayer('flights-layer')) {
             map.addLayer({
                 id: 'flights-layer',
                 type: 'symbol',
                 source: 'flights',
+                filter: ['!', ['has', 'point_count']],
                 layout: {
                     'icon-image': 'plane-icon',
                     'icon-size': 0.8,
@@ -653,6 +740,16 @@ export default function Map({
                     'icon-allow-overlap': true,
                     'icon-rotation-alignment': 'map',
                     'visibility': 'none'
+                },
+                paint: {
+                    // Fade aircraft whose last reported position is getting old
+                    'icon-opacity': [
+                        'interpolate',
+                        ['linear'],
+                        ['coalesce', ['get', 'position_age'], 0],
+                        120, 1,
+                        900, 0.35
+                    ]
                 }
             });
         }
@@ -665,11 +762,31 @@ export default function Map({
             });
         }
         setupShipIcons(map);
+        if (!map.getLayer('ships-cluster-layer')) {
+            // Server-side clusters returned at low zoom levels
+            map.addLayer({
+                id: 'ships-cluster-layer',
+                type: 'circle',
+                source: 'ships',
+                filter: ['has', 'point_count'],
+                paint: {
+                    'circle-color': '#38bdf8',
+                    'circle-opacity': 0.6,
+                    'circle-stroke-color': '#e0f2fe',
+                    'circle-stroke-width': 1,
+                    'circle-radius': ['interpolate', ['linear'], ['get', 'point_count'], 2, 4, 100, 10, 1000, 18]
+                },
+                layout: {
+                    'visibility': 'none'
+                }
+            });
+        }
         if (!map.getLayer('ships-layer')) {
             map.addLayer({
                 id: 'ships-layer',
                 type: 'symbol',
                 source: 'ships',
+                filter: ['!', ['has', 'point_count']],
                 layout: {
                     'icon-image': 'ship-icon',
                     'icon-size': 0.7,
@@ -999,9 +1116,20 @@ export default function Map({
             }
         });
 
+        // Viewport drives server-side filtering of point layers (e.g. ships)
+        const onBottomMapMoveEnd = () => {
+            const bounds = mapBottom.current.getBounds();
+            setViewport({
+                bbox: [bounds.getWest(), bounds.getSouth(), bounds.getEast(), bounds.getNorth()],
+                zoom: mapBottom.current.getZoom()
+            });
+        };
+        mapBottom.current.on('moveend', onBottomMapMoveEnd);
+
         mapBottom.current.on('load', () => {
             setupMapLayers(mapBottom.current);
             setIsBottomMapLoaded(true);
+            onBottomMapMoveEnd();
         });
 
         mapTop.current.on('load', () => {
@@ -1049,6 +1177,20 @@ export default function Map({
         }
     }, [nightPolygon, dayPolygon, isBottomMapLoaded, isTopMapLoaded]);
 
+    // Update Twilight Bands (only available from the backend, not the local fallback)
+    useEffect(() => {
+        if (twilightBands) {
+            setSourceData('twilight', twilightBands);
+        }
+    }, [twilightBands, isBottomMapLoaded, isTopMapLoaded]);
+
+    // Update Flight Data
+    useEffect(() => {
+        if (flightData) {
+            setSourceData('flights', flightData);
+        }
+    }, [flightData, isBottomMapLoaded, isTopMapLoaded]);
+
     // Update Ship Data
     useEffect(() => {
         if (shipData) {
@@ -1164,6 +1306,13 @@ export default function Map({
         };
     }, [isBottomMapLoaded, isTopMapLoaded, weatherLayers.earthquakes]);
 
+    // Update Conjunction Data
+    useEffect(() => {
+        if (conjunctionData) {
+            setSourceData('conjunctions', conjunctionData);
+        }
+    }, [conjunctionData, isBottomMapLoaded, isTopMapLoaded]);
+
     // Update Volcano Data
     useEffect(() => {
         if (volcanoData) {
@@ -1203,12 +1352,16 @@ export default function Map({
             // Day/Night mode replacement: mask takes care of day/night visual splitting.
             // We don't want the flat dark terminator overlay shading our beautiful city lights.
             setLayerVisibility('night-layer', false);
+            setLayerVisibility('twilight-layer', false);
         } else {
             // Standard mode: show night layer on bottom map based on toggle
             if (mapBottom.current && isBottomMapLoaded && mapBottom.current.getLayer('night-layer')) {
                 mapBottom.current.setLayoutProperty('night-layer', 'visibility', layers.night ? 'visible' : 'none');
                 mapBottom.current.setPaintProperty('night-layer', 'fill-opacity', 0.5);
             }
+            if (mapBottom.current && isBottomMapLoaded && mapBottom.current.getLayer('twilight-layer')) {
+                mapBottom.current.setLayoutProperty('twilight-layer', 'visibility', layers.night ? 'visible' : 'none');
+            }
         }
 
         // Overlays
@@ -1223,8 +1376,11 @@ export default function Map({
         setLayerVisibility('earthquakes-layer', weatherLayers.earthquakes);
         setLayerVisibility('earthquakes-pulse', weatherLayers.earthquakes);
         setLayerVisibility('volcanoes-layer', weatherLayers.volcanoes);
+        setLayerVisibility('conjunctions-layer', weatherLayers.conjunctions);
         setLayerVisibility('flights-layer', weatherLayers.flights);
+        setLayerVisibility('flights-cluster-layer', weatherLayers.flights);
         setLayerVisibility('ships-layer', weatherLayers.ships);
+        setLayerVisibility('ships-cluster-layer', weatherLayers.ships);
         setLayerVisibility('cables-layer', weatherLayers.cables);
         setLayerVisibility('date-line-layer', showDateLine);
         setLayerVisibility('timezone-boundaries-layer', showTimezones);
@@ -278,6 +278,17 @@ export default function Sidebar({ mapStyle, onStyleChange, layers, toggleLayer,
 
                     <div className="space-y-6">
 
+                        {/* Satellite Conjunctions Toggle */}
+                        <div className="flex items-center justify-between">
+                            <span className="text-gray-300 font-medium tracking-wide">Satellite Conjunctions</span>
+                            <button
+                                onClick={() => toggleWeatherLayer('conjunctions')}
+                                className={`w-12 h-6 rounded-full transition-colors relative ${weatherLayers.conjunctions ? 'bg-rose-500' : 'bg-gray-700'}`}
+                            >
+                                <div className={`absolute top-1 left-1 w-4 h-4 bg-white rounded-full transition-transform ${weatherLayers.conjunctions ? 'translate-x-6' : 'translate-x-0'}`} />
+                            </button>
+                        </div>
+
                         {/* Maritime Toggle */}
                         <div className="flex items-center justify-between">
                             <span className="text-gray-300 font-medium tracking-wide">Maritime Traffic</span>
@@ -8,30 +8,12 @@ export function useAurora() {
     useEffect(() => {
         const fetchAuroraData = async () => {
             try {
-                const response = await fetch('https://services.swpc.noaa.gov/json/ovation_aurora_latest.json');
+                // The backend turns the OVATION grid into a FeatureCollection of
+                // the cells with non-zero intensity, cached for every client
+                const response = await fetch('/api/aurora');
                 if (!response.ok) throw new Error('Failed to fetch aurora data');
 
-                const data = await response.json();
-
-                // data.coordinates is array of [lon, lat, intensity]
-                // Filter for meaningful intensity to reduce point count (e.g. > 0)
-                const features = data.coordinates
-                    .filter(point => point[2] > 0)
-                    .map(point => ({
-                        type: 'Feature',
-                        geometry: {
-                            type: 'Point',
-                            coordinates: [point[0], point[1]]
-                        },
-                        properties: {
-                            intensity: point[2]
-                        }
-                    }));
-
-                const geoJson = {
-                    type: 'FeatureCollection',
-                    features: features
-                };
+                const geoJson = await response.json();
 
                 setAuroraData(geoJson);
                 setLoading(false);
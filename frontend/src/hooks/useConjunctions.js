@@ -0,0 +1,50 @@
+import { useState, useEffect } from 'react';
+import { PACKED_MEDIA_TYPE, decodePoints, toFeatureCollection } from '../utils/packedPoints';
+
+/**
+ * Hook to fetch predicted satellite close approaches (closest-approach points)
+ * The backend re-screens the catalog only when new elements arrive, so a
+ * 10 minute refresh is plenty; nothing is fetched while the layer is off.
+ * @param {boolean} enabled - Whether the conjunctions layer is shown
+ */
+export function useConjunctions(enabled = true) {
+    const [conjunctionData, setConjunctionData] = useState(null);
+    const [loading, setLoading] = useState(true);
+    const [error, setError] = useState(null);
+
+    useEffect(() => {
+        if (!enabled) return;
+        let isMounted = true;
+
+        const fetchConjunctions = async () => {
+            try {
+                const response = await fetch('/api/conjunctions/map', {
+                    headers: { Accept: PACKED_MEDIA_TYPE }
+                });
+                if (!response.ok) {
+                    throw new Error('Failed to fetch conjunction data');
+                }
+                const collection = toFeatureCollection(decodePoints(await response.arrayBuffer()));
+                if (isMounted) {
+                    setConjunctionData(collection);
+                    setLoading(false);
+                }
+            } catch (err) {
+                console.error('Conjunction data error:', err);
+                if (isMounted) {
+                    setError(err);
+                    setLoading(false);
+                }
+            }
+        };
+
+        fetchConjunctions();
+        const interval = setInterval(fetchConjunctions, 10 * 60 * 1000);
+        return () => {
+            isMounted = false;
+            clearInterval(interval);
+        };
+    }, [enabled]);
+
+    return { conjunctionData, loading, error };
+}
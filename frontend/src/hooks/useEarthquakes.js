@@ -8,8 +8,8 @@ export function useEarthquakes() {
     useEffect(() => {
         const fetchEarthquakes = async () => {
             try {
-                // USGS Feed: M2.5+ Earthquakes, Past 7 Days
-                const response = await fetch('https://earthquake.usgs.gov/earthquakes/feed/v1.0/summary/2.5_week.geojson');
+                // USGS Feed: M2.5+ Earthquakes, Past 7 Days (cached by the backend)
+                const response = await fetch('/api/earthquakes');
                 if (!response.ok) throw new Error('Failed to fetch earthquake data');
 
                 const data = await response.json();
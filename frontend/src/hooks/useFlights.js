@@ -2,35 +2,47 @@ import { useState, useEffect } from 'react';
 
 /**
  * Hook to fetch real-time flight data from OpenSky Network
- * Updates every 30 seconds (OpenSky rate limit friendly)
+ * The backend polls OpenSky within its rate limits and dead-reckons positions
+ * between polls, so this only has to refresh the viewport every 15 seconds.
+ * @param {{bbox: number[], zoom: number}|null} viewport - Only fetch aircraft in view;
+ *   at low zoom the backend returns clusters instead of individual aircraft
+ * @param {boolean} enabled - Whether the flights layer is shown; nothing is fetched while it is off
  */
-export function useFlights() {
+export function useFlights(viewport = null, enabled = true) {
     const [flightData, setFlightData] = useState(null);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState(null);
 
-    const fetchFlights = async () => {
-        try {
-            const response = await fetch('/api/flights');
-            if (!response.ok) {
-                throw new Error('Failed to fetch flight data');
-            }
-            const data = await response.json();
-            setFlightData(data);
-            setLoading(false);
-        } catch (err) {
-            console.error('Flight data error:', err);
-            setError(err);
-            setLoading(false);
-        }
-    };
+    const bboxParam = viewport ? viewport.bbox.map(v => v.toFixed(3)).join(',') : null;
+    const zoomParam = viewport ? viewport.zoom.toFixed(1) : null;
 
     useEffect(() => {
+        if (!enabled) return;
+
+        const fetchFlights = async () => {
+            try {
+                const params = new URLSearchParams();
+                if (bboxParam) params.set('bbox', bboxParam);
+                if (zoomParam) params.set('zoom', zoomParam);
+                const query = params.toString();
+                const response = await fetch(query ? `/api/flights?${query}` : '/api/flights');
+                if (!response.ok) {
+                    throw new Error('Failed to fetch flight data');
+                }
+                const data = await response.json();
+                setFlightData(data);
+                setLoading(false);
+            } catch (err) {
+                console.error('Flight data error:', err);
+                setError(err);
+                setLoading(false);
+            }
+        };
+
         fetchFlights();
-        // Poll every 30 seconds (OpenSky rate limit friendly)
-        const interval = setInterval(fetchFlights, 30000);
+        const interval = setInterval(fetchFlights, 15000);
         return () => clearInterval(interval);
-    }, []);
+    }, [bboxParam, zoomParam, enabled]);
 
     return { flightData, loading, error };
 }
@@ -1,4 +1,5 @@
 import { useState, useEffect } from 'react';
+import { liveChannel } from '../utils/liveChannel';
 
 export function useISS() {
     const [issData, setIssData] = useState(null);
@@ -6,6 +7,8 @@ export function useISS() {
 
     useEffect(() => {
         const fetchISS = async () => {
+            // Positions are pushed over the live channel while it is connected
+            if (liveChannel.isLive('iss')) return;
             try {
                 const response = await fetch(`/api/iss?t=${Date.now()}`);
                 if (response.ok) {
@@ -32,10 +35,19 @@ export function useISS() {
         fetchISS(); // Initial fetch
         fetchTrack(); // Initial track fetch
 
+        const unsubscribe = liveChannel.subscribe('iss', (collection) => {
+            const feature = collection.features[0];
+            if (feature) {
+                const [longitude, latitude] = feature.geometry.coordinates;
+                setIssData({ latitude, longitude });
+            }
+        });
+
         const intervalISS = setInterval(fetchISS, 10000); // Poll every 10 seconds
         const intervalTrack = setInterval(fetchTrack, 60000); // Poll track every 60 seconds
 
         return () => {
+            unsubscribe();
             clearInterval(intervalISS);
             clearInterval(intervalTrack);
         };
@@ -1,9 +1,11 @@
 import { useState, useEffect } from 'react';
+import { liveChannel } from '../utils/liveChannel';
+import { PACKED_MEDIA_TYPE, decodePoints, toFeatureCollection } from '../utils/packedPoints';
 
 /**
  * Hook to fetch satellite constellation data
  * @param {string} group - 'gps', 'iridium', 'starlink'
- * @param {number} intervalMs - Poll interval in ms (default 10s)
+ * @param {number} intervalMs - Poll interval in ms (default 10s), used while the live channel is down
  */
 export function useSatellites(group, intervalMs = 10000) {
     const [data, setData] = useState(null);
@@ -16,13 +18,16 @@ export function useSatellites(group, intervalMs = 10000) {
         let isMounted = true;
 
         const fetchData = async () => {
-            if (!group) return;
+            if (!group || liveChannel.isLive(`satellites:${group}`)) return;
             try {
-                const response = await fetch(`/api/satellites/${group}`);
+                // Packed columns are a fraction of the GeoJSON size for large groups
+                const response = await fetch(`/api/satellites/${group}`, {
+                    headers: { Accept: PACKED_MEDIA_TYPE }
+                });
                 if (!response.ok) throw new Error('Failed to fetch');
-                const json = await response.json();
+                const collection = toFeatureCollection(decodePoints(await response.arrayBuffer()));
                 if (isMounted) {
-                    setData(json);
+                    setData(collection);
                     setLoading(false);
                 }
             } catch (err) {
@@ -32,9 +37,16 @@ export function useSatellites(group, intervalMs = 10000) {
 
         fetchData();
         const interval = setInterval(fetchData, intervalMs);
+        const unsubscribe = group ? liveChannel.subscribe(`satellites:${group}`, (collection) => {
+            if (isMounted) {
+                setData(collection);
+                setLoading(false);
+            }
+        }) : () => {};
 
         return () => {
             isMounted = false;
+            unsubscribe();
             clearInterval(interval);
         };
     }, [group, intervalMs]);
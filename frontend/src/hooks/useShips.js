@@ -1,37 +1,63 @@
 import { useState, useEffect } from 'react';
+import { liveChannel } from '../utils/liveChannel';
+
+// Matches the backend's SHIP_CLUSTER_MAX_ZOOM: below it ships are clustered server-side
+const CLUSTER_MAX_ZOOM = 5;
 
 /**
  * Hook to fetch real-time maritime traffic data
- * Updates every 10 seconds (local cache serve)
+ * Zoomed in, individual ships are pushed over the live channel for the viewport;
+ * otherwise (or while the channel is down) polls every 10 seconds.
  * Data is populated in backend via live WebSocket from AisStream.io
+ * @param {{bbox: number[], zoom: number}|null} viewport - Only fetch ships in view;
+ *   at low zoom the backend returns clusters instead of individual ships
  */
-export function useShips() {
+export function useShips(viewport = null) {
     const [shipData, setShipData] = useState(null);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState(null);
 
-    const fetchShips = async () => {
-        try {
-            const response = await fetch('/api/ships');
-            if (!response.ok) {
-                throw new Error('Failed to fetch ship data');
-            }
-            const data = await response.json();
-            setShipData(data);
-            setLoading(false);
-        } catch (err) {
-            console.error('Ship data error:', err);
-            setError(err);
-            setLoading(false);
-        }
-    };
+    const bboxParam = viewport ? viewport.bbox.map(v => v.toFixed(3)).join(',') : null;
+    const zoomParam = viewport ? viewport.zoom.toFixed(1) : null;
 
     useEffect(() => {
+        const streamed = !zoomParam || Number(zoomParam) >= CLUSTER_MAX_ZOOM;
+
+        const fetchShips = async () => {
+            if (streamed && liveChannel.isLive('ships')) return;
+            try {
+                const params = new URLSearchParams();
+                if (bboxParam) params.set('bbox', bboxParam);
+                if (zoomParam) params.set('zoom', zoomParam);
+                const query = params.toString();
+                const response = await fetch(query ? `/api/ships?${query}` : '/api/ships');
+                if (!response.ok) {
+                    throw new Error('Failed to fetch ship data');
+                }
+                const data = await response.json();
+                setShipData(data);
+                setLoading(false);
+            } catch (err) {
+                console.error('Ship data error:', err);
+                setError(err);
+                setLoading(false);
+            }
+        };
+
         fetchShips();
         // Poll every 10 seconds
         const interval = setInterval(fetchShips, 10000);
-        return () => clearInterval(interval);
-    }, []);
+        const unsubscribe = streamed
+            ? liveChannel.subscribe('ships', (collection) => {
+                setShipData(collection);
+                setLoading(false);
+            }, bboxParam ? bboxParam.split(',').map(Number) : null)
+            : () => {};
+        return () => {
+            unsubscribe();
+            clearInterval(interval);
+        };
+    }, [bboxParam, zoomParam]);
 
     return { shipData, loading, error };
 }
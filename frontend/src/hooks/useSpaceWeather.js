@@ -17,8 +17,8 @@ export function useSpaceWeather() {
     useEffect(() => {
         const fetchSpaceWeather = async () => {
             try {
-                // Fetch K-Index
-                const response = await fetch('https://services.swpc.noaa.gov/json/planetary_k_index_1m.json');
+                // Fetch K-Index (NOAA SWPC, proxied by the backend)
+                const response = await fetch('/api/space-weather/kp');
                 if (!response.ok) throw new Error('Failed to fetch space weather');
                 const data = await response.json();
                 
@@ -2,27 +2,54 @@ import { useState, useEffect } from 'react';
 import { createNightPolygon, createDayPolygon } from '../utils/terminator';
 
 /**
- * Hook to calculate and update terminator position
- * Updates every minute
- * Returns both night and day polygons
+ * Hook to fetch and update terminator position
+ * Updates every minute from /api/terminator, which computes the terminator
+ * and twilight bands once on the server for all displays.
+ * Falls back to the local SunCalc calculation if the backend is unreachable.
+ * Returns night and day polygons plus the civil/nautical/astronomical twilight bands
  */
 export function useTerminator() {
     // Calculate initial polygons immediately using lazy initialization
     const [nightPolygon, setNightPolygon] = useState(() => createNightPolygon(new Date()));
     const [dayPolygon, setDayPolygon] = useState(() => createDayPolygon(new Date()));
+    const [twilightBands, setTwilightBands] = useState(null);
 
     useEffect(() => {
-        const updateTerminator = () => {
-            const now = new Date();
-            setNightPolygon(createNightPolygon(now));
-            setDayPolygon(createDayPolygon(now));
+        let isMounted = true;
+
+        const updateTerminator = async () => {
+            try {
+                const response = await fetch('/api/terminator');
+                if (!response.ok) throw new Error('Failed to fetch terminator');
+                const data = await response.json();
+                const byBand = Object.fromEntries(data.features.map(f => [f.properties.band, f]));
+                if (!isMounted) return;
+                setNightPolygon(byBand.night);
+                setDayPolygon(byBand.day);
+                setTwilightBands({
+                    type: 'FeatureCollection',
+                    features: data.features.filter(f => f.properties.sun_altitude < 0)
+                });
+            } catch (err) {
+                console.error('Terminator fetch failed, computing locally:', err);
+                if (!isMounted) return;
+                const now = new Date();
+                setNightPolygon(createNightPolygon(now));
+                setDayPolygon(createDayPolygon(now));
+                // No local twilight computation; drop bands that no longer match the night side
+                setTwilightBands({ type: 'FeatureCollection', features: [] });
+            }
         };
 
+        updateTerminator();
         // Update every minute
         const interval = setInterval(updateTerminator, 60000);
 
-        return () => clearInterval(interval);
+        return () => {
+            isMounted = false;
+            clearInterval(interval);
+        };
     }, []);
 
-    return { nightPolygon, dayPolygon };
+    return { nightPolygon, dayPolygon, twilightBands };
 }
@@ -10,8 +10,8 @@ export function useWeather() {
     useEffect(() => {
         const fetchWeatherConfig = async () => {
             try {
-                // Fetch available maps from RainViewer
-                const response = await fetch('https://api.rainviewer.com/public/weather-maps.json');
+                // Fetch available maps from RainViewer (proxied by the backend)
+                const response = await fetch('/api/weather/radar');
                 if (!response.ok) throw new Error('Failed to fetch weather config');
 
                 const data = await await response.json();
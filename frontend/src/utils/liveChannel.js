@@ -0,0 +1,130 @@
+/**
+ * Shared WebSocket client for the backend push channel (/api/live).
+ *
+ * Each subscribed layer ("ships", "iss", "satellites:<group>") starts from a
+ * snapshot and is kept current by sequence-numbered deltas that only carry
+ * added, moved and removed entities. On reconnect the channel resumes from
+ * the last sequence number it saw; the backend answers with the missed
+ * deltas or a fresh snapshot. Hooks fall back to polling while a layer is
+ * not live.
+ */
+
+const RECONNECT_MS = 5000;
+
+class LiveChannel {
+    constructor(path = '/api/live') {
+        this.path = path;
+        this.socket = null;
+        this.connected = false;
+        this.layers = new Map();
+        this.decoder = new TextDecoder();
+        this.reconnectTimer = null;
+    }
+
+    url() {
+        const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+        return `${protocol}//${window.location.host}${this.path}`;
+    }
+
+    connect() {
+        if (this.socket || typeof WebSocket === 'undefined') return;
+        const socket = new WebSocket(this.url());
+        socket.binaryType = 'arraybuffer';
+        this.socket = socket;
+
+        socket.onopen = () => {
+            this.connected = true;
+            this.layers.forEach((layer, name) => this.send(this.subscribeMessage(name, layer)));
+        };
+        socket.onmessage = (event) => {
+            const text = typeof event.data === 'string' ? event.data : this.decoder.decode(event.data);
+            this.handle(JSON.parse(text));
+        };
+        socket.onclose = () => {
+            this.socket = null;
+            this.connected = false;
+            this.layers.forEach(layer => { layer.live = false; });
+            if (this.layers.size > 0 && !this.reconnectTimer) {
+                this.reconnectTimer = setTimeout(() => {
+                    this.reconnectTimer = null;
+                    this.connect();
+                }, RECONNECT_MS);
+            }
+        };
+    }
+
+    send(message) {
+        if (this.socket && this.connected) {
+            this.socket.send(JSON.stringify(message));
+        }
+    }
+
+    subscribeMessage(name, layer) {
+        const message = { subscribe: name };
+        if (layer.bbox) message.bbox = layer.bbox;
+        else if (layer.seq > 0) message.since = layer.seq;
+        return message;
+    }
+
+    /**
+     * Subscribe to a layer; listener receives a GeoJSON FeatureCollection
+     * after every snapshot or delta. Returns an unsubscribe function.
+     * @param {string} name - Layer name
+     * @param {Function} listener
+     * @param {number[]|null} bbox - Optional [west, south, east, north] filter
+     */
+    subscribe(name, listener, bbox = null) {
+        let layer = this.layers.get(name);
+        if (!layer) {
+            layer = { seq: 0, fields: [], features: new Map(), listeners: new Set(), bbox, live: false };
+            this.layers.set(name, layer);
+        }
+        layer.listeners.add(listener);
+        this.connect();
+        this.send(this.subscribeMessage(name, layer));
+
+        return () => {
+            layer.listeners.delete(listener);
+            if (layer.listeners.size === 0) {
+                this.layers.delete(name);
+                this.send({ unsubscribe: name });
+            }
+        };
+    }
+
+    isLive(name) {
+        return this.connected && Boolean(this.layers.get(name)?.live);
+    }
+
+    handle(message) {
+        const layer = this.layers.get(message.layer);
+        if (!layer) return;
+
+        if (message.type === 'snapshot') {
+            layer.seq = message.seq;
+            layer.fields = message.fields;
+            layer.features = new Map(message.features.map(feature => [feature.id, feature]));
+            layer.live = true;
+        } else if (message.type === 'delta') {
+            // Deltas already covered by a newer snapshot are skipped
+            if (message.seq <= layer.seq) return;
+            layer.seq = message.seq;
+            message.added.forEach(feature => layer.features.set(feature.id, feature));
+            message.moved.forEach(([id, lon, lat, ...values]) => {
+                const feature = layer.features.get(id);
+                if (!feature) return;
+                feature.geometry.coordinates = [lon, lat];
+                layer.fields.slice(2).forEach((field, i) => { feature.properties[field] = values[i]; });
+            });
+            message.removed.forEach(id => layer.features.delete(id));
+        } else {
+            if (message.type === 'error') console.error('Live channel error:', message.detail);
+            return;
+        }
+
+        const collection = { type: 'FeatureCollection', features: Array.from(layer.features.values()) };
+        layer.listeners.forEach(listener => listener(collection));
+    }
+}
+
+export const liveChannel = new LiveChannel();
@@ -0,0 +1,61 @@
+/**
+ * Decoder for the backend's packed point format (application/x-aethra-points).
+ *
+ * Layout: "AEP1" magic, uint32 header length, JSON header, then one
+ * little-endian column per header entry, each on an 8-byte boundary.
+ * String columns are uint32 indices into the table listed in the header.
+ */
+
+export const PACKED_MEDIA_TYPE = 'application/x-aethra-points';
+
+const ARRAY_TYPES = {
+    float32: Float32Array,
+    float64: Float64Array,
+    int8: Int8Array,
+    int16: Int16Array,
+    int32: Int32Array,
+    uint8: Uint8Array,
+    uint16: Uint16Array,
+    uint32: Uint32Array,
+    string: Uint32Array,
+};
+
+/**
+ * Decode a packed body into { count, columns: { name: TypedArray | string[] } }
+ * @param {ArrayBuffer} buffer
+ */
+export function decodePoints(buffer) {
+    const view = new DataView(buffer);
+    const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+    if (magic !== 'AEP1') throw new Error('Not a packed point body');
+    const headerLength = view.getUint32(4, true);
+    const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 8, headerLength)));
+    const base = (8 + headerLength + 7) & ~7;
+
+    const columns = {};
+    header.columns.forEach(({ name, type, offset, table }) => {
+        const values = new ARRAY_TYPES[type](buffer, base + offset, header.count);
+        columns[name] = table ? Array.from(values, i => table[i]) : values;
+    });
+    return { count: header.count, columns };
+}
+
+/**
+ * Convert decoded columns back into a GeoJSON FeatureCollection of points
+ * (for map sources that need GeoJSON). The lon/lat columns become geometry.
+ */
+export function toFeatureCollection({ count, columns }) {
+    const { lon, lat, ...rest } = columns;
+    const names = Object.keys(rest);
+    const features = new Array(count);
+    for (let i = 0; i < count; i++) {
+        const properties = {};
+        names.forEach(name => { properties[name] = rest[name][i]; });
+        features[i] = {
+            type: 'Feature',
+            geometry: { type: 'Point', coordinates: [lon[i], lat[i]] },
+            properties,
+        };
+    }
+    return { type: 'FeatureCollection', features };
+}
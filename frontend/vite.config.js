@@ -10,7 +10,8 @@ export default defineConfig({
         proxy: {
             '/api': {
                 target: 'http://127.0.0.1:8000',
-                changeOrigin: true
+                changeOrigin: true,
+                ws: true
             }
         }
     }